@@ -0,0 +1,101 @@
+from collections import deque, namedtuple
+from logic.db_interface import set_attendance_bulk, get_class_last_change
+
+# Undo/redo for attendance edits in Mainform.
+# Each edit (one cell, or a whole date column) is one entry holding the cells and date notes it
+# wrote and the values they replaced; undoing or redoing it is one set_attendance_bulk transaction.
+# The stacks live in memory for the open class only and are bounded: past MAX_EDITS entries in a
+# stack, or MAX_CELLS cells across both stacks, the oldest undo entries are dropped (then the
+# furthest redo entries) and can no longer be replayed.
+# Entries are only valid against the rows they were recorded on: once the class's students, dates
+# or marks are written by anything else (student forms, the metadata form's date reconcile), both
+# stacks are discarded rather than replayed onto rows that may be gone.
+
+MAX_EDITS = 50
+MAX_CELLS = 5000
+# Tables whose journalled writes (see migrations.add_change_journal) invalidate the stacks
+WATCHED_TABLES = ("students", "dates", "attendance")
+
+# cells: ((student_id, date, status), ...); notes: ((date, note), ...); None = no row
+Edit = namedtuple("Edit", "label cells notes previous_cells previous_notes")
+
+
+class AttendanceJournal:
+    def __init__(self, class_no, max_edits=MAX_EDITS, max_cells=MAX_CELLS):
+        self.class_no = class_no
+        self.max_cells = max_cells
+        self.undo_stack = deque(maxlen=max_edits)
+        self.redo_stack = deque(maxlen=max_edits)
+        self._seen_seq = None  # journal seq of our own latest write; read on first use
+
+    def apply(self, cells, date_notes=None, label=""):
+        """Write cells [(student_id, date, status)] and date_notes {date: note} as one undoable edit."""
+        self.discard_if_changed()
+        previous_cells, previous_notes = set_attendance_bulk(self.class_no, cells, date_notes)
+        self._seen_seq = self._last_seq()
+        edit = Edit(
+            label,
+            tuple(cells), tuple((date_notes or {}).items()),
+            tuple(previous_cells), tuple(previous_notes.items()),
+        )
+        self.redo_stack.clear()
+        self._push(self.undo_stack, edit)
+        return edit
+
+    def undo(self):
+        """Restore the values the latest edit replaced. Returns that edit, or None if there is none."""
+        self.discard_if_changed()
+        if not self.undo_stack:
+            return None
+        edit = self.undo_stack[-1]
+        set_attendance_bulk(self.class_no, edit.previous_cells, dict(edit.previous_notes))
+        self._seen_seq = self._last_seq()
+        self._push(self.redo_stack, self.undo_stack.pop())
+        return edit
+
+    def redo(self):
+        """Write the latest undone edit again. Returns that edit, or None if there is none."""
+        self.discard_if_changed()
+        if not self.redo_stack:
+            return None
+        edit = self.redo_stack[-1]
+        set_attendance_bulk(self.class_no, edit.cells, dict(edit.notes))
+        self._seen_seq = self._last_seq()
+        self._push(self.undo_stack, self.redo_stack.pop())
+        return edit
+
+    def clear(self):
+        """Forget every undo and redo step."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def discard_if_changed(self):
+        """Clear both stacks if the class's students, dates or marks were written since our last write. Returns True if cleared."""
+        if not (self.undo_stack or self.redo_stack) or self._last_seq() == self._seen_seq:
+            return False
+        self.clear()
+        return True
+
+    def _last_seq(self):
+        return get_class_last_change(self.class_no, WATCHED_TABLES)[0]
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def cell_count(self):
+        """Cells held by both stacks together."""
+        return sum(len(e.cells) for stack in (self.undo_stack, self.redo_stack) for e in stack)
+
+    def _push(self, stack, edit):
+        stack.append(edit)  # the deque's maxlen drops the oldest entry
+        while self.cell_count() > self.max_cells:
+            # Never drop the entry just pushed
+            if self.undo_stack and not (stack is self.undo_stack and len(self.undo_stack) == 1):
+                self.undo_stack.popleft()
+            elif self.redo_stack and not (stack is self.redo_stack and len(self.redo_stack) == 1):
+                self.redo_stack.popleft()
+            else:
+                break
@@ -2,6 +2,10 @@ import os
 import sqlite3
 import json
 from typing import Any, Optional
+try:
+    from logic.migrations import migrate
+except ImportError:  # run as a script from src/logic
+    from migrations import migrate
 
 # All defaults are now managed in factory_defaults.json
 # the DB schema should not have conflicting SQL defaults.
@@ -230,6 +234,7 @@ def recreate_db(db_path: str = DB_PATH) -> sqlite3.Connection | None:
     );
     """)
     print("Created tables")
+    migrate(conn)
 
     # Ensure defaults are loaded from teacher_defaults.json
     defaults_path = os.path.join(DATA_DIR, "teacher_defaults.json")
@@ -1,3 +1,19 @@
+def parse_max_classes(val, default=10):
+    """Safely extract the leading integer from max_classes, even if it's a display string."""
+    try:
+        if isinstance(val, int):
+            return val
+        return int(str(val).split()[0])
+    except Exception:
+        return default
+
+def parse_class_time(val, default=2.0):
+    """Hours per class as a float ("2", "1.5"); default if it isn't a number."""
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return default
+
 def warn_if_start_date_not_in_days(parent, start_date_str, days_str):
     from datetime import datetime
     from PyQt5.QtWidgets import QMessageBox
@@ -36,4 +52,19 @@ def warn_if_start_date_not_in_days(parent, start_date_str, days_str):
         reply = msg.exec_()
         if msg.clickedButton() == cancel_button:
             return False
-    return True
\ No newline at end of file
+    return True
+
+
+def is_real_date(d):
+    """True for DD/MM/YYYY strings; False for placeholders like 'Date3'."""
+    return isinstance(d, str) and len(d) == 10 and d[2] == "/" and d[5] == "/"
+
+
+def date_sort_key(d):
+    """Chronological sort key for DD/MM/YYYY strings without strptime. Placeholders sort after real dates."""
+    if is_real_date(d):
+        try:
+            return (0, int(d[6:]), int(d[3:5]), int(d[:2]), "")
+        except ValueError:
+            pass
+    return (1, 0, 0, 0, str(d))
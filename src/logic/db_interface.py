@@ -1,16 +1,130 @@
 import sqlite3
+import re
 from pathlib import Path
 import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from logic.migrations import delete_orphans
+from logic import query_profiler
 
 # Dynamically resolve the path to the database
 DB_PATH = Path(__file__).resolve().parents[2] / "data" / "001attendance.db"
 
+# Per-thread connection override (see use_connection)
+_thread_state = threading.local()
+
+# Bumped whenever defaults or form_settings are written; caches built from settings
+# (compiled stylesheets, reusable forms) compare against it
+_settings_version = 0
+
+
+class _BorrowedConnection:
+    """A connection owned by someone else. close() is a no-op so the helpers below can't close it."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 def get_connection():
     """Return a SQLite connection with rows as dictionaries."""
-    conn = sqlite3.connect(DB_PATH)
+    routed = getattr(_thread_state, "connection", None)
+    if routed is not None:
+        return _BorrowedConnection(routed)
+    conn = sqlite3.connect(DB_PATH, factory=query_profiler.connection_factory)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")  # deletes cascade from classes and students
     return conn
 
+def get_readonly_connection(db_path=None, check_same_thread=True):
+    """Open a read-only connection (SQLite URI mode=ro); writes through it fail instead of locking the DB."""
+    path = Path(db_path or DB_PATH).resolve()
+    conn = sqlite3.connect(
+        f"{path.as_uri()}?mode=ro", uri=True, check_same_thread=check_same_thread,
+        factory=query_profiler.connection_factory
+    )
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def bind_thread_connection(conn):
+    """Route every helper in this module through conn on the current thread (None to unbind). Returns the previous binding."""
+    previous = getattr(_thread_state, "connection", None)
+    _thread_state.connection = conn
+    return previous
+
+@contextmanager
+def use_connection(conn):
+    """Temporarily route this thread's db_interface calls through conn."""
+    previous = bind_thread_connection(conn)
+    try:
+        yield conn
+    finally:
+        bind_thread_connection(previous)
+
+@contextmanager
+def read_snapshot(conn=None):
+    """
+    Route this thread's db_interface calls through a read-only connection inside one read transaction,
+    so a report sees a single consistent state of the DB and (in WAL mode) never blocks writers.
+    conn is an open read-only connection to reuse; without one, a connection is opened for the block.
+    If this thread is already routed to a connection (e.g. an enclosing snapshot), the block just uses it.
+    """
+    if conn is None and getattr(_thread_state, "connection", None) is not None:
+        yield _thread_state.connection
+        return
+    owned = conn is None
+    if owned:
+        conn = get_readonly_connection()
+    conn.execute("BEGIN")
+    try:
+        with use_connection(conn):
+            yield conn
+    finally:
+        conn.rollback()
+        if owned:
+            conn.close()
+
+# Column names per (DB file, table), read once. The write helpers check their keys against them
+# and emit columns in table order, so the same set of keys always gives the same SQL text and
+# sqlite3 reuses one prepared statement for it on a connection.
+_column_cache = {}
+
+def table_columns(conn, table):
+    """Column names of a main-DB table, in table order."""
+    key = (str(DB_PATH), table)
+    if key not in _column_cache:
+        _column_cache[key] = tuple(_table_columns(conn, "main", table))
+    return _column_cache[key]
+
+@lru_cache(maxsize=None)
+def _statement_sql(kind, table, columns, key):
+    if kind == "update":
+        return f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE {key} = ?"
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if kind == "upsert":
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != key)
+        sql += f" ON CONFLICT ({key}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+    return sql
+
+def build_statement(conn, kind, table, data, key=None):
+    """
+    Return (sql, values) writing data (column -> value) to table: kind "insert", "update" (rows where
+    key = ?, its value appended by the caller) or "upsert" (on conflict with key).
+    Raises ValueError for keys that aren't columns of table.
+    """
+    columns = table_columns(conn, table)
+    unknown = set(data) - set(columns)
+    if unknown:
+        raise ValueError(f"Unknown {table} column(s): {', '.join(sorted(unknown))}")
+    ordered = tuple(c for c in columns if c in data)
+    return _statement_sql(kind, table, ordered, key), [data[c] for c in ordered]
+
 def get_all_classes():
     """Fetch all class records."""
     conn = get_connection()
@@ -47,6 +161,50 @@ def get_attendance_by_student(student_id):
     conn.close()
     return [dict(row) for row in rows]
 
+def get_attendance_by_class(class_no):
+    """Fetch all attendance for a class in one query as {student_id (str): {date: status}}."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT student_id, date, status FROM attendance WHERE class_no = ?", (class_no,))
+    attendance = {}
+    for row in cursor.fetchall():
+        attendance.setdefault(str(row["student_id"]), {})[row["date"]] = row["status"]
+    conn.close()
+    return attendance
+
+def get_class_summaries(active_only=True, limit=None, offset=0):
+    """Fetch one page of classes with their student counts in a single query (for report indexes)."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    sql = (
+        "SELECT c.class_no, c.company, c.teacher, c.start_date, c.finish_date, c.days, c.time, c.archive, "
+        "COUNT(s.student_id) AS student_count "
+        "FROM classes c LEFT JOIN students s ON s.class_no = c.class_no "
+    )
+    params = []
+    if active_only:
+        sql += "WHERE COALESCE(c.archive, 'No') = 'No' "
+    sql += "GROUP BY c.class_no ORDER BY c.class_no"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def count_classes(active_only=True):
+    """Count classes (active only by default)."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    if active_only:
+        cursor.execute("SELECT COUNT(*) FROM classes WHERE COALESCE(archive, 'No') = 'No'")
+    else:
+        cursor.execute("SELECT COUNT(*) FROM classes")
+    count = cursor.fetchone()[0]
+    conn.close()
+    return count
+
 def get_holidays():
     """Fetch the list of Thai holidays."""
     conn = get_connection()
@@ -56,49 +214,107 @@ def get_holidays():
     conn.close()
     return [dict(row) for row in rows]
 
+# Archived classes live in archive.db next to the working DB, attached as schema "archive".
+# Tables holding a class's rows, parents first
+ARCHIVE_TABLES = ("classes", "students", "class_students", "attendance", "dates")
+
+def get_archive_path():
+    """Path of the cold-storage DB for archived classes."""
+    return Path(DB_PATH).with_name("archive.db")
+
+def attach_archive(conn):
+    """ATTACH archive.db as "archive", creating its tables from the live schema on first use."""
+    if "archive" not in {row[1] for row in conn.execute("PRAGMA database_list")}:
+        conn.execute("ATTACH DATABASE ? AS archive", (str(get_archive_path()),))
+    existing = {row[0] for row in conn.execute("SELECT name FROM archive.sqlite_master WHERE type = 'table'")}
+    for table in ARCHIVE_TABLES:
+        if table not in existing:
+            row = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+            # Tables rebuilt by a migration are stored as CREATE TABLE "name"
+            conn.execute(re.sub(r'^CREATE TABLE\s+"?\w+"?', f"CREATE TABLE archive.{table}", row[0], count=1))
+
+def _table_columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def _move_class_rows(conn, class_no, source, target):
+    """Copy a class's rows from schema source to target, then delete them from source (caller commits)."""
+    for table in ARCHIVE_TABLES:
+        # Only the columns both sides have, so an older archive.db still takes rows
+        target_columns = set(_table_columns(conn, target, table))
+        columns = ", ".join(c for c in _table_columns(conn, source, table) if c in target_columns)
+        conn.execute(
+            f"INSERT INTO {target}.{table} ({columns}) SELECT {columns} FROM {source}.{table} WHERE class_no = ?",
+            (class_no,)
+        )
+    for table in reversed(ARCHIVE_TABLES):
+        conn.execute(f"DELETE FROM {source}.{table} WHERE class_no = ?", (class_no,))
+
 def set_class_archived(class_no, archived=True):
-    """Set the archive status of a class."""
+    """
+    Set the archive status of a class. Archiving moves the class with its students, attendance
+    and dates into archive.db; restoring moves them back. Each is one transaction.
+    Raises ValueError if the other DB already has a class with that class_no.
+    """
+    source, target = ("main", "archive") if archived else ("archive", "main")
     conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE classes SET archive = ? WHERE class_no = ?",
-        ("Yes" if archived else "No", class_no)
-    )
-    conn.commit()
+    try:
+        attach_archive(conn)
+        if conn.execute(f"SELECT 1 FROM {target}.classes WHERE class_no = ?", (class_no,)).fetchone():
+            raise ValueError(f"Class {class_no} already exists in the {'archive' if archived else 'working'} database.")
+        conn.execute(
+            f"UPDATE {source}.classes SET archive = ? WHERE class_no = ?",
+            ("Yes" if archived else "No", class_no)
+        )
+        _move_class_rows(conn, class_no, source, target)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_archived_classes(search=None):
+    """Fetch archived class records from archive.db, optionally matching search in class_no, company or teacher."""
+    if not get_archive_path().exists():
+        return []
+    conn = get_connection()
+    attach_archive(conn)
+    sql = "SELECT * FROM archive.classes"
+    params = ()
+    if search:
+        sql += " WHERE class_no LIKE ? OR company LIKE ? OR teacher LIKE ?"
+        params = (f"%{search}%",) * 3
+    rows = conn.execute(sql + " ORDER BY class_no", params).fetchall()
     conn.close()
+    return [dict(row) for row in rows]
+
+def archive_flagged_classes():
+    """Move classes still flagged archive = 'Yes' in the working DB (from before archive.db) into archive.db."""
+    conn = get_connection()
+    class_nos = [row[0] for row in conn.execute("SELECT class_no FROM classes WHERE archive = 'Yes'")]
+    conn.close()
+    for class_no in class_nos:
+        set_class_archived(class_no, archived=True)
+    return class_nos
 
 def insert_class(class_data):
     """Insert a new class into the database."""
     conn = get_connection()
     cursor = conn.cursor()
-    fields = ', '.join(class_data.keys())
-    placeholders = ', '.join(['?'] * len(class_data))
-    cursor.execute(
-        f"INSERT INTO classes ({fields}) VALUES ({placeholders})",
-        tuple(class_data.values())
-    )
+    sql, values = build_statement(conn, "insert", "classes", class_data)
+    cursor.execute(sql, values)
     conn.commit()
     conn.close()
 
 def update_class(class_no, class_data):
     """Update an existing class in the database."""
-    # print(f"[DEBUG] update_class: Attempting to update {class_no} with: {class_data}")
+    if not class_data:
+        return
     conn = get_connection()
     cursor = conn.cursor()
-    # Print current values before update
-    cursor.execute("SELECT * FROM classes WHERE class_no = ?", (class_no,))
-    before = cursor.fetchone()
-    # print(f"[DEBUG] update_class: Before update: {before}")
-    assignments = ', '.join([f"{k}=?" for k in class_data.keys()])
-    cursor.execute(
-        f"UPDATE classes SET {assignments} WHERE class_no = ?",
-        tuple(class_data.values()) + (class_no,)
-    )
+    sql, values = build_statement(conn, "update", "classes", class_data, key="class_no")
+    cursor.execute(sql, values + [class_no])
     conn.commit()
-    # Print values after update
-    cursor.execute("SELECT * FROM classes WHERE class_no = ?", (class_no,))
-    after = cursor.fetchone()
-    # print(f"[DEBUG] update_class: After update: {after}")
     conn.close()
 
 def insert_student(student_data):
@@ -107,47 +323,143 @@ def insert_student(student_data):
     cursor = conn.cursor()
     student_data = dict(student_data)
     student_data.pop("student_id", None)  # Let SQLite auto-assign
-    fields = ', '.join(student_data.keys())
-    placeholders = ', '.join(['?'] * len(student_data))
-    cursor.execute(
-        f"INSERT INTO students ({fields}) VALUES ({placeholders})",
-        tuple(student_data.values())
-    )
+    sql, values = build_statement(conn, "insert", "students", student_data)
+    cursor.execute(sql, values)
+    new_id = cursor.lastrowid
     conn.commit()
     conn.close()
+    return new_id
+
+def insert_students_bulk(class_no, students, default_attendance=None):
+    """
+    Insert many students (plus class_students and default attendance rows) in one transaction.
+    IDs are allocated once up front. A row that fails is rolled back on its own and reported;
+    the rest of the batch still commits.
+    Returns (inserted_ids, errors) where errors is a list of (index_in_students, message).
+    """
+    attendance_items = list((default_attendance or {}).items())
+    inserted_ids = []
+    errors = []
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        # Allocate IDs in one step: continue after both the live max and the AUTOINCREMENT high-water mark
+        cursor.execute("SELECT MAX(student_id) FROM students")
+        max_id = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'students'")
+        row = cursor.fetchone()
+        next_id = max(int(max_id), int(row[0]) if row else 0) + 1
+
+        for index, student in enumerate(students):
+            record = dict(student)
+            record.pop("student_id", None)
+            record["class_no"] = class_no
+            record["student_id"] = next_id
+            try:
+                sql, values = build_statement(conn, "insert", "students", record)
+            except ValueError as e:
+                errors.append((index, str(e)))  # unknown columns: report the row, keep the batch
+                continue
+            cursor.execute("SAVEPOINT bulk_student")
+            try:
+                cursor.execute(sql, values)
+                cursor.execute(
+                    "INSERT OR IGNORE INTO class_students (class_no, student_id) VALUES (?, ?)",
+                    (class_no, str(next_id))
+                )
+                if attendance_items:
+                    cursor.executemany(
+                        "INSERT OR REPLACE INTO attendance (class_no, student_id, date, status) VALUES (?, ?, ?, ?)",
+                        [(class_no, str(next_id), date, status) for date, status in attendance_items]
+                    )
+                cursor.execute("RELEASE SAVEPOINT bulk_student")
+                inserted_ids.append(next_id)
+                next_id += 1
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_student")
+                cursor.execute("RELEASE SAVEPOINT bulk_student")
+                errors.append((index, str(e)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return inserted_ids, errors
 
 def update_student(student_id, student_data):
     """Update an existing student in the database."""
+    if not student_data:
+        return
     conn = get_connection()
     cursor = conn.cursor()
-    assignments = ', '.join([f"{k}=?" for k in student_data.keys()])
-    cursor.execute(
-        f"UPDATE students SET {assignments} WHERE student_id = ?",
-        tuple(student_data.values()) + (student_id,)
-    )
+    sql, values = build_statement(conn, "update", "students", student_data, key="student_id")
+    cursor.execute(sql, values + [student_id])
     conn.commit()
     conn.close()
 
 def delete_student(student_id):
-    """Delete a student from the database by student_id."""
+    """Delete a student; their attendance and class_students rows go with them (ON DELETE CASCADE)."""
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("DELETE FROM students WHERE student_id = ?", (student_id,))
-    # Optionally, also delete attendance records for this student:
-    cursor.execute("DELETE FROM attendance WHERE student_id = ?", (student_id,))
     conn.commit()
     conn.close()
 
 def delete_class(class_no):
-    """Delete a class and all associated students and attendance from the database."""
+    """Delete a class; its students, attendance, dates and class_students rows cascade (also in archive.db)."""
     conn = get_connection()
+    in_archive = get_archive_path().exists()
+    if in_archive:
+        attach_archive(conn)  # ATTACH must come before the transaction starts
     cursor = conn.cursor()
     cursor.execute("DELETE FROM classes WHERE class_no = ?", (class_no,))
-    cursor.execute("DELETE FROM students WHERE class_no = ?", (class_no,))
-    cursor.execute("DELETE FROM attendance WHERE class_no = ?", (class_no,))
+    if in_archive:
+        # archive.db tables created before the cascades existed don't have them: children first
+        for table in reversed(ARCHIVE_TABLES):
+            cursor.execute(f"DELETE FROM archive.{table} WHERE class_no = ?", (class_no,))
     conn.commit()
     conn.close()
 
+def _schema_bytes(conn, schema):
+    return conn.execute(f"PRAGMA {schema}.page_count").fetchone()[0] * conn.execute(f"PRAGMA {schema}.page_size").fetchone()[0]
+
+def purge_orphans(vacuum=True):
+    """
+    Delete attendance, dates, class_students and students rows whose class or student is gone,
+    in the working DB and archive.db, then VACUUM whichever file lost rows.
+    Returns ({table: rows deleted}, bytes reclaimed); archive tables are keyed "archive.<table>".
+    """
+    conn = get_connection()
+    schemas = ["main"]
+    if get_archive_path().exists():
+        attach_archive(conn)
+        schemas.append("archive")
+    deleted = {}
+    reclaimed = 0
+    try:
+        for schema in schemas:
+            counts = delete_orphans(conn, schema)
+            conn.commit()
+            prefix = "" if schema == "main" else f"{schema}."
+            deleted.update({prefix + table: count for table, count in counts.items()})
+            if counts and vacuum:
+                before = _schema_bytes(conn, schema)
+                conn.execute(f"VACUUM {schema}")
+                reclaimed += before - _schema_bytes(conn, schema)
+    finally:
+        conn.close()
+    return deleted, reclaimed
+
+def get_settings_version():
+    """Return a counter that changes whenever defaults or form_settings are written in this process."""
+    return _settings_version
+
+def _bump_settings_version():
+    global _settings_version
+    _settings_version += 1
+
 def get_default(key):
     """Fetch a single default value by key."""
     conn = get_connection()
@@ -176,7 +488,23 @@ def set_default(key, value):
     )
     conn.commit()
     conn.close()
+    _bump_settings_version()
+
+def get_app_state(key):
+    """Fetch a value the app remembers between runs (app_state), or None."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT value FROM app_state WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    conn.close()
+    return row["value"] if row else None
 
+def set_app_state(key, value):
+    """Remember a value between runs. Not a setting, so the settings version is left alone."""
+    conn = get_connection()
+    conn.execute("INSERT OR REPLACE INTO app_state (key, value) VALUES (?, ?)", (key, str(value)))
+    conn.commit()
+    conn.close()
 
 def set_all_defaults(defaults_dict):
     """Set or update multiple defaults in the database (including color_toggle)."""
@@ -202,6 +530,7 @@ def set_all_defaults(defaults_dict):
         logging.error(f"Error committing transaction: {e}")
     finally:
         conn.close()
+        _bump_settings_version()
 
 def insert_date(class_no, date, note=""):
     """Insert a date for a class into the dates table."""
@@ -225,6 +554,53 @@ def delete_date(class_no, date):
     conn.commit()
     conn.close()
 
+# Attendance marks that make a date "protected" (it can't be dropped from the schedule)
+PROTECTED_STATUSES = ("P", "A", "L", "CIA", "COD", "HOL")
+
+def get_protected_dates(class_no):
+    """Return the set of dates on which any student of the class has a P/A/L/CIA/COD/HOL mark."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    placeholders = ', '.join(['?'] * len(PROTECTED_STATUSES))
+    cursor.execute(
+        f"SELECT DISTINCT date FROM attendance WHERE class_no = ? AND status IN ({placeholders})",
+        (class_no,) + PROTECTED_STATUSES
+    )
+    dates = {row[0] for row in cursor.fetchall()}
+    conn.close()
+    return dates
+
+def reconcile_class_dates(class_no, new_dates):
+    """
+    Make the dates table for a class match new_dates, as one diff applied in a single transaction.
+    Dates that stay keep their notes. Removed dates also drop their blank ('-' / '') attendance rows.
+    Returns (added, removed) as sets.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT date FROM dates WHERE class_no = ?", (class_no,))
+        old = {row[0] for row in cursor.fetchall()}
+        new = set(new_dates)
+        added = new - old
+        removed = old - new
+        if removed:
+            cursor.executemany("DELETE FROM dates WHERE class_no = ? AND date = ?", [(class_no, d) for d in removed])
+            cursor.executemany(
+                "DELETE FROM attendance WHERE class_no = ? AND date = ? AND COALESCE(status, '') IN ('', '-')",
+                [(class_no, d) for d in removed]
+            )
+        if added:
+            cursor.executemany("INSERT OR IGNORE INTO dates (class_no, date, note) VALUES (?, ?, '')", [(class_no, d) for d in added])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return added, removed
+
 def set_attendance(class_no, student_id, date, status):
     """Set or update attendance for a student on a specific date."""
     conn = get_connection()
@@ -236,6 +612,55 @@ def set_attendance(class_no, student_id, date, status):
     conn.commit()
     conn.close()
 
+def set_attendance_bulk(class_no, cells, date_notes=None):
+    """
+    Apply many attendance marks (and date notes) in one transaction.
+    cells is [(student_id, date, status)] and date_notes {date: note}; a status or note of None
+    deletes the row. Returns the values they replaced in the same shapes, i.e. the edit that
+    undoes this one.
+    """
+    date_notes = date_notes or {}
+    previous_cells = []
+    previous_notes = {}
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        # Current marks, one query per date touched (a column edit is a single date)
+        current = {}
+        for date in {date for _student_id, date, _status in cells}:
+            cursor.execute("SELECT student_id, status FROM attendance WHERE class_no = ? AND date = ?", (class_no, date))
+            current.update({(str(row[0]), date): row[1] for row in cursor.fetchall()})
+        for student_id, date, status in cells:
+            previous_cells.append((student_id, date, current.get((str(student_id), date))))
+        for date in date_notes:
+            cursor.execute("SELECT note FROM dates WHERE class_no = ? AND date = ?", (class_no, date))
+            row = cursor.fetchone()
+            previous_notes[date] = row[0] if row else None
+        cursor.executemany(
+            "INSERT OR REPLACE INTO attendance (class_no, student_id, date, status) VALUES (?, ?, ?, ?)",
+            [(class_no, student_id, date, status) for student_id, date, status in cells if status is not None]
+        )
+        cursor.executemany(
+            "DELETE FROM attendance WHERE class_no = ? AND student_id = ? AND date = ?",
+            [(class_no, student_id, date) for student_id, date, status in cells if status is None]
+        )
+        cursor.executemany(
+            "INSERT OR REPLACE INTO dates (class_no, date, note) VALUES (?, ?, ?)",
+            [(class_no, date, note) for date, note in date_notes.items() if note is not None]
+        )
+        cursor.executemany(
+            "DELETE FROM dates WHERE class_no = ? AND date = ?",
+            [(class_no, date) for date, note in date_notes.items() if note is None]
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return previous_cells, previous_notes
+
 def get_form_settings(form_name):
     """Fetch per-form settings as a dict for the given form_name (e.g., 'MetadataForm')."""
     conn = get_connection()
@@ -249,19 +674,14 @@ def set_form_settings(form_name, settings_dict):
     """Insert or update per-form settings for the given form_name. settings_dict keys must match table columns (except form_name)."""
     conn = get_connection()
     cursor = conn.cursor()
-    # Remove form_name if present in dict
     settings = dict(settings_dict)
-    settings.pop("form_name", None)
-    columns = ["form_name"] + list(settings.keys())
-    placeholders = ["?"] * len(columns)
-    values = [form_name] + [settings[k] for k in settings.keys()]
-    assignments = ', '.join([f"{k}=?" for k in settings.keys()])
-    # Try update first, then insert if not exists
-    cursor.execute(f"UPDATE form_settings SET {assignments} WHERE form_name = ?", values[1:] + [form_name])
-    if cursor.rowcount == 0:
-        cursor.execute(f"INSERT INTO form_settings ({', '.join(columns)}) VALUES ({', '.join(placeholders)})", values)
+    settings["form_name"] = form_name
+    # One upsert: the other columns of an existing row are left alone
+    sql, values = build_statement(conn, "upsert", "form_settings", settings, key="form_name")
+    cursor.execute(sql, values)
     conn.commit()
     conn.close()
+    _bump_settings_version()
 
 def get_teacher_defaults():
     """Fetch all teacher defaults as a dict."""
@@ -281,20 +701,18 @@ def set_teacher_defaults(new_defaults):
     conn.commit()
     conn.close()
 
+MESSAGE_DEFAULT_KEYS = (
+    "message_bg_color", "message_fg_color", "message_border_color", "message_border_width",
+    "message_border_radius", "message_padding", "message_font_size", "message_font_bold"
+)
+
 def get_message_defaults():
     """Fetch message style defaults as a dict from the defaults table."""
     conn = get_connection()
     cursor = conn.cursor()
-    keys = [
-        "message_bg_color", "message_fg_color", "message_border_color", "message_border_width",
-        "message_border_radius", "message_padding", "message_font_size", "message_font_bold"
-    ]
-    d = {}
-    for key in keys:
-        cursor.execute("SELECT value FROM defaults WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        if row:
-            d[key] = row["value"]
+    placeholders = ",".join("?" * len(MESSAGE_DEFAULT_KEYS))
+    cursor.execute(f"SELECT key, value FROM defaults WHERE key IN ({placeholders})", MESSAGE_DEFAULT_KEYS)
+    d = {row["key"]: row["value"] for row in cursor.fetchall()}
     conn.close()
     return d
 
@@ -324,3 +742,73 @@ def get_factory_defaults():
     classes_default = {row[0]: row[1] for row in cursor.fetchall()}
     conn.close()
     return {"classes": {"default": classes_default}}
+
+def changes_since(seq=0, tables=None, limit=None):
+    """
+    Journalled writes after seq, oldest first, as dicts with seq, table_name, row_key, class_no,
+    op (insert/update/delete) and changed_at (UTC). row_key is class_no, student_id, date, or
+    "student_id|date" for attendance. Rows written before the journal existed are not listed,
+    so a consumer does one full read, then keeps latest_change_seq() and asks for what followed.
+    """
+    sql = "SELECT seq, table_name, row_key, class_no, op, changed_at FROM changes WHERE seq > ?"
+    params = [seq]
+    if tables:
+        sql += f" AND table_name IN ({','.join('?' * len(tables))})"
+        params.extend(tables)
+    sql += " ORDER BY seq"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+def latest_change_seq():
+    """seq of the newest journalled write (0 if none)."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(seq) FROM changes")
+    seq = cursor.fetchone()[0]
+    conn.close()
+    return seq or 0
+
+def get_class_last_change(class_no, tables=None):
+    """(seq, changed_at) of the newest journalled write to a class (to tables, if given), or (0, None) if it has none."""
+    sql = "SELECT seq, changed_at FROM changes WHERE class_no = ?"
+    params = [class_no]
+    if tables:
+        sql += f" AND table_name IN ({','.join('?' * len(tables))})"
+        params.extend(tables)
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(sql + " ORDER BY seq DESC LIMIT 1", params)
+    row = cursor.fetchone()
+    conn.close()
+    return (row[0], row[1]) if row else (0, None)
+
+def get_class_version(class_no):
+    """Return a fingerprint of a class's stored data (class row, students, attendance, dates).
+    The value changes whenever anything that appears on the class's report changes."""
+    import hashlib
+    conn = get_connection()
+    cursor = conn.cursor()
+    digest = hashlib.sha1()
+    for sql in (
+        "SELECT * FROM classes WHERE class_no = ?",
+        "SELECT * FROM students WHERE class_no = ? ORDER BY student_id",
+        "SELECT student_id, date, status FROM attendance WHERE class_no = ? ORDER BY student_id, date",
+        "SELECT date, note FROM dates WHERE class_no = ? ORDER BY date",
+    ):
+        cursor.execute(sql, (class_no,))
+        for row in cursor:
+            digest.update(repr(tuple(row)).encode("utf-8"))
+    conn.close()
+    return digest.hexdigest()
+
+# Opt-in profiling (BLUECARD_DB_PROFILE=1): time every public function above; done at import so
+# modules that import these functions by name get the timed versions
+if query_profiler.ENABLED:
+    query_profiler.instrument(globals(), __name__)
@@ -1,8 +1,13 @@
 import os
+import re
+import sys
 import sqlite3
 import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
 
-# output 001attendance.db to 001attendance_data.json
+# output 001attendance.db to 001attendance_data.json, or (--incremental) to per-class files under data/export
 # Paths
 SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
@@ -10,52 +15,177 @@ DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 DB_PATH = os.path.join(DATA_DIR, "001attendance.db")
 OUTPUT_JSON = os.path.join(DATA_DIR, "001attendance_data.json")  # Changed output filename
 
-def export_db_to_json(db_path=DB_PATH, output_json=OUTPUT_JSON):
-    conn = sqlite3.connect(db_path)
+EXPORT_DIR = os.path.join(DATA_DIR, "export")  # incremental export: index.json + classes/<class_no>.json
+INDEX_NAME = "index.json"
+ARCHIVE_NAME = "archive.db"  # archived classes, next to the working DB (db_interface.get_archive_path)
+
+
+def open_snapshot(db_path):
+    """
+    Read-only connection to db_path with archive.db attached as "archive" when it exists.
+    Returns (conn, schemas): the schemas to export classes from, working DB first.
+    """
+    # Read-only, and one read transaction for the whole export: a consistent snapshot that
+    # doesn't hold up writes from the app
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
     conn.row_factory = sqlite3.Row
+    schemas = ["main"]
+    archive_path = Path(db_path).resolve().with_name(ARCHIVE_NAME)
+    if archive_path.exists():
+        conn.execute("ATTACH DATABASE ? AS archive", (f"{archive_path.as_uri()}?mode=ro",))
+        if conn.execute("SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = 'classes'").fetchone():
+            schemas.append("archive")
+    conn.execute("BEGIN")
+    return conn, schemas
+
+
+def export_class(cur, class_row, schema="main"):
+    """{"metadata": ..., "students": {"S001": ...}} for one class, as in 001attendance_data.json."""
+    class_no = class_row["class_no"]
+    metadata = dict(class_row)
+    attendance_by_student = {}
+    cur.execute(f"SELECT student_id, date, status FROM {schema}.attendance WHERE class_no = ? ORDER BY student_id, date", (class_no,))
+    for attn_row in cur.fetchall():
+        attendance_by_student.setdefault(str(attn_row["student_id"]), {})[attn_row["date"]] = attn_row["status"]
+    students = {}
+    # Get all students for this class
+    cur.execute(f"SELECT * FROM {schema}.students WHERE class_no = ? ORDER BY student_id", (class_no,))
+    for idx, student_row in enumerate(cur.fetchall(), 1):
+        # Use S001, S002, ... as keys
+        student_key = f"S{idx:03d}"
+        student = dict(student_row)
+        student.pop("class_no", None)
+        student.pop("student_id", None)
+        # Stringify all fields except attendance
+        for k in list(student.keys()):
+            student[k] = str(student[k]) if student[k] is not None else ""
+        student["attendance"] = attendance_by_student.get(str(student_row["student_id"]), {})
+        students[student_key] = student
+    # Dates for this class
+    cur.execute(f"SELECT date FROM {schema}.dates WHERE class_no = ? ORDER BY date", (class_no,))
+    metadata["dates"] = [row["date"] for row in cur.fetchall()]
+    # Stringify all metadata fields except 'dates'
+    for k in list(metadata.keys()):
+        if k != "dates":
+            metadata[k] = str(metadata[k]) if metadata[k] is not None else ""
+    return {"metadata": metadata, "students": students}
+
+
+def export_db_to_json(db_path=DB_PATH, output_json=OUTPUT_JSON):
+    conn, schemas = open_snapshot(db_path)
     cur = conn.cursor()
     data = {"classes": {}}
 
-    # Get all classes
-    cur.execute("SELECT * FROM classes")
-    for class_row in cur.fetchall():
-        class_no = class_row["class_no"]
-        metadata = dict(class_row)
-        students = {}
-        # Get all students for this class
-        cur.execute("SELECT * FROM students WHERE class_no = ? ORDER BY student_id", (class_no,))
-        for idx, student_row in enumerate(cur.fetchall(), 1):
-            # Use S001, S002, ... as keys
-            student_key = f"S{idx:03d}"
-            student = dict(student_row)
-            student.pop("class_no", None)
-            student.pop("student_id", None)
-            # Stringify all fields except attendance
-            for k in list(student.keys()):
-                student[k] = str(student[k]) if student[k] is not None else ""
-            # Attendance for this student
-            attendance = {}
-            cur.execute("SELECT date, status FROM attendance WHERE class_no = ? AND student_id = ?", (class_no, student_row["student_id"]))
-            for attn_row in cur.fetchall():
-                attendance[attn_row["date"]] = attn_row["status"]
-            student["attendance"] = attendance
-            students[student_key] = student
-        # Dates for this class
-        cur.execute("SELECT date FROM dates WHERE class_no = ? ORDER BY date", (class_no,))
-        dates = [row["date"] for row in cur.fetchall()]
-        metadata["dates"] = dates
-        # Stringify all metadata fields except 'dates'
-        for k in list(metadata.keys()):
-            if k != "dates":
-                metadata[k] = str(metadata[k]) if metadata[k] is not None else ""
-        data["classes"][class_no] = {
-            "metadata": metadata,
-            "students": students
-        }
+    # Get all classes, archived ones (archive = 'Yes', from archive.db) included
+    for schema in schemas:
+        cur.execute(f"SELECT * FROM {schema}.classes")
+        for class_row in cur.fetchall():
+            data["classes"][class_row["class_no"]] = export_class(cur, class_row, schema)
+    conn.rollback()
+    conn.close()
     # Write to JSON
     with open(output_json, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
     print(f"[INFO] Exported DB to JSON: {output_json}")
 
+
+def class_file_name(class_no):
+    """
+    classes/<class_no>-<hash>.json. The short hash of the exact class_no keeps classes whose
+    file-safe names match ("A/1" and "A_1", or "a1" and "A1" on a case-insensitive disk) apart.
+    """
+    readable = re.sub(r"[^\w.-]", "_", class_no)
+    digest = hashlib.sha1(class_no.encode("utf-8")).hexdigest()[:8]
+    return f"classes/{readable}-{digest}.json"
+
+
+def write_json_atomic(path, data):
+    """Write via a temp file and rename, so a reader never sees a half-written file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def export_db_to_json_incremental(db_path=DB_PATH, output_dir=EXPORT_DIR):
+    """
+    Export one JSON file per class plus index.json, rewriting only the classes journalled in
+    changes since the last run (index.json's seq). Falls back to exporting every class when there
+    is no index yet, the DB has no journal, or the index's seq doesn't belong to this DB's journal
+    (DB restored or rebuilt). Archived classes (archive.db) are exported too; moving a class in or
+    out of the archive is journalled in the working DB, and classes deleted from the archive, which
+    has no journal, are found by checking the index against the classes that exist.
+    Returns (class_nos written, class_nos removed).
+    """
+    index_path = os.path.join(output_dir, INDEX_NAME)
+    os.makedirs(os.path.join(output_dir, "classes"), exist_ok=True)
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = None
+
+    conn, schemas = open_snapshot(db_path)
+    cur = conn.cursor()
+    has_journal = cur.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'changes'").fetchone()
+    seq, changed_at = 0, None
+    if has_journal:
+        row = cur.execute("SELECT seq, changed_at FROM changes ORDER BY seq DESC LIMIT 1").fetchone()
+        if row:
+            seq, changed_at = row["seq"], row["changed_at"]
+
+    full = not (index and has_journal)
+    if not full:
+        # The last exported change must still be in this DB's journal, with the same timestamp
+        last = cur.execute("SELECT changed_at FROM changes WHERE seq = ?", (index["seq"],)).fetchone()
+        full = index["seq"] > 0 and (last is None or last["changed_at"] != index["changed_at"])
+    classes = {} if full else dict(index["classes"])
+    existing = {}  # class_no -> schema
+    for schema in reversed(schemas):  # a class_no in both (never expected) exports the working DB's
+        cur.execute(f"SELECT class_no FROM {schema}.classes")
+        existing.update((row["class_no"], schema) for row in cur.fetchall())
+    if full:
+        targets = list(existing)
+    else:
+        cur.execute("SELECT DISTINCT class_no FROM changes WHERE seq > ? AND class_no IS NOT NULL", (index["seq"],))
+        targets = [row["class_no"] for row in cur.fetchall()]
+        targets += [class_no for class_no in classes if class_no not in existing and class_no not in targets]
+
+    written, removed = [], []
+    for class_no in targets:
+        schema = existing.get(class_no)
+        if schema is None:
+            if classes.pop(class_no, None) is not None:
+                removed.append(class_no)
+            continue
+        class_row = cur.execute(f"SELECT * FROM {schema}.classes WHERE class_no = ?", (class_no,)).fetchone()
+        file_name = class_file_name(class_no)
+        write_json_atomic(os.path.join(output_dir, file_name), export_class(cur, class_row, schema))
+        classes[class_no] = {"file": file_name}
+        written.append(class_no)
+    conn.rollback()
+    conn.close()
+    if full and index:
+        removed = sorted(set(index["classes"]) - set(classes))
+
+    # Drop files of classes no longer in the index (deleted, or left over from before a full export)
+    kept = {entry["file"] for entry in classes.values()}
+    for name in os.listdir(os.path.join(output_dir, "classes")):
+        if f"classes/{name}" not in kept:
+            os.remove(os.path.join(output_dir, "classes", name))
+    # The index goes last: if the export stops part way, the next run redoes these classes
+    write_json_atomic(index_path, {
+        "seq": seq,
+        "changed_at": changed_at,
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+        "classes": dict(sorted(classes.items())),
+    })
+    print(f"[INFO] {'Full' if full else 'Incremental'} export to {output_dir}: {len(written)} class file(s) written, {len(removed)} removed")
+    return written, removed
+
+
 if __name__ == "__main__":
-    export_db_to_json()
+    if "--incremental" in sys.argv[1:]:
+        export_db_to_json_incremental()
+    else:
+        export_db_to_json()
@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import time
+import logging
+
+# In-place schema upgrades, tracked with PRAGMA user_version.
+# Each migration runs in its own transaction together with its user_version bump, so a DB is
+# always at a whole version: a failing step rolls back and leaves the DB at the previous one.
+# recreate_db runs these on the schema it creates, so new and upgraded DBs end up the same;
+# a migration must therefore work on any DB at the previous version (IF NOT EXISTS etc.).
+# Steps run with foreign keys off, as SQLite's table-rebuild procedure needs.
+
+SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
+DB_PATH = os.path.join(SCRIPT_DIR, "..", "..", "data", "001attendance.db")
+
+
+def add_lookup_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_class_status ON attendance (class_no, status, date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student ON attendance (student_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_students_class ON students (class_no)")
+
+
+# Tables rebuilt by add_delete_cascades: deleting a class or student takes its rows with it
+CASCADE_SCHEMA = {
+    "students": """CREATE TABLE students (
+        student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        class_no TEXT,
+        name TEXT,
+        nickname TEXT,
+        company_no TEXT,
+        gender TEXT,
+        score TEXT,
+        pre_test TEXT,
+        post_test TEXT,
+        note TEXT,
+        active TEXT,
+        FOREIGN KEY (class_no) REFERENCES classes(class_no) ON DELETE CASCADE ON UPDATE CASCADE
+    )""",
+    "class_students": """CREATE TABLE class_students (
+        class_no TEXT,
+        student_id TEXT,
+        PRIMARY KEY (class_no, student_id),
+        FOREIGN KEY (class_no) REFERENCES classes(class_no) ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    )""",
+    "attendance": """CREATE TABLE attendance (
+        class_no TEXT,
+        student_id TEXT,
+        date TEXT,
+        status TEXT,
+        PRIMARY KEY (class_no, student_id, date),
+        FOREIGN KEY (class_no) REFERENCES classes(class_no) ON DELETE CASCADE ON UPDATE CASCADE,
+        FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+    )""",
+    "dates": """CREATE TABLE dates (
+        class_no TEXT,
+        date TEXT,
+        note TEXT,
+        PRIMARY KEY (class_no, date),
+        FOREIGN KEY (class_no) REFERENCES classes(class_no) ON DELETE CASCADE ON UPDATE CASCADE
+    )""",
+}
+
+
+def rebuild_table(conn, table, create_sql):
+    """
+    Replace table with the definition in create_sql (CREATE TABLE <table> ...), keeping its rows,
+    indexes, triggers and AUTOINCREMENT counter. SQLite can't ALTER constraints, so this is its
+    create-copy-drop-rename procedure; foreign keys must be off.
+    """
+    indexes = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL", (table,)
+    )]
+    has_sequence = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone()
+    seq = has_sequence and conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    rebuilt = f"{table}_rebuilt"
+    conn.execute(create_sql.replace(f"CREATE TABLE {table}", f"CREATE TABLE {rebuilt}", 1))
+    new_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({rebuilt})")}
+    columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] in new_columns)
+    conn.execute(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
+    for sql in indexes:
+        conn.execute(sql)
+    if seq:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq[0], table))
+
+
+def delete_orphans(conn, schema="main"):
+    """
+    Delete every row whose foreign key points at a missing class or student (PRAGMA foreign_key_check),
+    repeating until none are left: with foreign keys off, dropping an orphaned student orphans its rows.
+    Returns {table: rows deleted}; the caller commits.
+    """
+    deleted = {}
+    while True:
+        orphans = {}
+        for table, rowid, _parent, _fkid in conn.execute(f"PRAGMA {schema}.foreign_key_check").fetchall():
+            orphans.setdefault(table, set()).add(rowid)
+        if not orphans:
+            return deleted
+        for table, rowids in orphans.items():
+            conn.executemany(f"DELETE FROM {schema}.{table} WHERE rowid = ?", [(rowid,) for rowid in rowids])
+            deleted[table] = deleted.get(table, 0) + len(rowids)
+
+
+def add_delete_cascades(conn):
+    for table, create_sql in CASCADE_SCHEMA.items():
+        rebuild_table(conn, table, create_sql)
+    delete_orphans(conn)
+
+
+# Tables journalled in changes: table -> (row key, class_no), as expressions over the NEW/OLD row
+JOURNAL_KEYS = {
+    "classes": ("{row}.class_no", "{row}.class_no"),
+    "students": ("{row}.student_id", "{row}.class_no"),
+    "attendance": ("{row}.student_id || '|' || {row}.date", "{row}.class_no"),
+    "dates": ("{row}.date", "{row}.class_no"),
+}
+
+
+def journal_insert(table, op, row):
+    key, class_no = (expr.format(row=row) for expr in JOURNAL_KEYS[table])
+    return f"INSERT INTO changes (table_name, row_key, class_no, op) VALUES ('{table}', {key}, {class_no}, '{op}');"
+
+
+def add_change_journal(conn):
+    """
+    changes gets one row per write to classes, students, attendance and dates, from triggers, so
+    every writer (the app, imports, scripts) is covered. Cascaded deletes fire the triggers too.
+    """
+    conn.execute("""CREATE TABLE IF NOT EXISTS changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_key TEXT NOT NULL,
+        class_no TEXT,
+        op TEXT NOT NULL,
+        changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_changes_class ON changes (class_no, seq)")
+    for table, (key, class_no) in JOURNAL_KEYS.items():
+        for op, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_journal_{op} AFTER {op.upper()} ON {table} "
+                f"BEGIN {journal_insert(table, op, row)} END"
+            )
+        # An update that moves a row (renamed class, student moved to another class) also retires the old key
+        moved = " OR ".join(
+            f"{expr.format(row='OLD')} IS NOT {expr.format(row='NEW')}" for expr in dict.fromkeys((key, class_no))
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_journal_move AFTER UPDATE ON {table} WHEN {moved} "
+            f"BEGIN {journal_insert(table, 'delete', 'OLD')} END"
+        )
+
+
+def add_app_state(conn):
+    """
+    app_state holds what the app remembers between runs (the last opened class), apart from the
+    defaults table: those are user settings, and writing them invalidates cached forms and styles.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS app_state (key TEXT PRIMARY KEY, value TEXT)")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'defaults'").fetchone():
+        conn.execute("INSERT OR IGNORE INTO app_state (key, value) SELECT key, value FROM defaults WHERE key = 'last_opened_class'")
+        conn.execute("DELETE FROM defaults WHERE key = 'last_opened_class'")
+
+
+# (version, description, step); versions are consecutive and never reused
+MIGRATIONS = [
+    (1, "Index attendance by class/status/date and by student, students by class", add_lookup_indexes),
+    (2, "Cascade class and student deletes to their rows; drop orphaned rows", add_delete_cascades),
+    (3, "Journal writes to classes, students, attendance and dates in changes", add_change_journal),
+    (4, "Keep app state (last opened class) in app_state instead of defaults", add_app_state),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=None, report=print):
+    """
+    Apply the pending migrations up to target (default: latest), one transaction each.
+    Returns [(version, description, seconds)] for the steps applied; report gets one line per step.
+    """
+    target = LATEST_VERSION if target is None else target
+    current = get_schema_version(conn)
+    if current > LATEST_VERSION:
+        logging.warning(f"DB schema version {current} is newer than this app ({LATEST_VERSION})")
+    if conn.in_transaction:
+        conn.commit()
+    # WAL lets reports read from a snapshot (db_interface.read_snapshot) without blocking writers;
+    # the mode is stored in the DB file, so setting it here covers new and upgraded DBs
+    conn.execute("PRAGMA journal_mode = WAL")
+    applied = []
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # explicit BEGIN/COMMIT, so DDL is part of the transaction
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")  # a no-op inside a transaction, so set it up front
+    try:
+        for version, description, step in MIGRATIONS:
+            if version <= current or version > target:
+                continue
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                logging.exception(f"Migration {version} failed: {description}")
+                raise
+            elapsed = time.perf_counter() - started
+            applied.append((version, description, elapsed))
+            if report:
+                report(f"Migration {version}: {description} ({elapsed * 1000:.1f} ms)")
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+        conn.isolation_level = isolation_level
+    return applied
+
+
+def migrate_db(db_path=DB_PATH, report=print):
+    """Bring the DB file at db_path up to the latest schema version."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return migrate(conn, report=report)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    steps = migrate_db()
+    if not steps:
+        print(f"Schema is up to date (version {LATEST_VERSION}).")
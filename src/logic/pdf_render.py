@@ -0,0 +1,139 @@
+import os
+import tempfile
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor, Future, CancelledError
+
+# PDF rendering for the Bluecard HTML report.
+# HTML is built in the calling process (it needs the DB); the HTML -> PDF step runs in a
+# process pool so it never blocks a Flask request thread or the Qt event loop.
+
+ENGINES = ("wkhtmltopdf", "weasyprint")
+DEFAULT_ENGINE = "wkhtmltopdf"
+
+
+def render_html_to_pdf(html, output_path, engine=DEFAULT_ENGINE):
+    """Render an HTML string to output_path with the chosen engine. Runs inside a pool worker."""
+    if engine == "weasyprint":
+        # Pure-Python engine, no wkhtmltopdf binary needed
+        from weasyprint import HTML
+        HTML(string=html).write_pdf(output_path)
+    elif engine == "wkhtmltopdf":
+        import pdfkit
+        pdfkit.from_string(html, output_path)
+    else:
+        raise ValueError(f"Unknown PDF engine '{engine}'. Expected one of: {', '.join(ENGINES)}")
+    return output_path
+
+
+class PdfRenderPipeline:
+    """
+    Render class reports to PDF in a process pool.
+    - html_builder(class_no) -> str builds the report HTML (called in this process).
+    - version_getter(class_no) -> str returns the class data version; a cached PDF is reused
+      while the version is unchanged.
+    Each PDF is written to its own temp file, so concurrent renders never overwrite each other.
+    """
+
+    def __init__(self, html_builder, version_getter, engine=DEFAULT_ENGINE, max_workers=None, output_dir=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown PDF engine '{engine}'. Expected one of: {', '.join(ENGINES)}")
+        self.html_builder = html_builder
+        self.version_getter = version_getter
+        self.engine = engine
+        self.max_workers = max_workers
+        self.output_dir = output_dir or os.path.join(tempfile.gettempdir(), "bluecard_pdf")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cache = {}      # class_no -> (version, pdf_path)
+        self._pending = {}    # (class_no, version) -> Future
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _new_output_path(self, class_no):
+        fd, path = tempfile.mkstemp(prefix=f"bluecard_{class_no}_", suffix=".pdf", dir=self.output_dir)
+        os.close(fd)
+        return path
+
+    def submit(self, class_no):
+        """Start rendering class_no (or reuse a cached/in-flight render). Returns a Future of the PDF path."""
+        version = self.version_getter(class_no)
+        key = (class_no, version)
+        with self._lock:
+            cached = self._cache.get(class_no)
+            if cached and cached[0] == version and os.path.exists(cached[1]):
+                done = Future()
+                done.set_result(cached[1])
+                return done
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending
+            # Reserve the render before letting go of the lock, so a concurrent request waits on it
+            future = Future()
+            self._pending[key] = future
+
+        output_path = None
+        try:
+            html = self.html_builder(class_no)
+            output_path = self._new_output_path(class_no)
+            with self._lock:
+                render = self._get_executor().submit(render_html_to_pdf, html, output_path, self.engine)
+        except Exception as e:
+            self._on_done(class_no, version, output_path, future, error=e)
+            return future
+        render.add_done_callback(lambda f: self._on_done(class_no, version, output_path, future, render=f))
+        return future
+
+    def _on_done(self, class_no, version, output_path, future, render=None, error=None):
+        if error is None and render.cancelled():
+            error = CancelledError()
+        elif error is None:
+            error = render.exception()
+        with self._lock:
+            self._pending.pop((class_no, version), None)
+            old = None
+            if error is None:
+                old = self._cache.get(class_no)
+                self._cache[class_no] = (version, output_path)
+        if error is not None:
+            logging.error(f"PDF render failed for class {class_no}: {error}")
+            # Don't leave the empty temp file behind
+            if output_path:
+                try:
+                    os.remove(output_path)
+                except OSError:
+                    pass
+            future.set_exception(error)
+            return
+        # Drop the superseded file once the new one is in place
+        if old and old[1] != output_path:
+            try:
+                os.remove(old[1])
+            except OSError:
+                pass
+        future.set_result(output_path)
+
+    def render(self, class_no, timeout=None):
+        """Render one class and wait for the PDF path."""
+        return self.submit(class_no).result(timeout=timeout)
+
+    def render_many(self, class_nos, timeout=None):
+        """Render several classes in parallel (e.g. a month-end batch). Returns {class_no: pdf_path}."""
+        futures = {class_no: self.submit(class_no) for class_no in class_nos}
+        results = {}
+        for class_no, future in futures.items():
+            try:
+                results[class_no] = future.result(timeout=timeout)
+            except Exception as e:
+                logging.error(f"PDF render failed for class {class_no}: {e}")
+                results[class_no] = None
+        return results
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
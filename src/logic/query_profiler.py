@@ -0,0 +1,219 @@
+import atexit
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import traceback
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+# Opt-in timing for db_interface, switched on with BLUECARD_DB_PROFILE=1.
+# Every public db_interface function and every SQL statement gets a call count, rows returned and
+# latency percentiles; statements slower than BLUECARD_SLOW_QUERY_MS go to data/slow_queries.log
+# with the calling line, and the tables are written to data/db_profile_<time>.json on exit.
+# Statement latency is the execute() call (SQLite's first step); fetching is in the function's time.
+
+ENABLED = os.getenv("BLUECARD_DB_PROFILE") == "1"
+SLOW_QUERY_MS = float(os.getenv("BLUECARD_SLOW_QUERY_MS", "50"))
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+SLOW_LOG_PATH = DATA_DIR / "slow_queries.log"
+SUMMARY_LOG_LINES = 15  # slowest entries also written to the app log on exit
+
+# Frames skipped when looking for the line that caused a statement
+INTERNAL_FILES = {"query_profiler.py", "db_interface.py", "contextlib.py"}
+
+slow_log = logging.getLogger("bluecard.slow_queries")
+
+# db_interface opens its connections with this class; ProfiledConnection once enabled
+connection_factory = sqlite3.Connection
+
+_exit_hook_registered = False
+
+
+class QueryStats:
+    """Calls, rows and latencies (seconds) per key, safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries = {}  # key -> {"calls": n, "rows": n, "seconds": [...]}
+
+    def record(self, key, seconds, rows=0):
+        with self._lock:
+            entry = self.entries.setdefault(key, {"calls": 0, "rows": 0, "seconds": []})
+            entry["calls"] += 1
+            entry["rows"] += rows
+            entry["seconds"].append(seconds)
+
+    def add_rows(self, key, rows):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["rows"] += rows
+
+    def summary(self):
+        """One dict per key with calls, rows and total/p50/p95/p99/max in ms, largest total first."""
+        with self._lock:
+            entries = [(key, entry["calls"], entry["rows"], sorted(entry["seconds"])) for key, entry in self.entries.items()]
+        table = []
+        for key, calls, rows, seconds in entries:
+            ms = [s * 1000 for s in seconds]
+            table.append({
+                "key": key, "calls": calls, "rows": rows, "total_ms": round(sum(ms), 3),
+                "p50_ms": percentile(ms, 50), "p95_ms": percentile(ms, 95),
+                "p99_ms": percentile(ms, 99), "max_ms": round(ms[-1], 3) if ms else 0.0,
+            })
+        return sorted(table, key=lambda row: row["total_ms"], reverse=True)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return round(sorted_values[index], 3)
+
+
+functions = QueryStats()
+statements = QueryStats()
+
+
+def count_rows(result):
+    if isinstance(result, (list, tuple, dict, set)):
+        return len(result)
+    return 0 if result is None else 1
+
+
+def profile_function(fn, name):
+    @wraps(fn)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            functions.record(name, time.perf_counter() - started, count_rows(result))
+    return timed
+
+
+def instrument(namespace, module_name):
+    """Replace the public functions defined in module_name's namespace with timed wrappers."""
+    for name, value in list(namespace.items()):
+        if name.startswith("_") or not inspect.isfunction(value) or value.__module__ != module_name:
+            continue
+        if hasattr(value, "__wrapped__"):
+            continue  # context managers: timing the call would only time creating them
+        namespace[name] = profile_function(value, name)
+
+
+def call_site():
+    """'file:line in function' of the innermost frame outside the DB layer."""
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        if Path(frame.filename).name not in INTERNAL_FILES:
+            return f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return "?"
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Times each execute per statement text and adds the rows fetched to that statement."""
+
+    _key = None
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sql, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sql, super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self._timed(script, super().executescript, script)
+
+    def _timed(self, sql, run, *args):
+        self._key = " ".join(sql.split())
+        started = time.perf_counter()
+        try:
+            return run(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            statements.record(self._key, elapsed, max(self.rowcount, 0))
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                slow_log.warning(f"{elapsed * 1000:.1f} ms  {self._key}  [{call_site()}]")
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            statements.add_rows(self._key, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        statements.add_rows(self._key, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        statements.add_rows(self._key, len(rows))
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        statements.add_rows(self._key, 1)
+        return row
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors, including the ones behind conn.execute, are ProfiledCursors."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+def dump_summary(path=None):
+    """Write the function and statement tables as JSON (default data/db_profile_<time>.json) and log the top entries."""
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "slow_query_ms": SLOW_QUERY_MS,
+        "functions": functions.summary(),
+        "statements": statements.summary(),
+    }
+    path = Path(path or DATA_DIR / f"db_profile_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for row in report["functions"][:SUMMARY_LOG_LINES]:
+        logging.info(
+            f"db_profile {row['key']}: {row['calls']} calls, {row['rows']} rows, "
+            f"total {row['total_ms']} ms, p50 {row['p50_ms']} / p95 {row['p95_ms']} / max {row['max_ms']} ms"
+        )
+    logging.info(f"db_profile summary written to {path}")
+    return path
+
+
+def enable():
+    """Profile connections opened from now on, log slow statements and write the summary at exit."""
+    global connection_factory, _exit_hook_registered
+    connection_factory = ProfiledConnection
+    if not slow_log.handlers:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(SLOW_LOG_PATH, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_log.addHandler(handler)
+    if not _exit_hook_registered:
+        atexit.register(dump_summary)
+        _exit_hook_registered = True
+
+
+if ENABLED:
+    enable()
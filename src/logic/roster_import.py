@@ -0,0 +1,138 @@
+import os
+import csv
+from itertools import islice
+
+from logic.db_interface import insert_students_bulk
+from logic.student_import import BULK_IMPORT_FIELDS, parse_grid
+
+# File-based roster import (.xlsx / .csv). Rows are streamed and written in batches,
+# so a 5,000-row HR export never has to be loaded into a widget or into memory at once.
+
+DEFAULT_BATCH_SIZE = 500
+PREVIEW_ROWS = 20
+
+# Normalised header text -> students column
+COLUMN_ALIASES = {
+    "name": "name", "fullname": "name", "full name": "name", "student name": "name", "student": "name",
+    "nickname": "nickname", "nick name": "nickname", "nick": "nickname",
+    "company no": "company_no", "company_no": "company_no", "company number": "company_no",
+    "employee id": "company_no", "employee no": "company_no", "emp no": "company_no", "staff id": "company_no",
+    "gender": "gender", "sex": "gender",
+    "score": "score",
+    "pre-test": "pre_test", "pre test": "pre_test", "pretest": "pre_test", "pre_test": "pre_test",
+    "post-test": "post_test", "post test": "post_test", "posttest": "post_test", "post_test": "post_test",
+    "note": "note", "notes": "note", "remark": "note", "remarks": "note",
+}
+
+
+def cell_to_text(value):
+    """Spreadsheet cell -> string (85.0 -> '85', None -> '')."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_roster_rows(path):
+    """Yield each row of an .xlsx or .csv file as a list of strings, without loading the whole file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("openpyxl is required to import .xlsx rosters (pip install openpyxl)")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield [cell_to_text(v) for v in row]
+        finally:
+            workbook.close()
+    elif ext in (".csv", ".txt"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            for row in csv.reader(f, dialect):
+                yield [cell.strip() for cell in row]
+    else:
+        raise ValueError(f"Unsupported roster file type '{ext}'. Use .xlsx or .csv")
+
+
+def map_columns(first_row):
+    """
+    Work out which column holds which students field.
+    Returns (column_map, has_header). column_map[i] is a field name or None (ignored column).
+    Without a recognisable header (no name column), the Bulk Import column order is assumed.
+    """
+    mapped = [COLUMN_ALIASES.get(" ".join(str(c).lower().split())) for c in first_row]
+    if "name" in mapped:
+        return mapped, True
+    return list(BULK_IMPORT_FIELDS), False
+
+
+def _to_grid_row(cells, column_map):
+    """Reorder one file row into the Bulk Import column order."""
+    values = dict.fromkeys(BULK_IMPORT_FIELDS, "")
+    for value, field in zip(cells, column_map):
+        if field and not values[field]:
+            values[field] = value
+    return [values[field] for field in BULK_IMPORT_FIELDS]
+
+
+def preview_roster(path, limit=PREVIEW_ROWS):
+    """Return (column_map, has_header, rows) for the first `limit` data rows, in Bulk Import column order."""
+    rows = iter_roster_rows(path)
+    first = next(rows, None)
+    if first is None:
+        return list(BULK_IMPORT_FIELDS), False, []
+    column_map, has_header = map_columns(first)
+    preview = [] if has_header else [_to_grid_row(first, column_map)]
+    preview += [_to_grid_row(r, column_map) for r in islice(rows, limit - len(preview))]
+    rows.close()
+    return column_map, has_header, preview
+
+
+def import_roster(path, class_no, default_attendance=None, batch_size=DEFAULT_BATCH_SIZE, progress_callback=None):
+    """
+    Stream a roster file into the class, one transaction per batch of rows.
+    Returns {"inserted": count, "errors": [(file_row_number, message), ...]}.
+    progress_callback(rows_read) is called after each batch.
+    """
+    rows = iter_roster_rows(path)
+    first = next(rows, None)
+    if first is None:
+        return {"inserted": 0, "errors": []}
+    column_map, has_header = map_columns(first)
+
+    inserted = 0
+    errors = []
+    row_number = 1
+    batch = [] if has_header else [(1, _to_grid_row(first, column_map))]
+
+    def flush(batch):
+        nonlocal inserted
+        records, batch_errors = parse_grid([cells for _, cells in batch])
+        # parse_grid numbers rows within the batch; map back to file row numbers
+        errors.extend((batch[n - 1][0], message) for n, message in batch_errors)
+        ids, insert_errors = insert_students_bulk(class_no, [r for _, r in records], default_attendance)
+        errors.extend((batch[records[i][0] - 1][0], message) for i, message in insert_errors)
+        inserted += len(ids)
+
+    for cells in rows:
+        row_number += 1
+        batch.append((row_number, _to_grid_row(cells, column_map)))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+            if progress_callback:
+                progress_callback(row_number)
+    if batch:
+        flush(batch)
+        if progress_callback:
+            progress_callback(row_number)
+    errors.sort()
+    return {"inserted": inserted, "errors": errors}
@@ -0,0 +1,79 @@
+from logic.db_interface import insert_students_bulk
+
+# Bulk student import: validate a pasted grid once, then insert it as one batch.
+
+BULK_IMPORT_HEADERS = ["Name", "Nickname", "Company No", "Gender", "Score", "Pre-Test", "Post-Test", "Note"]
+BULK_IMPORT_FIELDS = ["name", "nickname", "company_no", "gender", "score", "pre_test", "post_test", "note"]
+
+GENDER_ALIASES = {"f": "Female", "female": "Female", "m": "Male", "male": "Male"}
+DEFAULT_GENDER = "Female"
+
+
+def capitalize_words(s):
+    return " ".join(w[:1].upper() + w[1:] if w else "" for w in s.split())
+
+
+def is_header_row(cells):
+    """True if the row is a pasted header line (first cell 'Name', or every cell matching the headers)."""
+    first = cells[0].strip().lower() if cells else ""
+    if first == "name":
+        return True
+    return len(cells) >= len(BULK_IMPORT_HEADERS) and all(
+        cells[col].strip().lower() == header.lower() for col, header in enumerate(BULK_IMPORT_HEADERS)
+    )
+
+
+def validate_row(cells):
+    """Turn one grid row into a student record. Returns (record, error_message)."""
+    cells = [str(c).strip() if c is not None else "" for c in cells]
+    cells += [""] * (len(BULK_IMPORT_FIELDS) - len(cells))
+    values = dict(zip(BULK_IMPORT_FIELDS, cells))
+
+    if not values["name"]:
+        return None, "Name is required."
+    gender_raw = values["gender"]
+    gender = GENDER_ALIASES.get(gender_raw.lower()) if gender_raw else DEFAULT_GENDER
+    if gender is None:
+        return None, f"Unknown gender '{gender_raw}' (use Male or Female)."
+
+    values["name"] = capitalize_words(values["name"])
+    values["nickname"] = capitalize_words(values["nickname"])
+    values["gender"] = gender
+    values["active"] = "Yes"
+    return values, None
+
+
+def parse_grid(rows):
+    """
+    Validate every row of a pasted grid (list of lists of cell strings).
+    Blank rows and header rows are skipped. Returns (records, errors) where each record is
+    (row_number, student_dict) and each error is (row_number, message); row numbers are 1-based.
+    """
+    records = []
+    errors = []
+    for row_number, cells in enumerate(rows, 1):
+        cells = list(cells)
+        if not any(str(c).strip() for c in cells if c is not None):
+            continue
+        if is_header_row([str(c) if c is not None else "" for c in cells]):
+            continue
+        record, error = validate_row(cells)
+        if error:
+            errors.append((row_number, error))
+        else:
+            records.append((row_number, record))
+    return records, errors
+
+
+def import_students(class_no, rows, default_attendance=None):
+    """
+    Validate and insert a grid of students in a single transaction.
+    Returns {"inserted": [student_id, ...], "inserted_rows": [row_number, ...], "errors": [(row_number, message), ...]}.
+    """
+    records, errors = parse_grid(rows)
+    inserted, insert_errors = insert_students_bulk(class_no, [r for _, r in records], default_attendance)
+    failed = {index for index, _ in insert_errors}
+    errors += [(records[index][0], message) for index, message in insert_errors]
+    errors.sort()
+    inserted_rows = [row_number for index, (row_number, _) in enumerate(records) if index not in failed]
+    return {"inserted": inserted, "inserted_rows": inserted_rows, "errors": errors}
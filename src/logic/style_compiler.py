@@ -0,0 +1,169 @@
+from logic.db_interface import get_form_settings, get_all_defaults, get_settings_version
+
+# Qt stylesheets built from the defaults and form_settings tables.
+# Each form gets one QSS, scoped with #objectName selectors and applied once at the form's
+# top-level widget. It is compiled once per settings version, so Qt parses it again only
+# after the settings change.
+
+_cache = {}  # form_name -> (settings_version, qss)
+
+
+def setting(form_settings, defaults, key, fallback):
+    """Per-form value, else the global default, else fallback (None and "" count as unset)."""
+    value = form_settings.get(key)
+    if value in (None, ""):
+        value = defaults.get(key)
+    return fallback if value in (None, "") else value
+
+
+def is_true(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def button_rules(scope, form_settings, defaults):
+    """Push button rules shared by the small dialogs."""
+    bg = setting(form_settings, defaults, "button_bg_color", "#1976d2")
+    fg = setting(form_settings, defaults, "button_fg_color", "#ffffff")
+    font_size = int(setting(form_settings, defaults, "button_font_size", 12))
+    weight = "bold" if is_true(setting(form_settings, defaults, "button_font_bold", "no")) else "normal"
+    hover_bg = setting(form_settings, defaults, "button_hover_bg_color", "#1565c0")
+    active_bg = setting(form_settings, defaults, "button_active_bg_color", "#0d47a1")
+    border = setting(form_settings, defaults, "button_border_color", "#1976d2")
+    return (
+        f"{scope} > QPushButton {{ background: {bg}; color: {fg}; border: 2px solid {border}; font-size: {font_size}pt; font-weight: {weight}; }}\n"
+        f"{scope} > QPushButton:hover {{ background: {hover_bg}; }}\n"
+        f"{scope} > QPushButton:pressed {{ background: {active_bg}; }}\n"
+    )
+
+
+def build_launcher(form_settings, defaults):
+    """Application-wide sheet set by the Launcher."""
+    font_size = int(setting(form_settings, defaults, "font_size", 12))
+    return (
+        f"QWidget {{ background-color: {setting(form_settings, defaults, 'bg_color', '#e3f2fd')}; }}\n"
+        f"QLabel, QLineEdit {{ font-size: {font_size}pt; }}\n"
+        f"QPushButton {{ background-color: {setting(form_settings, defaults, 'button_bg_color', '#1976d2')}; "
+        f"color: {setting(form_settings, defaults, 'button_fg_color', '#ffffff')}; "
+        f"font-size: {int(setting(form_settings, defaults, 'button_font_size', font_size))}pt; }}\n"
+        f"QTableView, QTableWidget {{ background-color: {setting(form_settings, defaults, 'table_bg_color', '#ffffff')}; }}\n"
+        f"QHeaderView::section {{ background-color: {setting(form_settings, defaults, 'table_header_bg_color', '#1976d2')}; "
+        f"color: {setting(form_settings, defaults, 'table_header_fg_color', '#ffffff')}; "
+        f"font-size: {int(setting(form_settings, defaults, 'table_header_font_size', font_size))}pt; }}\n"
+        f"QTableWidget::item {{ color: {setting(form_settings, defaults, 'table_fg_color', '#222222')}; "
+        f"font-size: {int(setting(form_settings, defaults, 'table_font_size', font_size))}pt; }}\n"
+    )
+
+
+def build_mainform(form_settings, defaults):
+    """Metadata grid, and the frozen/scrollable table join: no frames, a left rule on frozen cells, light blue selection."""
+    return (
+        "QLabel#metadataLabel { font-weight: bold; text-align: left; border: none; padding-left: 5px; padding-right: 5px; }\n"
+        "QLabel#metadataValue { text-align: left; border: 1px solid gray; padding-left: 5px; padding-right: 5px; }\n"
+        "#tableContainer { background: transparent; }\n"
+        "QTableView#frozenTable, QTableView#scrollableTable { border: none; margin: 0px; padding: 0px; }\n"
+        "QTableView#frozenTable::item { border-left: 1px solid #000; }\n"
+        "QTableView#frozenTable::item:selected, QTableView#scrollableTable::item:selected { background: #b3d7ff; }\n"
+        "QTableView#frozenTable QTableCornerButton::section, QTableView#scrollableTable QTableCornerButton::section { background: transparent; border: none; }\n"
+        "QTableView#frozenTable QHeaderView { font-weight: bold; border: none; }\n"
+        "QTableView#frozenTable QHeaderView::section { border-left: 1px solid #000 !important; }\n"
+        "QTableView#scrollableTable QHeaderView { border: none; }\n"
+    )
+
+
+def build_pal_cod_form(form_settings, defaults):
+    font_size = int(form_settings.get("font_size") or defaults.get("form_font_size", 12))
+    return (
+        f"#PALCODForm > QLabel#dateLabel {{ font-weight: bold; font-size: {font_size + 2}px; margin-bottom: 10px; color: {defaults.get('title_color', '#1976d2')}; }}\n"
+        f"#PALCODForm > QLabel#studentLabel {{ font-weight: bold; font-size: {font_size + 1}px; margin-bottom: 5px; color: {defaults.get('form_fg_color', '#222222')}; }}\n"
+        + button_rules("#PALCODForm", form_settings, defaults)
+        + '#PALCODForm > QPushButton[current="true"] { background: lightblue; font-weight: bold; }\n'
+    )
+
+
+def build_show_hide_form(form_settings, defaults):
+    font_size = int(form_settings.get("font_size") or defaults.get("form_font_size", 12))
+    title_weight = "bold" if is_true(defaults.get("title_font_bold", True)) else "normal"
+    label_weight = "bold" if is_true(defaults.get("form_label_bold", True)) else "normal"
+    return (
+        f"#ShowHideForm > QLabel {{ color: {defaults.get('form_fg_color', '#222222')}; font-size: {font_size}pt; font-weight: {label_weight}; }}\n"
+        f"#ShowHideForm > QLabel#sectionHeader {{ color: {defaults.get('title_color', '#1976d2')}; font-size: {defaults.get('title_font_size', 14)}pt; font-weight: {title_weight}; }}\n"
+        + button_rules("#ShowHideForm", form_settings, defaults)
+    )
+
+
+def build_student_form(form_settings, defaults):
+    """Gender / Active toggle buttons."""
+    weight = "bold" if is_true(defaults.get("toggle_font_bold", True)) else "normal"
+    return (
+        "#StudentForm QPushButton:checkable {"
+        f" border: {defaults.get('toggle_border_width', 3)}px solid {defaults.get('toggle_border_color', '#1565c0')};"
+        f" border-radius: {defaults.get('toggle_border_radius', 12)}px;"
+        f" padding: {defaults.get('toggle_padding', '5px 10px')};"
+        f" background-color: {defaults.get('toggle_bg_color', '#ffffff')};"
+        f" color: {defaults.get('toggle_fg_color', '#1565c0')};"
+        f" font-size: {defaults.get('toggle_font_size', 12)}px;"
+        f" font-weight: {weight}; }}\n"
+        f"#StudentForm QPushButton:checkable:hover {{ background-color: {defaults.get('toggle_hover_bg_color', '#e0f0ff')}; }}\n"
+        f"#StudentForm QPushButton:checkable:pressed {{ background-color: {defaults.get('toggle_pressed_bg_color', '#c0e0ff')}; }}\n"
+        f"#StudentForm QPushButton:checked {{ background-color: {defaults.get('toggle_checked_bg_color', '#2980f0')}; color: {defaults.get('toggle_checked_fg_color', '#ffffff')}; }}\n"
+    )
+
+
+def build_metadata_form(form_settings, defaults):
+    """Day-of-week toggle buttons."""
+    border = defaults.get("toggle_border_color", "#1565c0")
+    border_width = int(defaults.get("toggle_border_width", 3))
+    weight = "bold" if str(defaults.get("toggle_font_bold", "true")).lower() == "true" else "normal"
+    return (
+        "#MetadataForm QPushButton:checkable {"
+        f" border-radius: {int(defaults.get('toggle_border_radius', 12))}px;"
+        f" padding: {defaults.get('toggle_padding', '5px 10px')};"
+        f" background: {defaults.get('toggle_bg_color', '#ffffff')};"
+        f" color: {defaults.get('toggle_fg_color', '#1565c0')};"
+        f" border: {border_width}px solid {border};"
+        f" font-size: {int(defaults.get('toggle_font_size', 12))}pt;"
+        f" font-weight: {weight}; }}\n"
+        f"#MetadataForm QPushButton:checked {{ background: {defaults.get('toggle_checked_bg_color', '#2980f0')}; color: {defaults.get('toggle_checked_fg_color', '#ffffff')}; border: {border_width + 1}px solid {border}; }}\n"
+        f"#MetadataForm QPushButton:checkable:hover {{ background: {defaults.get('toggle_hover_bg_color', '#e0f0ff')}; }}\n"
+        f"#MetadataForm QPushButton:checkable:pressed {{ background: {defaults.get('toggle_pressed_bg_color', '#c0e0ff')}; }}\n"
+    )
+
+
+def build_message(form_settings, defaults):
+    """Toasts (#toast) and button prompts (#messageConfirm), from the message_* defaults."""
+    bg = setting(form_settings, defaults, "message_bg_color", "#2980f0")
+    fg = setting(form_settings, defaults, "message_fg_color", "#fff")
+    radius = setting(form_settings, defaults, "message_border_radius", "12")
+    font_size = setting(form_settings, defaults, "message_font_size", "13")
+    weight = "bold" if is_true(setting(form_settings, defaults, "message_font_bold", "true")) else "normal"
+    return (
+        "#toast > QLabel, #messageConfirm > QLabel {"
+        f" background: {bg}; color: {fg};"
+        f" border: {setting(form_settings, defaults, 'message_border_width', '3')}px solid {setting(form_settings, defaults, 'message_border_color', '#1565c0')};"
+        f" padding: {setting(form_settings, defaults, 'message_padding', '18px 32px')};"
+        f" font-size: {font_size}pt; font-weight: {weight}; border-radius: {radius}px; }}\n"
+        f"#messageConfirm QPushButton {{ background: {bg}; color: {fg}; border-radius: {radius}px; font-size: {font_size}pt; font-weight: {weight}; padding: 6px 18px; }}\n"
+    )
+
+
+STYLE_BUILDERS = {
+    "Launcher": build_launcher,
+    "Mainform": build_mainform,
+    "PALCODForm": build_pal_cod_form,
+    "ShowHideForm": build_show_hide_form,
+    "StudentForm": build_student_form,
+    "MetadataForm": build_metadata_form,
+    "Message": build_message,
+}
+
+
+def compile_stylesheet(form_name):
+    """Return the QSS for form_name, rebuilt only when the settings version has moved on."""
+    version = get_settings_version()
+    cached = _cache.get(form_name)
+    if cached and cached[0] == version:
+        return cached[1]
+    builder = STYLE_BUILDERS[form_name]
+    qss = builder(get_form_settings(form_name) or {}, get_all_defaults())
+    _cache[form_name] = (version, qss)
+    return qss
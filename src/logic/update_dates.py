@@ -1,4 +1,49 @@
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
+
+# Attendance values that don't need preserving
+BLANK_VALUES = ("", "-")
+
+
+@lru_cache(maxsize=8192)
+def date_ordinal(date_str):
+    """DD/MM/YYYY -> ordinal day number (cached; raises ValueError for anything else)."""
+    return datetime.strptime(date_str, "%d/%m/%Y").toordinal()
+
+
+class SortedDateIndex:
+    """
+    A date list kept in chronological order with a parallel list of ordinals,
+    so inserts are a bisect instead of a strptime re-sort of the whole list.
+    """
+
+    def __init__(self, dates):
+        self.dates = list(dates)
+        self.ordinals = None  # built on first insert
+
+    def _build(self):
+        ordinals = [date_ordinal(d) for d in self.dates]
+        if any(a > b for a, b in zip(ordinals, ordinals[1:])):
+            pairs = sorted(zip(ordinals, self.dates), key=lambda p: p[0])  # stable, like list.sort
+            ordinals = [o for o, _ in pairs]
+            self.dates = [d for _, d in pairs]
+        self.ordinals = ordinals
+
+    def insert(self, date):
+        """Insert a date; the list is sorted from the first insert on (append + sort semantics)."""
+        ordinal = date_ordinal(date)
+        if self.ordinals is None:
+            self._build()
+        pos = bisect_right(self.ordinals, ordinal)
+        self.ordinals.insert(pos, ordinal)
+        self.dates.insert(pos, date)
+
+    def remove(self, date):
+        pos = self.dates.index(date)
+        del self.dates[pos]
+        if self.ordinals is not None:
+            del self.ordinals[pos]
 
 
 def update_dates(metadata, students):
@@ -6,97 +51,166 @@ def update_dates(metadata, students):
     Synchronize metadata["dates"] with students' attendance data.
     Preserve attendance values for dates with non-empty values.
     """
-    # Get the current list of dates from metadata
     metadata_dates = metadata.get("dates", [])
     metadata_dates_set = set(metadata_dates)
 
-    # Iterate through each student to update their attendance
-    for student_id, student in students.items():
+    for student in students.values():
         attendance = student.get("attendance", {})
 
-        # Preserve attendance for dates with non-empty values
-        preserved_dates = {date: value for date, value in attendance.items() if value not in ["", "-"]}
-
-        # Remove dates from attendance that are no longer in metadata
-        for date in list(attendance.keys()):
-            if date not in metadata_dates_set:
-                del attendance[date]
+        # Drop blank entries for dates no longer in metadata (non-empty values are preserved)
+        stale = [date for date, value in attendance.items() if date not in metadata_dates_set and value in BLANK_VALUES]
+        for date in stale:
+            del attendance[date]
 
         # Add new dates from metadata to attendance with default value "-"
         for date in metadata_dates:
             if date not in attendance:
                 attendance[date] = "-"
 
-        # Restore preserved dates
-        attendance.update(preserved_dates)
-
-        # Update the student's attendance
         student["attendance"] = attendance
 
     return metadata, students
 
 
-def add_date(metadata, students, new_date):
-    """
-    Add a new date to metadata["dates"] and update students' attendance.
-    """
-    if new_date in metadata["dates"]:
-        raise ValueError(f"The date {new_date} already exists in the schedule.")
+def dates_in_sync(metadata, students):
+    """True if update_dates would change nothing: every student has an entry for each date in
+    metadata["dates"], and entries for other dates are preserved (non-blank) values."""
+    metadata_dates = set(metadata.get("dates", []))
+    for student in students.values():
+        attendance = student.get("attendance")
+        if attendance is None or not metadata_dates <= attendance.keys():
+            return False
+        if len(attendance) > len(metadata_dates):
+            if any(value in BLANK_VALUES for date, value in attendance.items() if date not in metadata_dates):
+                return False
+    return True
 
-    # Add the new date to metadata
-    metadata["dates"].append(new_date)
-    metadata["dates"].sort(key=lambda d: datetime.strptime(d, "%d/%m/%Y"))  # Keep dates sorted
 
-    # Update students' attendance
+def _check_not_preserved(students, source, old_date):
     for student in students.values():
-        student["attendance"][new_date] = "-"
-
-    return update_dates(metadata, students)
+        attendance = student.get("attendance", {})
+        if source in attendance and attendance[source] not in BLANK_VALUES:
+            raise ValueError(f"The date {old_date} cannot be modified because it has preserved attendance values.")
 
 
-def remove_date(metadata, students, date_to_remove):
+def apply_date_edits(metadata, students, edits):
     """
-    Remove a date from metadata["dates"] and update students' attendance.
+    Apply many date edits in one pass. Each edit is ("add", date), ("remove", date) or
+    ("modify", old_date, new_date), with the same rules as add_date/remove_date/modify_date.
+
+    All edits are validated before anything changes: a bad edit raises ValueError and leaves
+    metadata and students untouched. Students must be in sync with metadata["dates"] (see
+    dates_in_sync; update_dates leaves them so) or ValueError is raised: each student is visited
+    once and only the touched dates change, so nothing else is synced along the way.
     """
-    if date_to_remove not in metadata["dates"]:
-        raise ValueError(f"The date {date_to_remove} does not exist in the schedule.")
+    if not dates_in_sync(metadata, students):
+        raise ValueError("Students' attendance is out of sync with the schedule; run update_dates first.")
+    index = SortedDateIndex(metadata["dates"])
+    current = set(index.dates)
+    carries = {}      # touched date -> original date whose value it now holds (None = new date, "-")
+    released = set()  # dates whose original value moved, was dropped or was overwritten
+
+    for edit in edits:
+        action = edit[0]
+        if action == "add":
+            new_date = edit[1]
+            if new_date in current:
+                raise ValueError(f"The date {new_date} already exists in the schedule.")
+            index.insert(new_date)
+            current.add(new_date)
+            carries[new_date] = None
+            released.add(new_date)  # overwrites any preserved value under that key
+        elif action == "remove":
+            date_to_remove = edit[1]
+            if date_to_remove not in current:
+                raise ValueError(f"The date {date_to_remove} does not exist in the schedule.")
+            index.remove(date_to_remove)
+            current.remove(date_to_remove)
+            source = carries.pop(date_to_remove, date_to_remove)
+            if source is not None:
+                released.add(source)
+        elif action == "modify":
+            old_date, new_date = edit[1], edit[2]
+            if old_date not in current:
+                raise ValueError(f"The date {old_date} does not exist in the schedule.")
+            if new_date in current:
+                raise ValueError(f"The date {new_date} already exists in the schedule.")
+            source = carries.get(old_date, old_date)
+            if source is not None:
+                _check_not_preserved(students, source, old_date)
+            index.remove(old_date)
+            index.insert(new_date)
+            current.remove(old_date)
+            current.add(new_date)
+            carries.pop(old_date, None)
+            carries[new_date] = source
+            released.add(new_date)
+            if source is not None:
+                released.add(source)
+        else:
+            raise ValueError(f"Unknown date edit '{action}'.")
+
+    # Per-student delta: only the dates this batch touched
+    drop = {d for d in released if not (d in current and carries.get(d) == d)}
+    assignments = [(d, source) for d, source in carries.items() if source != d]
+    if drop or assignments:
+        for student in students.values():
+            attendance = student.setdefault("attendance", {})
+            moved = {d: attendance[source] for d, source in assignments if source is not None and source in attendance}
+            for date in drop:
+                attendance.pop(date, None)
+            for date, source in assignments:
+                if date in moved:
+                    attendance[date] = moved[date]
+                elif source is None:
+                    attendance[date] = "-"
+                else:
+                    attendance.setdefault(date, "-")
+
+    metadata["dates"][:] = index.dates
+    return metadata, students
 
-    # Remove the date from metadata
-    metadata["dates"].remove(date_to_remove)
 
-    # Remove the date from students' attendance
+def _edit_out_of_sync(metadata, students, edit):
+    """One edit on students that may be out of sync: change the touched dates, then run the full update_dates."""
+    action = edit[0]
+    if action == "modify" and edit[1] in metadata["dates"] and edit[2] not in metadata["dates"]:
+        _check_not_preserved(students, edit[1], edit[1])
+    apply_date_edits(metadata, {}, [edit])  # validates the edit and updates metadata["dates"]
     for student in students.values():
-        if date_to_remove in student["attendance"]:
-            del student["attendance"][date_to_remove]
-
+        attendance = student.setdefault("attendance", {})
+        if action == "add":
+            attendance[edit[1]] = "-"
+        elif action == "remove":
+            attendance.pop(edit[1], None)
+        elif edit[1] in attendance:
+            attendance[edit[2]] = attendance.pop(edit[1])
     return update_dates(metadata, students)
 
 
-def modify_date(metadata, students, old_date, new_date):
+def _edit_dates(metadata, students, edit):
+    """Single edits take any students: in sync, the per-student delta; otherwise edit, then sync."""
+    if dates_in_sync(metadata, students):
+        return apply_date_edits(metadata, students, [edit])
+    return _edit_out_of_sync(metadata, students, edit)
+
+
+def add_date(metadata, students, new_date):
     """
-    Modify a date in metadata["dates"] and update students' attendance.
+    Add a new date to metadata["dates"] and update students' attendance.
     """
-    if old_date not in metadata["dates"]:
-        raise ValueError(f"The date {old_date} does not exist in the schedule.")
-
-    if new_date in metadata["dates"]:
-        raise ValueError(f"The date {new_date} already exists in the schedule.")
+    return _edit_dates(metadata, students, ("add", new_date))
 
-    # Check if the old date has preserved attendance values
-    for student in students.values():
-        attendance = student.get("attendance", {})
-        if old_date in attendance and attendance[old_date] not in ["", "-"]:
-            raise ValueError(f"The date {old_date} cannot be modified because it has preserved attendance values.")
 
-    # Update metadata
-    metadata["dates"].remove(old_date)
-    metadata["dates"].append(new_date)
-    metadata["dates"].sort(key=lambda d: datetime.strptime(d, "%d/%m/%Y"))  # Keep dates sorted
+def remove_date(metadata, students, date_to_remove):
+    """
+    Remove a date from metadata["dates"] and update students' attendance.
+    """
+    return _edit_dates(metadata, students, ("remove", date_to_remove))
 
-    # Update students' attendance
-    for student in students.values():
-        attendance = student.get("attendance", {})
-        if old_date in attendance:
-            attendance[new_date] = attendance.pop(old_date)
 
-    return update_dates(metadata, students)
\ No newline at end of file
+def modify_date(metadata, students, old_date, new_date):
+    """
+    Modify a date in metadata["dates"] and update students' attendance.
+    """
+    return _edit_dates(metadata, students, ("modify", old_date, new_date))
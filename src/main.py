@@ -21,7 +21,8 @@ import sys
 import logging
 from PyQt5.QtWidgets import QApplication
 from logic import parser
-from logic.db_interface import get_form_settings, get_all_defaults
+from logic.db_interface import get_form_settings, get_all_defaults, archive_flagged_classes, DB_PATH
+from logic.migrations import migrate_db
 from ui.launcher import Launcher
 
 # Add the project root to sys.path
@@ -60,6 +61,15 @@ def clean_environment():
             except Exception as e:
                 parser.log_error(f"Failed to clean {path}: {e}")
 
+def upgrade_schema():
+    """Apply pending schema migrations to an existing DB before anything reads it."""
+    if os.path.exists(DB_PATH):
+        migrate_db(DB_PATH, report=logging.info)
+        # Classes archived before archive.db existed still sit in the working DB
+        moved = archive_flagged_classes()
+        if moved:
+            logging.info(f"Moved archived classes to archive.db: {moved}")
+
 def start_launcher():
     """Start the Launcher form."""
     theme = get_theme()
@@ -111,6 +121,7 @@ if __name__ == "__main__":
             print("🔄 Running in TEST MODE: Cleaning environment...")
             clean_environment()
 
+        upgrade_schema()
         start_launcher()
     except Exception as e:
         parser.log_error(f"An unexpected error occurred: {e}")
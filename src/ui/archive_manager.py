@@ -4,10 +4,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from logic.db_interface import (
-    set_class_archived, get_all_classes, get_class_by_id, update_class, delete_class,
-    get_form_settings, get_all_defaults, get_message_defaults
+    set_class_archived, get_archived_classes, get_class_by_id, update_class, delete_class,
+    get_form_settings, get_all_defaults
 )
 from logic.display import center_widget, scale_and_center, apply_window_flags
+from ui.toast import show_message_dialog
 
 
 class ArchiveManager(QDialog):
@@ -117,7 +118,11 @@ class ArchiveManager(QDialog):
 
         class_id = self.table.item(selected_row, 0).text()
         company = self.table.item(selected_row, 1).text()
-        set_class_archived(class_id, archived=False)
+        try:
+            set_class_archived(class_id, archived=False)
+        except ValueError as e:
+            QMessageBox.warning(self, "Restore Class", str(e))
+            return
         self.refresh_data()
         # Show a non-blocking confirmation dialog for 2 seconds using message defaults
         self.show_message_dialog(f"Class {class_id} ({company}) has been restored.")
@@ -145,13 +150,8 @@ class ArchiveManager(QDialog):
 
     def refresh_data(self):
         """Refresh the table and trigger the refresh callback."""
-        # Refresh the archived classes from DB
-        all_classes = {row["class_no"]: row for row in get_all_classes()}
-        self.archived_classes = {
-            class_id: class_data
-            for class_id, class_data in all_classes.items()
-            if class_data.get("archive", "No") == "Yes"
-        }
+        # Refresh the archived classes from archive.db
+        self.archived_classes = {row["class_no"]: row for row in get_archived_classes()}
         self.populate_table()  # Refresh the table
 
         # Trigger the callback to refresh the launcher
@@ -170,37 +170,4 @@ class ArchiveManager(QDialog):
         super().closeEvent(event)
 
     def show_message_dialog(self, text, duration=2000):
-        from PyQt5.QtCore import QTimer, Qt
-        from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout
-        msg_defaults = get_message_defaults()
-        bg = msg_defaults.get("message_bg_color", "#2980f0")
-        fg = msg_defaults.get("message_fg_color", "#fff")
-        border = msg_defaults.get("message_border_color", "#1565c0")
-        border_width = msg_defaults.get("message_border_width", "3")
-        border_radius = msg_defaults.get("message_border_radius", "12")
-        padding = msg_defaults.get("message_padding", "18px 32px")
-        font_size = msg_defaults.get("message_font_size", "13")
-        font_bold = msg_defaults.get("message_font_bold", "true")
-        font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-        style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-        msg_dialog = QDialog(self, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-        msg_dialog.setModal(False)
-        layout = QVBoxLayout(msg_dialog)
-        label = QLabel(text)
-        label.setStyleSheet(style)
-        label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(label)
-        msg_dialog.adjustSize()
-        screen = self.window().screen() if hasattr(self.window(), 'screen') else None
-        if screen:
-            scr_geo = screen.geometry()
-            x = scr_geo.x() + (scr_geo.width() - msg_dialog.width()) // 2
-            y = scr_geo.y() + (scr_geo.height() - msg_dialog.height()) // 2
-        else:
-            x = 400
-            y = 300
-        msg_dialog.move(x, y)
-        msg_dialog.show()
-        self._msg_dialog = msg_dialog  # Keep reference to prevent GC
-        QTimer.singleShot(duration, msg_dialog.close)
\ No newline at end of file
+        show_message_dialog(self, text, duration)
\ No newline at end of file
@@ -1,50 +1,8 @@
 from PyQt5.QtCore import QTimer, Qt, QDate
 from PyQt5.QtGui import QFont, QTextCharFormat, QColor
 from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QCalendarWidget
-from logic.db_interface import get_all_defaults, get_message_defaults
-
-
-def show_message_dialog(parent, message, timeout=2000, buttons=None):
-    """
-    Show a floating message dialog. If buttons is provided, it should be a list of (label, callback) tuples.
-    If buttons is None, show an auto-closing info dialog.
-    """
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(True if buttons else False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(message)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    if buttons:
-        btn_row = QHBoxLayout()
-        for btn_text, btn_callback in buttons:
-            btn = QPushButton(btn_text)
-            btn.setStyleSheet(f"background: {bg}; color: {fg}; border-radius: {border_radius}px; font-size: {font_size}pt; font-weight: {font_weight}; padding: 6px 18px;")
-            btn.clicked.connect(lambda _, cb=btn_callback: (msg_dialog.accept(), cb() if cb else None))
-            btn_row.addWidget(btn)
-        layout.addLayout(btn_row)
-    msg_dialog.adjustSize()
-    parent_geo = parent.geometry() if parent else None
-    if parent_geo:
-        msg_dialog.move(parent.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-    msg_dialog.show()
-    if not buttons:
-        QTimer.singleShot(timeout, msg_dialog.accept)
-    else:
-        msg_dialog.exec_()
+from logic.db_interface import get_all_defaults, get_protected_dates, PROTECTED_STATUSES
+from ui.toast import show_message_dialog
 
 
 class CalendarView(QDialog):
@@ -86,8 +44,11 @@ class CalendarView(QDialog):
         ]
         self.selected_dates = set(self.scheduled_dates)  # Only scheduled dates are selected
 
-        # Convert protected dates to QDate objects
-        self.protected_dates = [QDate.fromString(d, "dd/MM/yyyy") for d in (protected_dates or [])]
+        # Convert protected dates to QDate objects (a set: clicks do a hash lookup, not a list scan)
+        self.protected_dates = {
+            qd for qd in (QDate.fromString(d, "dd/MM/yyyy") for d in (protected_dates or []))
+            if qd.isValid()
+        }
 
         # Layout
         layout = QVBoxLayout(self)
@@ -98,17 +59,21 @@ class CalendarView(QDialog):
         self.calendar.clicked.connect(self.toggle_date_selection)
         layout.addWidget(self.calendar)
 
-        # Highlight already scheduled dates
-        self.highlight_dates(self.selected_dates)
-
-        # Remove blue highlight from today if today is not in scheduled_dates
-        today = QDate.currentDate()
-        if today not in self.selected_dates:
-            self.clear_highlight(today)
-        self.highlight_today()  # Always highlight today in red
-
-        # Highlight protected dates in gray
-        self.highlight_protected_dates(self.protected_dates)
+        # Cell formats are built once; only the visible month's cells are painted
+        self.selected_format = QTextCharFormat()
+        self.selected_format.setBackground(QColor("lightblue"))
+        self.today_format = QTextCharFormat()
+        self.today_format.setBackground(QColor(255, 102, 102))  # Light red background
+        self.today_format.setForeground(QColor("black"))  # Ensure the text is visible
+        self.protected_format = QTextCharFormat()
+        self.protected_format.setBackground(QColor("gray"))
+        self.protected_format.setForeground(QColor("white"))  # Ensure the text is visible
+        self.plain_format = QTextCharFormat()
+        self.formatted_dates = set()  # dates that currently carry a custom format
+
+        # Repaint whenever the user pages to another month
+        self.calendar.currentPageChanged.connect(self.refresh_month_formats)
+        self.refresh_month_formats(self.calendar.yearShown(), self.calendar.monthShown())
 
         # Save and Close buttons in a row
         button_row = QVBoxLayout()
@@ -139,39 +104,64 @@ class CalendarView(QDialog):
         button_row.addLayout(button_layout)
         layout.addLayout(button_row)
 
+    def format_for(self, date):
+        """Cell format for a date: protected (gray) > today (red) > selected (light blue) > plain."""
+        if date in self.protected_dates:
+            return self.protected_format
+        if date == QDate.currentDate():
+            return self.today_format
+        if date in self.selected_dates:
+            return self.selected_format
+        return None
+
+    def paint_date(self, date):
+        """Apply the format for a single date."""
+        fmt = self.format_for(date)
+        if fmt is None:
+            if date in self.formatted_dates:
+                self.calendar.setDateTextFormat(date, self.plain_format)
+                self.formatted_dates.discard(date)
+        else:
+            self.calendar.setDateTextFormat(date, fmt)
+            self.formatted_dates.add(date)
+
+    def refresh_month_formats(self, year, month):
+        """Paint only the cells of the visible month page (the grid shows up to 6 weeks)."""
+        first = QDate(year, month, 1)
+        start = first.addDays(-7)
+        end = first.addDays(first.daysInMonth() + 14)
+        # Drop formats left over from other pages, then paint this page in one batch
+        for date in [d for d in self.formatted_dates if d < start or d > end]:
+            self.calendar.setDateTextFormat(date, self.plain_format)
+            self.formatted_dates.discard(date)
+        date = start
+        while date <= end:
+            self.paint_date(date)
+            date = date.addDays(1)
+
     def highlight_today(self):
         """Highlight today's date in red without showing the blue selection box."""
-        today = QDate.currentDate()
-        format = QTextCharFormat()
-        format.setBackground(QColor(255, 102, 102))  # Light red background
-        format.setForeground(QColor("black"))  # Ensure the text is visible
-        self.calendar.setDateTextFormat(today, format)
+        self.paint_date(QDate.currentDate())
 
     def highlight_dates(self, dates):
         """Highlight selected dates in light blue."""
-        format = QTextCharFormat()
-        format.setBackground(QColor("lightblue"))
         for date in dates:
             if date.isValid():
-                self.calendar.setDateTextFormat(date, format)
+                self.paint_date(date)
 
     def highlight_protected_dates(self, dates):
         """Highlight protected dates in gray."""
-        format = QTextCharFormat()
-        format.setBackground(QColor("gray"))
-        format.setForeground(QColor("white"))  # Ensure the text is visible
         for date in dates:
             if date.isValid():
-                self.calendar.setDateTextFormat(date, format)
+                self.paint_date(date)
 
     def clear_highlight(self, date):
         """Clear the highlight for a specific date."""
         if date.isValid():
-            self.calendar.setDateTextFormat(date, QTextCharFormat())
+            self.paint_date(date)
 
     def toggle_date_selection(self, date):
         """Toggle the selection of a date."""
-        print("Before toggle:", [d.toString("dd/MM/yyyy") for d in self.selected_dates])
         if date in self.protected_dates:
             show_message_dialog(
                 self,
@@ -181,18 +171,15 @@ class CalendarView(QDialog):
 
         if date in self.selected_dates:
             self.selected_dates.remove(date)
-            self.clear_highlight(date)
         else:
             if len(self.selected_dates) == self.max_dates:
                 show_message_dialog(self, f"You can only select up to {self.max_dates} dates.")
                 return
             self.selected_dates.add(date)
-            self.highlight_dates([date])
-        print("After toggle:", [d.toString("dd/MM/yyyy") for d in self.selected_dates])
+        self.paint_date(date)
 
     def save_changes(self):
         """Save the selected dates."""
-        print("Saving selected dates:", [d.toString("dd/MM/yyyy") for d in self.selected_dates])
         if len(self.selected_dates) > self.max_dates:
             show_message_dialog(self, f"Please select up to {self.max_dates} dates.")
             return
@@ -204,7 +191,6 @@ class CalendarView(QDialog):
         # Sort and filter out invalid dates
         sorted_dates = sorted(self.selected_dates)
         formatted_dates = [d.toString("dd/MM/yyyy") for d in sorted_dates if d.isValid()]
-        print(f"Formatted dates to save: {formatted_dates}")  # Debugging: Check formatted dates
 
         # Fill up to max_dates with placeholders if needed
         num_dates = len(formatted_dates)
@@ -220,17 +206,21 @@ class CalendarView(QDialog):
         self.accept()
 
 
-def launch_calendar(parent, scheduled_dates, students, max_classes, on_save_callback):
+def launch_calendar(parent, scheduled_dates, students, max_classes, on_save_callback, class_no=None):
     """
     Shared function to open the CalendarView with correct protected dates and max_classes.
+    With class_no, protected dates come from the DB in one query; otherwise the students dict is scanned.
     """
-    # Collect protected dates: any date with P, A, L, CIA, COD, or HOL for any student
-    protected_dates = set()
-    for student in students.values():
-        attendance = student.get("attendance", {})
-        for date, value in attendance.items():
-            if value in ["P", "A", "L", "CIA", "COD", "HOL"]:
-                protected_dates.add(date)
+    # Protected dates: any date with P, A, L, CIA, COD, or HOL for any student
+    if class_no:
+        protected_dates = get_protected_dates(class_no)
+    else:
+        protected_dates = {
+            date
+            for student in students.values()
+            for date, value in student.get("attendance", {}).items()
+            if value in PROTECTED_STATUSES
+        }
 
     calendar_view = CalendarView(
         parent,
@@ -0,0 +1,97 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+from logic.db_interface import get_class_by_id, get_class_version, get_app_state, set_app_state, get_settings_version
+
+# Keeps hidden instances of the heavy dialogs and rebinds them to new data, so settings,
+# fonts, stylesheets and layouts are built once per parent instead of on every open.
+# A form takes part by implementing rebind(...) with the same arguments as its
+# constructor after `parent`. Cached forms are dropped when the settings version changes.
+
+LAST_CLASS_KEY = "last_opened_class"
+PREWARM_DELAY_MS = 300  # let the Launcher paint before building the hidden Mainform
+
+
+class FormRegistry:
+    def __init__(self):
+        self._forms = {}        # (form class, id(parent)) -> hidden dialog
+        self._prewarmed = None  # (class_id, version, app font, Mainform)
+        self._settings_version = get_settings_version()
+
+    def _check_settings(self):
+        version = get_settings_version()
+        if version != self._settings_version:
+            self.invalidate()
+            self._settings_version = version
+
+    def acquire(self, form_cls, parent, *args, **kwargs):
+        """Return a form bound to the given data: the cached instance rebound, or a new one."""
+        self._check_settings()
+        key = (form_cls, id(parent))
+        form = self._forms.get(key)
+        if form is not None and not form.isVisible():
+            form.rebind(*args, **kwargs)
+            return form
+        form = form_cls(parent, *args, **kwargs)
+        if key not in self._forms:
+            # Cache the first instance per parent; it goes away with its parent
+            self._forms[key] = form
+            if parent is not None:
+                parent.destroyed.connect(lambda _=None, key=key: self._forms.pop(key, None))
+        return form
+
+    def invalidate(self):
+        """Drop every cached form (settings changed, so they must be rebuilt)."""
+        for form in self._forms.values():
+            form.deleteLater()
+        self._forms.clear()
+        self.discard_prewarmed()
+
+    # --- Mainform pre-warming ---
+
+    def remember_class(self, class_id):
+        """Record the most recently opened class (app state, so cached forms and styles stay valid)."""
+        if class_id and get_app_state(LAST_CLASS_KEY) != class_id:
+            set_app_state(LAST_CLASS_KEY, class_id)
+
+    def schedule_prewarm(self, theme, delay=PREWARM_DELAY_MS):
+        """Build a hidden Mainform for the most recently used class once the event loop is idle."""
+        QTimer.singleShot(delay, lambda: self.prewarm_mainform(get_app_state(LAST_CLASS_KEY), theme))
+
+    def prewarm_mainform(self, class_id, theme):
+        self._check_settings()
+        if not class_id or (self._prewarmed and self._prewarmed[0] == class_id):
+            return
+        class_data = get_class_by_id(class_id)
+        if not class_data or class_data.get("archive") == "Yes":
+            return
+        from ui.mainform import Mainform
+        app = QApplication.instance()
+        launcher_font = app.font()
+        version = get_class_version(class_id)
+        form = Mainform(class_id, {"classes": {class_id: class_data}}, theme)
+        # Mainform sets the application font while building; keep the Launcher's until it is shown
+        mainform_font = app.font()
+        app.setFont(launcher_font)
+        self.discard_prewarmed()
+        self._prewarmed = (class_id, version, mainform_font, form)
+
+    def take_mainform(self, class_id):
+        """Hand over the pre-warmed Mainform if it is for class_id and its data is unchanged."""
+        self._check_settings()
+        prewarmed, self._prewarmed = self._prewarmed, None
+        if prewarmed is None:
+            return None
+        warm_class, version, font, form = prewarmed
+        if warm_class != class_id or get_class_version(class_id) != version:
+            form.deleteLater()
+            return None
+        QApplication.instance().setFont(font)
+        return form
+
+    def discard_prewarmed(self):
+        if self._prewarmed is not None:
+            self._prewarmed[3].deleteLater()
+            self._prewarmed = None
+
+
+form_registry = FormRegistry()
@@ -3,15 +3,22 @@ import os
 import logging
 import webbrowser
 import json
-from flask import Flask, render_template_string, send_file
-import pdfkit
-from threading import Timer
-from datetime import datetime, timedelta
-from logic.db_interface import get_all_classes, get_class_by_id, get_students_by_class, get_attendance_by_student, get_all_defaults
-from PyQt5.QtGui import QFont
-# Utility: Floating message dialog for PyQt5 (for future use if embedded in a PyQt5 window)
-from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout
-from PyQt5.QtCore import Qt
+import hashlib
+from flask import Flask, Response, request, send_file, g
+import gzip
+import threading
+from threading import Timer, Lock
+from datetime import datetime, timedelta, timezone
+from logic.db_interface import (
+    get_all_classes, get_class_by_id, get_students_by_class, get_attendance_by_class, get_all_defaults, get_class_last_change,
+    get_class_summaries, latest_change_seq, get_dates_by_class, count_classes, get_readonly_connection, read_snapshot,
+)
+from logic.pdf_render import PdfRenderPipeline, DEFAULT_ENGINE
+from logic.date_utils import parse_max_classes, parse_class_time
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -59,62 +66,42 @@ def get_styled_html_message(message, message_type="info"):
     </div>
     """
 
-def show_floating_message(parent, message, duration=2500):
-    """Show a floating message dialog with DB-driven style."""
-    defaults = get_all_defaults()
-    bg_color = defaults.get("message_bg_color", "#2980f0")
-    fg_color = defaults.get("message_fg_color", "#ffffff")
-    border_color = defaults.get("message_border_color", "#1565c0")
-    border_width = int(defaults.get("message_border_width", 3))
-    border_radius = int(defaults.get("message_border_radius", 12))
-    padding = defaults.get("message_padding", "18px 32px")
-    font_size = int(defaults.get("message_font_size", 13))
-    font_bold = defaults.get("message_font_bold", True)
-
-    dialog = QDialog(parent)
-    dialog.setWindowFlags(Qt.FramelessWindowHint | Qt.Dialog)
-    dialog.setAttribute(Qt.WA_TranslucentBackground)
-    dialog.setModal(False)
-    label = QLabel(message)
-    label.setAlignment(Qt.AlignCenter)
-    font = label.font()
-    font.setPointSize(font_size)
-    font.setBold(font_bold)
-    label.setFont(font)
-    label.setStyleSheet(f"background: {bg_color}; color: {fg_color}; border: {border_width}px solid {border_color}; border-radius: {border_radius}px; padding: {padding};")
-    layout = QVBoxLayout()
-    layout.addWidget(label)
-    dialog.setLayout(layout)
-    dialog.adjustSize()
-    dialog.show()
-    # Auto-close after duration
-    QTimer = __import__('PyQt5.QtCore').QtCore.QTimer
-    QTimer.singleShot(duration, dialog.accept)
-    return dialog
 
-@app.route("/")
-def home():
-    """Serve the HTML content."""
-    # Load data from the database
-    all_classes = get_all_classes()
-    if not all_classes:
-        # Use DB-driven styled message for error
-        return get_styled_html_message("<h2>No classes found in the database.</h2>", message_type="error")
+def generate_class_dates(start_date, days, max_classes):
+    """Generate max_classes dates from start_date on the given weekdays ("Monday, Wednesday")."""
+    day_map = {
+        "Monday": 0, "Tuesday": 1, "Wednesday": 2,
+        "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6
+    }
+    start_date = datetime.strptime(start_date, "%d/%m/%Y")
+    class_days = [day_map[day.strip()] for day in days.split(",") if day.strip() in day_map]
+    class_dates = []
+
+    current_date = start_date
+    while len(class_dates) < max_classes:
+        if current_date.weekday() in class_days:
+            class_dates.append(current_date.strftime("%d/%m/%Y"))
+        current_date += timedelta(days=1)
 
-    class_row = all_classes[0]
-    class_id = class_row["class_no"]
+    return class_dates
+
+def build_bluecard_view(class_id):
+    """Build the view-model for one class's Bluecard: everything the template needs, computed once."""
+    class_row = get_class_by_id(class_id)
     metadata = dict(class_row)  # All fields are top-level
 
-    # Get students for this class
+    # Get students for this class (attendance comes from one bulk query, not one per student)
     students_list = get_students_by_class(class_id)
+    attendance_by_student = get_attendance_by_class(class_id)
     students = {}
     for student_row in students_list:
         student_id = student_row["student_id"]
-        attendance_records = get_attendance_by_student(student_id)
-        attendance = {rec["date"]: rec["status"] for rec in attendance_records}
-        student_row["attendance"] = attendance
+        student_row["attendance"] = attendance_by_student.get(str(student_id), {})
         students[student_id] = student_row
 
+    # The schedule fields are read here, before they are hidden from the metadata table below
+    schedule = {key: class_row.get(key) for key in ("start_date", "days", "class_time", "max_classes")}
+
     # Combine course_hours, class_time, and max_classes into a single field
     course_hours = metadata.get("course_hours", "N/A")
     class_time = metadata.get("class_time", "N/A")
@@ -125,282 +112,329 @@ def home():
     hidden_metadata_fields = {"teacher_no", "class_time", "max_classes", "rate", "ccp", "travel", "bonus", "notes", "class_no"}
     metadata = {key: value for key, value in metadata.items() if key not in hidden_metadata_fields}
 
-    # Split metadata into two groups (update keys to lowercase/underscore)
+    # Split metadata into two groups, shown side by side
     group1_fields = ["company", "consultant", "teacher", "room", "course_book"]
     group2_fields = ["course_hours_summary", "start_date", "finish_date", "days", "time"]
-
-    # Prepare group1 and group2 metadata
-    group1_metadata = {key: metadata.get(key, "N/A") for key in group1_fields}
-    group2_metadata = {key: metadata.get(key, "N/A") for key in group2_fields}
-
-    # Generate all class dates based on metadata
-    def generate_class_dates(start_date, days, max_classes):
-        day_map = {
-            "Monday": 0, "Tuesday": 1, "Wednesday": 2,
-            "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6
-        }
-        start_date = datetime.strptime(start_date, "%d/%m/%Y")
-        class_days = [day_map[day.strip()] for day in days.split(",") if day.strip() in day_map]
-        class_dates = []
-
-        current_date = start_date
-        while len(class_dates) < max_classes:
-            if current_date.weekday() in class_days:
-                class_dates.append(current_date.strftime("%d/%m/%Y"))
-            current_date += timedelta(days=1)
-
-        return class_dates
-
-    # Extract metadata values
-    start_date = metadata.get("start_date", "01/01/2025")
-    days = metadata.get("days", "Monday, Wednesday")
-    max_classes = int(metadata.get("max_classes", "20"))
-
-    # Generate all class dates
-    all_dates = generate_class_dates(start_date, days, max_classes)
-
-    # Calculate running totals for attendance
-    running_total_p = sum(
-        sum(1 for status in student.get("attendance", {}).values() if status == "P")
-        for student in students.values()
-    )
-    running_total_a = sum(
-        sum(1 for status in student.get("attendance", {}).values() if status == "A")
-        for student in students.values()
-    )
-    running_total_l = sum(
-        sum(1 for status in student.get("attendance", {}).values() if status == "L")
-        for student in students.values()
+    metadata_rows = [
+        (key1, metadata.get(key1, "N/A"), key2, metadata.get(key2, "N/A"))
+        for key1, key2 in zip(group1_fields, group2_fields)
+    ]
+
+    # The class's own schedule (dates table); generated from its metadata only if it has none yet
+    all_dates = get_dates_by_class(class_id)
+    if not all_dates and schedule["start_date"]:
+        all_dates = generate_class_dates(
+            schedule["start_date"], schedule["days"] or "Monday, Wednesday", parse_max_classes(schedule["max_classes"], 20)
+        )
+
+    # Running totals for each date ("1.5" hours per class gives 1.5, 3, 4.5, ...)
+    class_time = parse_class_time(schedule["class_time"])
+    running_totals = [f"{class_time * (i + 1):g}" for i in range(len(all_dates))]
+
+    student_rows = []
+    for student in students.values():
+        statuses = list(student["attendance"].values())
+        student_rows.append({
+            "name": student.get("name", ""),
+            "nickname": student.get("nickname", ""),
+            "score": student.get("score", ""),
+            "pre_test": student.get("pre_test", ""),
+            "post_test": student.get("post_test", ""),
+            "p": statuses.count("P"),
+            "a": statuses.count("A"),
+            "l": statuses.count("L"),
+            "cells": [student["attendance"].get(date, "-") for date in all_dates],
+        })
+
+    return {
+        "class_id": class_id,
+        "company_name": metadata.get("company", "N/A"),
+        "style": get_html_style(),
+        "metadata_rows": metadata_rows,
+        "dates": all_dates,
+        "running_totals": running_totals,
+        "students": student_rows,
+    }
+
+def get_bluecard_template():
+    """Return the compiled Bluecard template (parsed once, then reused by every route)."""
+    global _bluecard_template
+    if _bluecard_template is None:
+        _bluecard_template = app.jinja_env.get_template("bluecard.html")
+    return _bluecard_template
+
+_bluecard_template = None
+
+# class_no -> (version, html, last_modified)
+_html_cache = {}
+_html_cache_lock = Lock()
+
+def get_report_version(class_id):
+    """
+    Return (version, last_modified) for a class's report. The version is the class's newest
+    journalled change plus a hash of the report style (the page embeds get_html_style()), so
+    editing the class or the style defaults gives a new ETag; last_modified is that change's time.
+    """
+    seq, changed_at = get_class_last_change(class_id)
+    style = hashlib.sha1(get_html_style().encode("utf-8")).hexdigest()[:12]
+    last_modified = None
+    if changed_at:
+        last_modified = datetime.fromisoformat(changed_at).replace(tzinfo=timezone.utc, microsecond=0)
+    # changed_at tells apart two DBs (e.g. a restored backup) whose journals reached the same seq
+    return f"{seq}-{changed_at or ''}-{style}", last_modified
+
+def render_bluecard_html(class_id, version=None, last_modified=None):
+    """Return (html, version, last_modified) for a class, reusing the cached HTML while the class is unchanged."""
+    if version is None:
+        version, last_modified = get_report_version(class_id)
+    with _html_cache_lock:
+        cached = _html_cache.get(class_id)
+    if cached and cached[0] == version:
+        return cached[1], version, cached[2]
+    html = get_bluecard_template().render(**build_bluecard_view(class_id))
+    with _html_cache_lock:
+        _html_cache[class_id] = (version, html, last_modified)
+    return html, version, last_modified
+
+def build_bluecard_html(class_id):
+    """Build the Bluecard report HTML for one class."""
+    return render_bluecard_html(class_id)[0]
+
+
+def get_pdf_pipeline():
+    """Return the shared PDF render pipeline (created on first use)."""
+    global _pdf_pipeline
+    if _pdf_pipeline is None:
+        engine = os.environ.get("BLUECARD_PDF_ENGINE") or get_all_defaults().get("pdf_engine", DEFAULT_ENGINE)
+        _pdf_pipeline = PdfRenderPipeline(build_bluecard_html, lambda class_no: get_report_version(class_no)[0], engine=engine)
+    return _pdf_pipeline
+
+_pdf_pipeline = None
+
+
+INDEX_PAGE_SIZE = 25
+
+# (page, page_size) -> (version, html, total); version is (latest journal seq, style)
+_index_cache = {}
+
+def bluecard_response(class_id):
+    """Serve one class's Bluecard with ETag/Last-Modified, answering 304 when the browser copy is current."""
+    version, last_modified = get_report_version(class_id)
+    if version in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(version)
+        return response
+    html_content, version, last_modified = render_bluecard_html(class_id, version, last_modified)
+    response = Response(html_content, mimetype="text/html")
+    response.set_etag(version)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response.make_conditional(request)
+
+def render_class_index(page, page_size=INDEX_PAGE_SIZE):
+    """
+    Render one page of the active-class index (one bulk query per page). Returns (html, total).
+    A page is cached until any class or student changes (the journal's latest seq) or the style does.
+    """
+    key = (page, page_size)
+    style = get_html_style()
+    version = (latest_change_seq(), style)
+    with _html_cache_lock:
+        cached = _index_cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+    total = count_classes(active_only=True)
+    page_count = max(1, -(-total // page_size))
+    page = min(max(1, page), page_count)
+    classes = get_class_summaries(active_only=True, limit=page_size, offset=(page - 1) * page_size)
+    html = app.jinja_env.get_template("index.html").render(
+        classes=classes,
+        page=page,
+        page_count=page_count,
+        total=total,
+        style=style,
     )
+    with _html_cache_lock:
+        _index_cache[key] = (version, html, total)
+    return html, total
 
-    # Calculate running totals for each date
-    class_time = int(metadata.get("class_time", "2"))  # Default to 2 if not provided
-    running_totals = [class_time * (i + 1) for i in range(len(all_dates))]
-
-    # Generate HTML content dynamically
-    company_name = metadata.get("company", "N/A")
-    html_content = f"""
-    <html>
-        <head>
-            <title>Class Attendance - {class_id} - {company_name}</title>
-            <style>
-                {get_html_style()}
-                h1, h2 {{ color: #333; }}
-                .bottom-space {{ margin-bottom: 1in; }}
-            </style>
-        </head>
-        <body>
-            <h1>Class Attendance - {class_id} - {company_name}</h1>
-            <div class="bottom-space">
-                <table>
-                    <tr>
-                        <th>Field</th>
-                        <th>Value</th>
-                        <th>Field</th>
-                        <th>Value</th>
-                    </tr>
-                    {"".join(
-                        f"<tr>"
-                        f"<td>{key1}</td><td>{value1}</td>"
-                        f"<td>{key2}</td><td>{value2}</td>"
-                        f"</tr>"
-                        for (key1, value1), (key2, value2) in zip(group1_metadata.items(), group2_metadata.items())
-                    )}
-                </table>
-                <h2>Students</h2>
-                <table>
-                    <tr>
-                        <th>#</th>
-                        <th>Name</th>
-                        <th>Nickname</th>
-                        <th>Score</th>
-                        <th>Pre-Test</th>
-                        <th>Post-Test</th>
-                        <th>P</th>
-                        <th>A</th>
-                        <th>L</th>
-                        {"".join(f"<th>{date}</th>" for date in all_dates)}
-                    </tr>
-                    <tr>
-                        <td colspan="6" style="font-weight: bold; text-align: right;">Running Total</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        {"".join(f"<td>{total}</td>" for total in running_totals)}
-                    </tr>
-                    {"".join(
-                        f"<tr>"
-                        f"<td>{idx + 1}</td>"
-                        f"<td>{student.get('name', '')}</td>"
-                        f"<td>{student.get('nickname', '')}</td>"
-                        f"<td>{student.get('score', '')}</td>"
-                        f"<td>{student.get('pre_test', '')}</td>"
-                        f"<td>{student.get('post_test', '')}</td>"
-                        + f"<td>{sum(1 for status in student.get('attendance', {}).values() if status == 'P')}</td>"
-                        + f"<td>{sum(1 for status in student.get('attendance', {}).values() if status == 'A')}</td>"
-                        + f"<td>{sum(1 for status in student.get('attendance', {}).values() if status == 'L')}</td>"
-                        + "".join(
-                            f"<td>{student.get('attendance', {}).get(date, '-')}</td>"
-                            for date in all_dates
-                        )
-                        + f"</tr>"
-                        for idx, (student_id, student) in enumerate(students.items())
-                    )}
-                </table>
-            </div>
-        </body>
-    </html>
-    """
-    return render_template_string(html_content)
+@app.route("/")
+def home():
+    """Serve the index of active classes."""
+    page = request.args.get("page", 1, type=int)
+    html, total = render_class_index(page)
+    if total == 0:
+        # Use DB-driven styled message for error
+        return get_styled_html_message("<h2>No classes found in the database.</h2>", message_type="error")
+    return html
+
+@app.route("/class/<class_no>")
+def class_bluecard(class_no):
+    """Serve the Bluecard for one class."""
+    if get_class_by_id(class_no) is None:
+        return get_styled_html_message(f"<h2>Class {class_no} not found.</h2>", message_type="error"), 404
+    return bluecard_response(class_no)
+
+@app.route("/class/<class_no>/pdf")
+def class_pdf(class_no):
+    """Generate and serve the PDF for one class."""
+    if get_class_by_id(class_no) is None:
+        return get_styled_html_message(f"<h2>Class {class_no} not found.</h2>", message_type="error"), 404
+    try:
+        pdf_path = get_pdf_pipeline().render(class_no)
+    except Exception as e:
+        logging.error(f"PDF render failed for class {class_no}: {e}")
+        return get_styled_html_message(f"<h2>Could not create PDF for {class_no}.</h2><p>{e}</p>", message_type="error")
+    return send_file(pdf_path, as_attachment=True, download_name=f"bluecard_{class_no}.pdf")
 
 @app.route("/download-pdf")
 def download_pdf():
-    """Generate and serve a PDF from the latest DB data."""
-    # Load data from the database (same as in home())
+    """Generate and serve a PDF for the first class (kept for existing links; see /class/<class_no>/pdf)."""
     all_classes = get_all_classes()
     if not all_classes:
         # Use DB-driven styled message for error
         return get_styled_html_message("<h2>No classes found in the database.</h2>", message_type="error")
-
-    class_row = all_classes[0]
-    class_id = class_row["class_no"]
-    metadata = dict(class_row)
-
-    students_list = get_students_by_class(class_id)
-    students = {}
-    for student_row in students_list:
-        student_id = student_row["student_id"]
-        attendance_records = get_attendance_by_student(student_id)
-        attendance = {rec["date"]: rec["status"] for rec in attendance_records}
-        student_row["attendance"] = attendance
-        students[student_id] = student_row
-
-    course_hours = metadata.get("course_hours", "N/A")
-    class_time = metadata.get("class_time", "N/A")
-    max_classes = metadata.get("max_classes", "N/A")
-    metadata["course_hours_summary"] = f"{course_hours} Hours / {class_time} Hours per class / {max_classes} Classes"
-
-    hidden_metadata_fields = {"teacher_no", "class_time", "max_classes", "rate", "ccp", "travel", "bonus", "notes", "class_no"}
-    metadata = {key: value for key, value in metadata.items() if key not in hidden_metadata_fields}
-
-    group1_fields = ["company", "consultant", "teacher", "room", "course_book"]
-    group2_fields = ["course_hours_summary", "start_date", "finish_date", "days", "time"]
-
-    group1_metadata = {key: metadata.get(key, "N/A") for key in group1_fields}
-    group2_metadata = {key: metadata.get(key, "N/A") for key in group2_fields}
-
-    def generate_class_dates(start_date, days, max_classes):
-        day_map = {
-            "Monday": 0, "Tuesday": 1, "Wednesday": 2,
-            "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6
-        }
-        start_date = datetime.strptime(start_date, "%d/%m/%Y")
-        class_days = [day_map[day.strip()] for day in days.split(",") if day.strip() in day_map]
-        class_dates = []
-
-        current_date = start_date
-        while len(class_dates) < max_classes:
-            if current_date.weekday() in class_days:
-                class_dates.append(current_date.strftime("%d/%m/%Y"))
-            current_date += timedelta(days=1)
-
-        return class_dates
-
-    start_date = metadata.get("start_date", "01/01/2025")
-    days = metadata.get("days", "Monday, Wednesday")
-    max_classes = int(metadata.get("max_classes", "20"))
-    all_dates = generate_class_dates(start_date, days, max_classes)
-
-    class_time = int(metadata.get("class_time", "2"))
-    running_totals = [class_time * (i + 1) for i in range(len(all_dates))]
-
-    company_name = metadata.get("company", "N/A")
-    html_content = f"""
-    <html>
-        <head>
-            <title>Class Attendance - {class_id} - {company_name}</title>
-            <style>
-                {get_html_style()}
-                h1, h2 {{ color: #333; }}
-                .bottom-space {{ margin-bottom: 1in; }}
-            </style>
-        </head>
-        <body>
-            <h1>Class Attendance - {class_id} - {company_name}</h1>
-            <div class="bottom-space">
-                <table>
-                    <tr>
-                        <th>Field</th>
-                        <th>Value</th>
-                        <th>Field</th>
-                        <th>Value</th>
-                    </tr>
-                    {"".join(
-                        f"<tr>"
-                        f"<td>{key1}</td><td>{value1}</td>"
-                        f"<td>{key2}</td><td>{value2}</td>"
-                        f"</tr>"
-                        for (key1, value1), (key2, value2) in zip(group1_metadata.items(), group2_metadata.items())
-                    )}
-                </table>
-                <h2>Students</h2>
-                <table>
-                    <tr>
-                        <th>#</th>
-                        <th>Name</th>
-                        <th>Nickname</th>
-                        <th>Score</th>
-                        <th>Pre-Test</th>
-                        <th>Post-Test</th>
-                        <th>P</th>
-                        <th>A</th>
-                        <th>L</th>
-                        {"".join(f"<th>{date}</th>" for date in all_dates)}
-                    </tr>
-                    <tr>
-                        <td colspan="6" style="font-weight: bold; text-align: right;">Running Total</td>
-                        <td>-</td>
-                        <td>-</td>
-                        <td>-</td>
-                        {"".join(f"<td>{total}</td>" for total in running_totals)}
-                    </tr>
-                    {"".join(
-                        f"<tr>"
-                        f"<td>{idx + 1}</td>"
-                        f"<td>{student.get('name', '')}</td>"
-                        f"<td>{student.get('nickname', '')}</td>"
-                        f"<td>{student.get('score', '')}</td>"
-                        f"<td>{student.get('pre_test', '')}</td>"
-                        f"<td>{student.get('post_test', '')}</td>"
-                        + f"<td>{sum(1 for status in student.get('attendance', {}).values() if status == 'P')}</td>"
-                        + f"<td>{sum(1 for status in student.get('attendance', {}).values() if status == 'A')}</td>"
-                        + f"<td>{sum(1 for status in student.get('attendance', {}).values() if status == 'L')}</td>"
-                        + "".join(
-                            f"<td>{student.get('attendance', {}).get(date, '-')}</td>"
-                            for date in all_dates
-                        )
-                        + f"</tr>"
-                        for idx, (student_id, student) in enumerate(students.items())
-                    )}
-                </table>
-            </div>
-        </body>
-    </html>
-    """
-
-    pdf_path = "mainform.pdf"
-    pdfkit.from_string(html_content, pdf_path)
-    return send_file(pdf_path, as_attachment=True)
+    return class_pdf(all_classes[0]["class_no"])
+
+def render_active_class_pdfs(output_dir):
+    """Month-end batch: render every active class to PDF in parallel and copy the files to output_dir."""
+    import shutil
+    os.makedirs(output_dir, exist_ok=True)
+    # One snapshot for the whole batch: every PDF reflects the same state of the DB
+    with read_snapshot():
+        class_nos = [c["class_no"] for c in get_all_classes()]  # archived classes live in archive.db
+        results = get_pdf_pipeline().render_many(class_nos)
+    written = []
+    for class_no, pdf_path in results.items():
+        if pdf_path:
+            target = os.path.join(output_dir, f"bluecard_{class_no}.pdf")
+            shutil.copyfile(pdf_path, target)
+            written.append(target)
+    return written
+
+# --- Every request reads one read-only snapshot of the DB (serve mode: one connection per worker thread) ---
+_worker_state = threading.local()
+
+@app.before_request
+def open_read_snapshot():
+    """Route this request's db_interface reads through a read-only snapshot, so it never holds up the app's writes."""
+    conn = None
+    if app.config.get("READ_ONLY_DB"):
+        conn = getattr(_worker_state, "conn", None)
+        if conn is None:
+            conn = get_readonly_connection()
+            _worker_state.conn = conn
+    g.snapshot = read_snapshot(conn)
+    g.snapshot.__enter__()
+
+@app.teardown_request
+def close_read_snapshot(exc=None):
+    snapshot = g.pop("snapshot", None)
+    if snapshot is not None:
+        snapshot.__exit__(None, None, None)
+
+# --- Response compression (brotli if available and accepted, else gzip) ---
+COMPRESS_MIN_BYTES = 500
+COMPRESS_MIMETYPES = {"text/html", "text/css", "text/plain", "application/json", "application/javascript"}
+
+@app.after_request
+def compress_response(response):
+    if not app.config.get("COMPRESS_RESPONSES"):
+        return response
+    if (response.direct_passthrough or response.status_code != 200
+            or response.mimetype not in COMPRESS_MIMETYPES or "Content-Encoding" in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        return response
+    response.headers["Content-Length"] = str(len(response.get_data()))
+    response.vary.add("Accept-Encoding")
+    return response
+
+def serve(host="127.0.0.1", port=5000, workers=None, open_browser_tab=True):
+    """Run the report server for real use: localhost only, N worker threads, compressed responses, read-only DB."""
+    if workers is None:
+        workers = int(get_all_defaults().get("report_server_workers", 4))
+    app.config.update(READ_ONLY_DB=True, COMPRESS_RESPONSES=True)
+    app.debug = False
+    url = f"http://{host}:{port}/"
+    if open_browser_tab:
+        Timer(1.0, lambda: webbrowser.open_new(url)).start()
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+    if waitress_serve is not None:
+        logging.info(f"Serving reports on {url} with waitress ({workers} threads)")
+        waitress_serve(app, host=host, port=port, threads=workers)
+        return
+    # Fallback: Werkzeug server with a bounded thread pool
+    logging.warning("waitress is not installed (see requirements.txt); serving reports with the Werkzeug server")
+    from werkzeug.serving import BaseWSGIServer
+    from concurrent.futures import ThreadPoolExecutor
+
+    class PooledWSGIServer(BaseWSGIServer):
+        multithread = True
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bluecard-report")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process_request_in_worker, request, client_address)
+
+        def _process_request_in_worker(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer(host, port, app)
+    logging.info(f"Serving reports on {url} with {workers} worker threads")
+    try:
+        server.serve_forever()
+    finally:
+        server.pool.shutdown(wait=False)
 
 def open_browser():
     """Open the default browser to the home route."""
     webbrowser.open_new("http://127.0.0.1:5000/")
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Bluecard HTML/PDF report server")
+    parser.add_argument("--serve", action="store_true", help="Production mode: multi-threaded WSGI server, compression, read-only DB")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads in --serve mode (default: report_server_workers or 4)")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--no-browser", action="store_true", help="Don't open a browser tab")
+    parser.add_argument("--batch-pdf", metavar="DIR", help="Render all active classes to PDF in DIR and exit")
+    args = parser.parse_args()
+
+    if args.batch_pdf:
+        # Month-end batch: python htmlbluecard.py --batch-pdf <output_dir>
+        for path in render_active_class_pdfs(args.batch_pdf):
+            print(path)
+        get_pdf_pipeline().shutdown()
+        sys.exit(0)
+    if args.serve:
+        serve(port=args.port, workers=args.workers, open_browser_tab=not args.no_browser)
+        sys.exit(0)
     logging.debug("Starting Flask app...")
     # Start the Flask app in a separate thread to ensure the browser opens reliably
-    Timer(1.0, open_browser).start()
-    app.run(debug=True, use_reloader=False)  # Set use_reloader=False to prevent double run
+    if not args.no_browser:
+        Timer(1.0, open_browser).start()
+    app.run(port=args.port, debug=True, use_reloader=False)  # Set use_reloader=False to prevent double run
 
 # NOTE: This file is a Flask-based HTML report generator, not a PyQt5 form.
 # - QLabel/QDialog floating message dialogs and window settings are NOT applicable here.
@@ -9,12 +9,14 @@ from ui.mainform import Mainform
 from ui.metadata_form import MetadataForm
 from ui.archive_manager import ArchiveManager
 from ui.settings import SettingsForm
+from ui.form_registry import form_registry
+from logic.style_compiler import compile_stylesheet
 from .calendar import CalendarView
 from logic.update_dates import update_dates, add_date, remove_date, modify_date
 from logic.date_utils import warn_if_start_date_not_in_days
 import sys
 import os
-import shutil
+import sqlite3
 import datetime
 from datetime import datetime, timedelta
 from ui.monthly_summary import get_summary_text
@@ -24,10 +26,12 @@ from logic.db_interface import (
     insert_class,
     update_class,
     set_class_archived,
+    get_archived_classes,
     get_all_defaults,
     get_form_settings,
-    get_message_defaults,
+    purge_orphans,
 )
+from ui.toast import show_message_dialog
 from logic.display import center_widget, scale_and_center, apply_window_flags
 
 DB_PATH = os.path.join("data", "001attendance.db")
@@ -63,27 +67,8 @@ class Launcher(QMainWindow):
         def get_setting(key, fallback):
             return form_settings.get(key) if form_settings.get(key) not in (None, "") else default_settings.get(key, fallback)
         form_font_size = int(get_setting("font_size", 12))
-        button_font_size = int(get_setting("button_font_size", form_font_size))
-        table_font_size = int(get_setting("table_font_size", form_font_size))
-        table_header_font_size = int(get_setting("table_header_font_size", form_font_size))
-        form_bg_color = get_setting("bg_color", "#e3f2fd")
-        button_bg_color = get_setting("button_bg_color", "#1976d2")
-        button_fg_color = get_setting("button_fg_color", "#ffffff")
-        table_bg_color = get_setting("table_bg_color", "#ffffff")
-        table_fg_color = get_setting("table_fg_color", "#222222")
-        table_header_bg_color = get_setting("table_header_bg_color", "#1976d2")
-        table_header_fg_color = get_setting("table_header_fg_color", "#ffffff")
-        table_header_font_size = int(get_setting("table_header_font_size", form_font_size))
         QApplication.instance().setFont(QFont(get_setting("font_family", "Segoe UI"), form_font_size))
-        style = f"""
-            QWidget {{ background-color: {form_bg_color}; }}
-            QLabel, QLineEdit {{ font-size: {form_font_size}pt; }}
-            QPushButton {{ background-color: {button_bg_color}; color: {button_fg_color}; font-size: {button_font_size}pt; }}
-            QTableView, QTableWidget {{ background-color: {table_bg_color}; }}
-            QHeaderView::section {{ background-color: {table_header_bg_color}; color: {table_header_fg_color}; font-size: {table_header_font_size}pt; }}
-            QTableWidget::item {{ color: {table_fg_color}; font-size: {table_font_size}pt; }}
-        """
-        QApplication.instance().setStyleSheet(style)
+        QApplication.instance().setStyleSheet(compile_stylesheet("Launcher"))
         # Center the window on open
         self.center_window()
 
@@ -110,8 +95,9 @@ class Launcher(QMainWindow):
 
         # Dynamically set initial window size based on widest entry in each column
         from PyQt5.QtGui import QFontMetrics, QFont
-        table_font_size = int(get_all_defaults().get("table_font_size", 12))
-        table_header_font_size = int(get_all_defaults().get("table_header_font_size", 16))
+        table_defaults = get_all_defaults()
+        table_font_size = int(table_defaults.get("table_font_size", 12))
+        table_header_font_size = int(table_defaults.get("table_header_font_size", 16))
         font = QFont("Segoe UI", table_font_size)
         header_font = QFont("Segoe UI", table_header_font_size)
         metrics = QFontMetrics(font)
@@ -192,6 +178,9 @@ class Launcher(QMainWindow):
         # print("[DEBUG] populate_table start")
         """Populate the table with class data where archive = 'No', sorted by company (A-Z)."""
         self.table.setRowCount(0)  # Clear the table before repopulating
+        from PyQt5.QtGui import QFont
+        table_font_size = int(get_all_defaults().get("table_font_size", 12))
+        font = QFont("Segoe UI", table_font_size)
         sorted_classes = sorted(
             self.classes.values(),
             key=lambda row: row.get("company", "Unknown")
@@ -202,15 +191,11 @@ class Launcher(QMainWindow):
                 self.table.insertRow(row_position)
                 item0 = QTableWidgetItem(class_row["class_no"])
                 item1 = QTableWidgetItem(class_row.get("company", "Unknown"))
-                from PyQt5.QtGui import QFont
-                table_font_size = int(get_all_defaults().get("table_font_size", 12))
-                font = QFont("Segoe UI", table_font_size)
                 item0.setFont(font)
                 item1.setFont(font)
                 self.table.setItem(row_position, 0, item0)
                 self.table.setItem(row_position, 1, item1)
         # --- Always set row height after populating ---
-        table_font_size = int(get_all_defaults().get("table_font_size", 12))
         row_height = int(table_font_size * 2.4)
         for row in range(self.table.rowCount()):
             self.table.setRowHeight(row, row_height)
@@ -234,9 +219,16 @@ class Launcher(QMainWindow):
             return
 
         class_id = self.table.item(selected_row, 0).text()
-        # Fetch latest class data from DB
-        class_data = get_class_by_id(class_id)
-        self.mainform = Mainform(class_id, {"classes": {class_id: class_data}}, self.theme)
+        self.show_mainform(class_id)
+
+    def show_mainform(self, class_id):
+        """Show the Mainform for class_id, reusing the pre-warmed one when it is still current."""
+        self.mainform = form_registry.take_mainform(class_id)
+        if self.mainform is None:
+            # Fetch latest class data from DB
+            class_data = get_class_by_id(class_id)
+            self.mainform = Mainform(class_id, {"classes": {class_id: class_data}}, self.theme)
+        form_registry.remember_class(class_id)
         self.mainform.showMaximized()  # Open the Mainform maximized
         self.mainform.closed.connect(self.show_launcher)  # Reopen Launcher when Mainform is closed
         self.hide()  # Hide the Launcher instead of closing it
@@ -304,7 +296,11 @@ class Launcher(QMainWindow):
 
         class_id = self.table.item(selected_row, 0).text()
         company = self.table.item(selected_row, 1).text()
-        set_class_archived(class_id, archived=True)
+        try:
+            set_class_archived(class_id, archived=True)
+        except ValueError as e:
+            QMessageBox.warning(self, "Archive Class", str(e))
+            return
         self.refresh_data()
         # --- Ensure columns are stretched after refresh ---
         header = self.table.horizontalHeader()
@@ -315,11 +311,7 @@ class Launcher(QMainWindow):
 
     def open_archive_manager(self):
         """Open the Archive Manager for all archived classes."""
-        archived_classes = {
-            row["class_no"]: row
-            for row in get_all_classes()
-            if row.get("archive", "Yes") == "Yes"
-        }
+        archived_classes = {row["class_no"]: row for row in get_archived_classes()}
 
         if not archived_classes:
             QMessageBox.information(self, "No Archived Classes", "There are no archived classes to manage.")
@@ -359,27 +351,9 @@ class Launcher(QMainWindow):
         def get_setting(key, fallback):
             return form_settings.get(key) if form_settings.get(key) not in (None, "") else default_settings.get(key, fallback)
         form_font_size = int(get_setting("font_size", 12))
-        button_font_size = int(get_setting("button_font_size", form_font_size))
         table_font_size = int(get_setting("table_font_size", form_font_size))
-        table_header_font_size = int(get_setting("table_header_font_size", form_font_size))
-        form_bg_color = get_setting("bg_color", "#e3f2fd")
-        button_bg_color = get_setting("button_bg_color", "#1976d2")
-        button_fg_color = get_setting("button_fg_color", "#ffffff")
-        table_bg_color = get_setting("table_bg_color", "#ffffff")
-        table_fg_color = get_setting("table_fg_color", "#222222")
-        table_header_bg_color = get_setting("table_header_bg_color", "#1976d2")
-        table_header_fg_color = get_setting("table_header_fg_color", "#ffffff")
-        table_header_font_size = int(get_setting("table_header_font_size", form_font_size))
         QApplication.instance().setFont(QFont(get_setting("font_family", "Segoe UI"), form_font_size))
-        style = f"""
-            QWidget {{ background-color: {form_bg_color}; }}
-            QLabel, QLineEdit {{ font-size: {form_font_size}pt; }}
-            QPushButton {{ background-color: {button_bg_color}; color: {button_fg_color}; font-size: {button_font_size}pt; }}
-            QTableView, QTableWidget {{ background-color: {table_bg_color}; }}
-            QHeaderView::section {{ background-color: {table_header_bg_color}; color: {table_header_fg_color}; font-size: {table_header_font_size}pt; }}
-            QTableWidget::item {{ color: {table_fg_color}; font-size: {table_font_size}pt; }}
-        """
-        QApplication.instance().setStyleSheet(style)
+        QApplication.instance().setStyleSheet(compile_stylesheet("Launcher"))
         # --- Force update of table data font size for instant effect ---
         if hasattr(self, 'table'):
             for row in range(self.table.rowCount()):
@@ -407,12 +381,7 @@ class Launcher(QMainWindow):
 
     def open_mainform_after_save(self, class_id):
         """Open the Mainform after saving a new class."""
-        # Fetch latest class data from DB
-        class_data = get_class_by_id(class_id)
-        self.mainform = Mainform(class_id, {"classes": {class_id: class_data}}, self.theme)
-        self.mainform.showMaximized()
-        self.mainform.closed.connect(self.show_launcher)
-        self.hide()
+        self.show_mainform(class_id)
 
     def refresh_data(self):
         """Refresh the data and table in the Launcher."""
@@ -448,6 +417,7 @@ class Launcher(QMainWindow):
 
     def showEvent(self, event):
         super().showEvent(event)
+        form_registry.schedule_prewarm(self.theme)
         # print(f"[DEBUG] Window size after show: width={self.width()}, height={self.height()}")
 
 def generate_dates(start_date_str, days_str, max_classes):
@@ -499,52 +469,31 @@ class MonthlySummaryDialog(QDialog):
 
 
 def backup_sqlite_db():
-    """Backup the SQLite DB to /data/backup/ with a timestamp."""
+    """Backup the SQLite DB and archive.db to /data/backup/ with a timestamp, then purge orphaned rows."""
     if not os.path.exists(DB_PATH):
         print("No database file found to backup.")
         return
     if not os.path.exists(BACKUP_DIR):
         os.makedirs(BACKUP_DIR)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")  # <-- PATCHED LINE
-    backup_path = os.path.join(BACKUP_DIR, f"001attendance_{timestamp}.db")
-    shutil.copy2(DB_PATH, backup_path)
-    print(f"✅ Database backed up to {backup_path}")
-
-def show_message_dialog(parent, text, duration=2000):
-    from PyQt5.QtCore import QTimer, Qt
-    from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(text)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    msg_dialog.adjustSize()
-    screen = parent.window().screen() if hasattr(parent.window(), 'screen') else None
-    if screen:
-        scr_geo = screen.geometry()
-        x = scr_geo.x() + (scr_geo.width() - msg_dialog.width()) // 2
-        y = scr_geo.y() + (scr_geo.height() - msg_dialog.height()) // 2
-    else:
-        x = 400
-        y = 300
-    msg_dialog.move(x, y)
-    msg_dialog.show()
-    parent._msg_dialog = msg_dialog  # Keep reference to prevent GC
-    QTimer.singleShot(duration, msg_dialog.close)
+    # Archived classes live only in archive.db, so it is backed up with the same timestamp
+    archive_path = os.path.join(os.path.dirname(DB_PATH), "archive.db")
+    for db_path, name in ((DB_PATH, "001attendance"), (archive_path, "archive")):
+        if not os.path.exists(db_path):
+            continue
+        backup_path = os.path.join(BACKUP_DIR, f"{name}_{timestamp}.db")
+        # The backup API includes changes still in the WAL file, which copying the .db file would miss
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(backup_path)
+        source.backup(target)
+        target.close()
+        source.close()
+        print(f"✅ Database backed up to {backup_path}")
+    # Only once the backups exist: drop rows left behind by deletes from before the FK cascades.
+    # This deletes and VACUUMs, so the backups above keep the DB exactly as it was.
+    deleted, reclaimed = purge_orphans()
+    if deleted:
+        print(f"Purged orphaned rows {deleted}, reclaimed {reclaimed / 1024:.1f} KB")
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTableView, QVBoxLayout, QWidget, QHeaderView, QAbstractItemView, QLabel,
     QHBoxLayout, QFrame, QGridLayout, QPushButton, QMessageBox, QStyledItemDelegate, QDialog, QSizePolicy
 )
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal, QTimer, QEvent
+from PyQt5.QtCore import Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex, pyqtSignal, QTimer, QEvent, QSize
 from PyQt5.QtGui import QColor, QFont
 from logic.parser import load_data, save_data
 from ui.student_form import StudentForm
@@ -14,58 +14,34 @@ from .archive_manager import ArchiveManager
 import subprocess  # Import subprocess to run external scripts
 import sys
 import re
+import sqlite3
 import time  # Import time for profiling
 import os # Import sys and os for path manipulation
 from .calendar import CalendarView, launch_calendar  # Make sure to import the new function
 from logic.update_dates import update_dates, add_date, remove_date, modify_date  # Import the new functions
 from PyQt5.QtCore import QItemSelection, QItemSelectionModel
 from .pal_cod_form import PALCODForm
+from .form_registry import form_registry
+from logic.style_compiler import compile_stylesheet
 from ui.settings import SettingsForm  # Make sure this import is at the top
 from logic.db_interface import (
     get_class_by_id,
     get_students_by_class,
-    get_attendance_by_student,
+    get_attendance_by_class,
     update_class,
     update_student,
     get_all_defaults,
-    set_attendance,
     get_form_settings,
-    get_message_defaults,
 )
+from logic.attendance_journal import AttendanceJournal
+from ui.toast import show_message_dialog
 
 from logic.display import center_widget, scale_and_center, apply_window_flags
+from logic.date_utils import parse_max_classes
 
 # Add the src directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-def show_message_dialog(parent, message, timeout=2000):
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout
-    from PyQt5.QtCore import Qt
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(message)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    msg_dialog.adjustSize()
-    parent_geo = parent.geometry() if parent else None
-    if parent_geo:
-        msg_dialog.move(parent.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-    msg_dialog.show()
-    QTimer.singleShot(timeout, msg_dialog.accept)
 
 SHOW_HIDE_FIELDS = [
     ("show_nickname", "Nickname"),
@@ -79,15 +55,42 @@ SHOW_HIDE_FIELDS = [
     ("show_l", "L"),
 ]
 
-class TableModel(QAbstractTableModel):
-    def __init__(self, students, attendance_dates, class_time=2, mainform=None, parent=None):
+# Frozen columns that show a student field as-is
+FROZEN_FIELDS = {
+    "Name": "name",
+    "Nickname": "nickname",
+    "Company No": "company_no",
+    "Score": "score",
+    "Pre-test": "pre_test",
+    "Post-test": "post_test",
+    "Note": "note",
+}
+
+
+class ClassGridModel(QAbstractTableModel):
+    """
+    The whole class grid: the frozen student columns followed by one column per attendance date,
+    with the running total in row 0. The Mainform shows it through two GridColumnsProxy views,
+    so the data is held once and an edit reaches both tables through one dataChanged.
+    """
+
+    def __init__(self, students, frozen_headers, attendance_dates, class_time=2, mainform=None, parent=None):
         super().__init__(parent)
         self.students = students  # dict of student_id: student_data
-        self.attendance_dates = attendance_dates
         self.student_keys = list(students.keys())
+        self.frozen_headers = frozen_headers
+        self.attendance_dates = attendance_dates
         self.class_time = class_time
         self.mainform = mainform
-
+        # P/A/L backgrounds, built once per model rather than once per painted cell
+        self.colors = {}
+        if mainform and getattr(mainform, 'pal_colors_enabled', True):
+            color_map = getattr(mainform, 'pal_colors', {'P': '#c8e6c9', 'A': '#ffcdd2', 'L': '#fff9c4'})
+            self.colors = {value: QColor(color) for value, color in color_map.items() if color}
+        self._pal_counts = {}  # student_id -> {"P": n, "A": n, "L": n}, filled as rows are painted
+        self.compute_running_total()
+
+    def compute_running_total(self):
         # PATCH: Running total skips columns with CIA or HOL
         self.running_total = []
         cumulative_total = 0
@@ -108,57 +111,117 @@ class TableModel(QAbstractTableModel):
         return 1 + len(self.student_keys)
 
     def columnCount(self, parent=QModelIndex()):
-        return len(self.attendance_dates)
+        return len(self.frozen_headers) + len(self.attendance_dates)
 
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
             return None
         row = index.row()
         col = index.column()
+        frozen_count = len(self.frozen_headers)
+        if col < frozen_count:
+            if role == Qt.DisplayRole:
+                return self.frozen_value(row, self.frozen_headers[col])
+            return None
+        col -= frozen_count
         if row == 0:
             if role == Qt.DisplayRole:
                 return self.running_total[col]
             return None
         student_id = self.student_keys[row - 1]
-        date = self.attendance_dates[col]
-        value = self.students[student_id]["attendance"].get(date, "-")
+        value = self.students[student_id]["attendance"].get(self.attendance_dates[col], "-")
         if role == Qt.DisplayRole:
             return value
         elif role == Qt.BackgroundRole:
-            if self.mainform and getattr(self.mainform, 'pal_colors_enabled', True):
-                # Enhanced debug output for P/A/L coloring
-                color_map = getattr(self.mainform, 'pal_colors', {'P': '#c8e6c9', 'A': '#ffcdd2', 'L': '#fff9c4'})
-                color = color_map.get(value, None)
-                print(f"[PAL COLOR DEBUG] row={row}, col={col}, student_id={student_id}, date={date}, value={value}, pal_colors_enabled={self.mainform.pal_colors_enabled}, color={color}")
-                if color:
-                    return QColor(color)
-            else:
-                print(f"[PAL COLOR DEBUG] row={row}, col={col}, student_id={student_id}, date={date}, value={value}, pal_colors_enabled={getattr(self.mainform, 'pal_colors_enabled', None)} (NO COLOR)")
-            return None
+            return self.colors.get(value)
         return None
 
+    def frozen_value(self, row, header):
+        if row == 0:
+            if header == "#":
+                return ""
+            return "Running Total" if header == "Name" else "-"
+        student_id = self.student_keys[row - 1]
+        student = self.students[student_id]
+        if header == "#":
+            return row
+        if header == "Attn":
+            return len(student.get("attendance", {}))
+        if header in ("P", "A", "L"):
+            return self.pal_counts(student_id)[header]
+        field = FROZEN_FIELDS.get(header)
+        return student.get(field, "") if field else ""
+
+    def pal_counts(self, student_id):
+        counts = self._pal_counts.get(student_id)
+        if counts is None:
+            attendance = self.students[student_id].get("attendance", {})
+            values = [attendance.get(date) for date in self.attendance_dates]
+            counts = {value: values.count(value) for value in ("P", "A", "L")}
+            self._pal_counts[student_id] = counts
+        return counts
+
     def setData(self, index, value, role=Qt.EditRole):
         row = index.row()
-        col = index.column()
-        if role == Qt.EditRole and row > 0:
+        col = index.column() - len(self.frozen_headers)
+        if role == Qt.EditRole and row > 0 and col >= 0:
             student_id = self.student_keys[row - 1]
+            attendance = self.students[student_id]["attendance"]
             date = self.attendance_dates[col]
-            self.students[student_id]["attendance"][date] = value
-            self.dataChanged.emit(index, index)
+            old_value = attendance.get(date)
+            attendance[date] = value
+            self._pal_counts.pop(student_id, None)
+            # The edited cell plus the row's Attn/P/A/L counts
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+            if value in ("CIA", "HOL") or old_value in ("CIA", "HOL"):
+                self.compute_running_total()
+                self.dataChanged.emit(self.index(0, len(self.frozen_headers)), self.index(0, self.columnCount() - 1))
             return True
         return False
 
     def flags(self, index):
+        if index.column() < len(self.frozen_headers):
+            return Qt.ItemIsSelectable | Qt.ItemIsEnabled
         if index.row() == 0:
             return Qt.ItemIsEnabled  # Running total row is not editable/selectable
         return Qt.ItemIsSelectable | Qt.ItemIsEnabled  # Remove Qt.ItemIsEditable
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole and orientation == Qt.Horizontal:
-            return self.attendance_dates[section]
+            frozen_count = len(self.frozen_headers)
+            if section < frozen_count:
+                return self.frozen_headers[section]
+            return self.attendance_dates[section - frozen_count]
         return None
 
+
+class GridColumnsProxy(QSortFilterProxyModel):
+    """One table's slice of a ClassGridModel: the frozen columns, or the date columns."""
+
+    def __init__(self, grid_model, frozen):
+        super().__init__(grid_model)
+        self.frozen = frozen
+        self.setDynamicSortFilter(False)
+        self.setSourceModel(grid_model)
+
+    @property
+    def headers(self):
+        grid_model = self.sourceModel()
+        return grid_model.frozen_headers if self.frozen else grid_model.attendance_dates
+
+    def filterAcceptsColumn(self, source_column, source_parent):
+        return (source_column < len(self.sourceModel().frozen_headers)) == self.frozen
+
+
 class AttendanceDelegate(QStyledItemDelegate):
+    """
+    Date cells. Every cell has the same size, so the size hint comes from the view's
+    uniform section sizes instead of measuring each value; only cells in the viewport are painted.
+    """
+    def sizeHint(self, option, index):
+        view = self.parent()
+        return QSize(view.horizontalHeader().defaultSectionSize(), view.verticalHeader().defaultSectionSize())
+
     def initStyleOption(self, option, index):
         super().initStyleOption(option, index)
         # Ensure delegate does NOT override model's BackgroundRole color
@@ -208,39 +271,6 @@ class DebugTableView(QTableView):
         super().mousePressEvent(event)
 
 
-class FrozenTableModel(QAbstractTableModel):
-    def __init__(self, data, headers, parent=None):
-        super().__init__(parent)
-        self._data = data  # List of lists (rows)
-        self.headers = headers  # List of column headers
-
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
-
-    def columnCount(self, parent=QModelIndex()):
-        return len(self.headers)
-
-    def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid():
-            return None
-        row = index.row()
-        col = index.column()
-        if role == Qt.DisplayRole:
-            try:
-                return self._data[row][col]
-            except IndexError:
-                return ""
-        return None
-
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
-            try:
-                return self.headers[section]
-            except IndexError:
-                return ""
-        return None
-
-
 class Mainform(QMainWindow):
     closed = pyqtSignal()  # Signal to notify when the Mainform is closed
 
@@ -280,7 +310,7 @@ class Mainform(QMainWindow):
         QApplication.instance().setFont(QFont(form_settings.get("font_family", "Segoe UI"), font_size))
         # --- Apply display preferences (center/scale) if not overridden by per-form settings ---
         if not win_w or not win_h:
-            display_settings = get_all_defaults()
+            display_settings = self.default_settings
             scale = str(display_settings.get("scale_windows", "1")) == "1"
             center = str(display_settings.get("center_windows", "1")) == "1"
             width_ratio = float(display_settings.get("window_width_ratio", 0.6))
@@ -291,6 +321,7 @@ class Mainform(QMainWindow):
                 center_widget(self)
         self.class_id = class_id
         self.theme = theme
+        self.attendance_journal = AttendanceJournal(self.class_id)  # undo/redo for attendance edits
         # --- PATCH: Load from DB ---
         self.class_data = get_class_by_id(self.class_id)
         show_dates_db = self.class_data.get("show_dates", "Yes")
@@ -320,11 +351,10 @@ class Mainform(QMainWindow):
                     pass
 
         self.students = {}
+        attendance_by_student = get_attendance_by_class(self.class_id)  # one query, not one per student
         for student_row in get_students_by_class(self.class_id):
             student_id = student_row["student_id"]
-            attendance_records = get_attendance_by_student(student_id)
-            attendance = {rec["date"]: rec["status"] for rec in attendance_records}
-            student_row["attendance"] = attendance
+            student_row["attendance"] = attendance_by_student.get(str(student_id), {})
             self.students[student_id] = student_row
         self.metadata = self.class_data  # All fields are now top-level
 
@@ -361,8 +391,7 @@ class Mainform(QMainWindow):
                 dates = ["--/--/--" for _ in range(max_classes)]
             self.metadata["dates"] = dates
 
-        # --- PATCH: Load per-class show/hide state from DB, fallback to defaults ---
-        self.default_settings = self.load_default_settings()
+        # --- PATCH: Load per-class show/hide state from DB, fallback to defaults (loaded above) ---
         self.column_visibility = {
             "Nickname": (self.class_data.get("show_nickname") or self.default_settings.get("show_nickname", "Yes")) == "Yes",
             "Company No": (self.class_data.get("show_company_no") or self.default_settings.get("show_company_no", "Yes")) == "Yes",
@@ -381,6 +410,18 @@ class Mainform(QMainWindow):
 
         self.frozen_table_width = 0
         self._syncing_selection = False  # <-- Add this line
+        self.font_size = font_size
+        self._setting_date_width = False
+        self._pending_date_width = None
+        self._date_width_timer = QTimer(self)
+        self._date_width_timer.setSingleShot(True)
+        self._date_width_timer.setInterval(300)
+        self._date_width_timer.timeout.connect(self.save_date_column_width)
+        self._pending_frozen_widths = {}
+        self._frozen_width_timer = QTimer(self)
+        self._frozen_width_timer.setSingleShot(True)
+        self._frozen_width_timer.setInterval(300)
+        self._frozen_width_timer.timeout.connect(self.save_frozen_column_widths)
         self.init_ui()
 
         self.installEventFilter(self)  # <-- Add this line
@@ -392,11 +433,11 @@ class Mainform(QMainWindow):
         QShortcut(QKeySequence("Ctrl+="), self, self.zoom_in)  # For some keyboards
         QShortcut(QKeySequence("Ctrl+-"), self, self.zoom_out)
         QShortcut(QKeySequence("Ctrl+0"), self, self.reset_zoom)
+        QShortcut(QKeySequence.Undo, self, self.undo_attendance_edit)
+        QShortcut(QKeySequence.Redo, self, self.redo_attendance_edit)
 
         # --- Apply display preferences ---
-        from logic.db_interface import get_all_defaults
-        display_settings = get_all_defaults()
-        from logic.display import center_widget, scale_and_center, apply_window_flags
+        display_settings = self.default_settings
         scale = str(display_settings.get("scale_windows", "1")) == "1"
         center = str(display_settings.get("center_windows", "1")) == "1"
         width_ratio = float(display_settings.get("window_width_ratio", 0.6))
@@ -409,24 +450,24 @@ class Mainform(QMainWindow):
 
     def zoom_in(self):
         self.font_size = min(self.font_size + 1, 32)
-        from PyQt5.QtWidgets import QApplication
-        from PyQt5.QtGui import QFont
-        QApplication.instance().setFont(QFont("Segoe UI", self.font_size))
+        self.apply_zoom()
 
     def zoom_out(self):
         self.font_size = max(self.font_size - 1, 8)
-        from PyQt5.QtWidgets import QApplication
-        from PyQt5.QtGui import QFont
-        QApplication.instance().setFont(QFont("Segoe UI", self.font_size))
+        self.apply_zoom()
 
     def reset_zoom(self):
         self.font_size = int(self.default_settings.get("font_size", 12))
+        self.apply_zoom()
+
+    def apply_zoom(self):
+        """Set the zoomed font. Date columns have a fixed width, so nothing is re-measured per column."""
         from PyQt5.QtWidgets import QApplication
         from PyQt5.QtGui import QFont
         QApplication.instance().setFont(QFont("Segoe UI", self.font_size))
 
     def reset_scrollable_column_widths(self):
-        """Reset the column widths of the scrollable table to their default or DB values, and prevent stretching."""
+        """Reset the date columns to the DB width (all the same width, no stretching)."""
         # Use width_date from DB if present, else fallback to 50
         width = 50
         if self.class_data.get("width_date"):
@@ -434,10 +475,18 @@ class Mainform(QMainWindow):
                 width = int(self.class_data["width_date"])
             except Exception:
                 width = 50
-        for col in range(self.scrollable_table.model().columnCount()):
-            self.scrollable_table.setColumnWidth(col, width)
-            # Prevent stretching: always set to Interactive
-            self.scrollable_table.horizontalHeader().setSectionResizeMode(col, QHeaderView.Interactive)
+        header = self.scrollable_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(False)
+        self.set_date_column_width(width)
+
+    def set_date_column_width(self, width):
+        """Size every date column at once through the header's default section size (no per-column loop)."""
+        self._setting_date_width = True
+        try:
+            self.scrollable_table.horizontalHeader().setDefaultSectionSize(width)
+        finally:
+            self._setting_date_width = False
 
     def init_ui(self):
         """Initialize the UI components."""
@@ -486,7 +535,7 @@ class Mainform(QMainWindow):
         for row, (label1, value1, label2, value2) in enumerate(metadata_fields):
             # Label 1
             label1_widget = QLabel(label1)
-            label1_widget.setStyleSheet("font-weight: bold; text-align: left; border: none; padding-left: 5px; padding-right: 5px;")
+            label1_widget.setObjectName("metadataLabel")
             label1_widget.setMinimumWidth(label1_min)
             label1_widget.setFont(self.metadata_font)
             label1_widget.setFixedHeight(metrics.height() + 4)
@@ -494,14 +543,14 @@ class Mainform(QMainWindow):
             # Value 1 (always show border, even if blank)
             v1 = value1 if value1.strip() else " "
             value1_widget = QLabel(v1)
-            value1_widget.setStyleSheet("text-align: left; border: 1px solid gray; padding-left: 5px; padding-right: 5px;")
+            value1_widget.setObjectName("metadataValue")
             value1_widget.setMinimumWidth(value1_min)
             value1_widget.setFont(self.metadata_font)
             value1_widget.setFixedHeight(metrics.height() + 4)
             metadata_layout.addWidget(value1_widget, row, 1)
             if label2:
                 label2_widget = QLabel(label2)
-                label2_widget.setStyleSheet("font-weight: bold; text-align: left; border: none; padding-left: 5px; padding-right: 5px;")
+                label2_widget.setObjectName("metadataLabel")
                 label2_widget.setMinimumWidth(label2_min)
                 label2_widget.setFont(self.metadata_font)
                 label2_widget.setFixedHeight(metrics.height() + 4)
@@ -509,7 +558,7 @@ class Mainform(QMainWindow):
             # Value 2 (always show border, even if blank)
             v2 = value2 if value2.strip() else " "
             value2_widget = QLabel(v2)
-            value2_widget.setStyleSheet("text-align: left; border: 1px solid gray; padding-left: 5px; padding-right: 5px;")
+            value2_widget.setObjectName("metadataValue")
             value2_widget.setMinimumWidth(value2_min)
             value2_widget.setFont(self.metadata_font)
             value2_widget.setFixedHeight(metrics.height() + 4)
@@ -561,32 +610,26 @@ class Mainform(QMainWindow):
         # Create both tables before referencing them
         self.frozen_table = QTableView()
         self.scrollable_table = QTableView()
+        # Table styling comes from the compiled Mainform stylesheet (see logic.style_compiler)
+        self.frozen_table.setObjectName("frozenTable")
+        self.scrollable_table.setObjectName("scrollableTable")
         # Set minimum section size for both tables to allow very narrow columns
         self.frozen_table.horizontalHeader().setMinimumSectionSize(10)
         self.scrollable_table.horizontalHeader().setMinimumSectionSize(10)
         self.frozen_table.verticalHeader().setVisible(False)
         self.scrollable_table.verticalHeader().setVisible(False)
+        # Uniform, unwrapped date cells: the view lays out and paints only the visible columns
+        self.scrollable_table.setWordWrap(False)
 
         # Only create the container and set parents after both tables are created
         self.table_container = QWidget()
         self.table_container.setContentsMargins(0, 0, 0, 0)
-        self.table_container.setStyleSheet("background: transparent;")
+        self.table_container.setObjectName("tableContainer")
         self.table_container.setMinimumHeight(300)  # Adjust as needed
 
         self.frozen_table.setParent(self.table_container)
         self.scrollable_table.setParent(self.table_container)
 
-        def position_tables():
-            frozen_width = self.frozen_table.width()
-            height = self.table_container.height()
-            self.frozen_table.setGeometry(0, 0, frozen_width, height)
-            # Move scrollable_table left by 1px for a perfect join
-            self.scrollable_table.setGeometry(frozen_width - 1, 0, self.table_container.width() - frozen_width + 1, height)
-            # Debug output for geometry
-            print("[DEBUG] table_container:", self.table_container.geometry())
-            print("[DEBUG] frozen_table:", self.frozen_table.geometry())
-            print("[DEBUG] scrollable_table:", self.scrollable_table.geometry())
-        
         # Remove debug borders for production
         # self.frozen_table.setStyleSheet(self.frozen_table.styleSheet() + "QTableView { border: 2px solid red !important; }")
         # self.scrollable_table.setStyleSheet(self.scrollable_table.styleSheet() + "QTableView { border: 2px solid blue !important; }")
@@ -600,13 +643,8 @@ class Mainform(QMainWindow):
         # Make frozen_table 1px wider for a perfect join
         self.frozen_table.setFrameStyle(QFrame.NoFrame)
         self.scrollable_table.setFrameStyle(QFrame.NoFrame)
-        self.frozen_table.setStyleSheet("QTableView { border: none; border-top: none; border-bottom: none; border-left: none; margin: 0px; padding: 0px; }")
-        self.scrollable_table.setStyleSheet("QTableView { border: none; border-top: none; border-bottom: none; border-right: none; border-left: none; margin: 0px; padding: 0px; }")
         # Make frozen_table 1px wider
         self.frozen_table.resize(self.frozen_table.width() + 1, self.frozen_table.height())
-        # Remove the vertical line (border-left) under the scrollable table
-        # Remove any background override for items to allow model's BackgroundRole to show
-        self.scrollable_table.setStyleSheet(self.scrollable_table.styleSheet().replace('QTableView::item { border-left: none; }', ''))
         # Ensure the table_layout has no spacing or margins
         # self.table_layout.setSpacing(0)
         # self.table_layout.setContentsMargins(0, 0, 0, 0)
@@ -614,12 +652,8 @@ class Mainform(QMainWindow):
         # Add tables to the layout
         # self.table_layout.addWidget(self.frozen_table)
         # self.table_layout.addWidget(self.scrollable_table)
-        # Now set header and corner button styles (after both tables exist)
-        self.frozen_table.horizontalHeader().setStyleSheet("font-weight: bold; border: none;")
-        self.scrollable_table.horizontalHeader().setStyleSheet("border: none;")
-        corner_style = "QTableCornerButton::section { background: transparent; border: none; }"
-        self.frozen_table.setStyleSheet(self.frozen_table.styleSheet() + corner_style)
-        self.scrollable_table.setStyleSheet(self.scrollable_table.styleSheet() + corner_style)
+        # Borders, header, corner button and selection styles: one sheet on the Mainform
+        self.setStyleSheet(compile_stylesheet("Mainform"))
 
         # Connect double-click signal to edit_student method
         self.frozen_table.doubleClicked.connect(self.edit_student)
@@ -664,30 +698,16 @@ class Mainform(QMainWindow):
         self.container.setLayout(self.layout)
         self.setCentralWidget(self.container)
 
-        self.refresh_student_table()  # Populate the tables during initialization
+        self.refresh_student_table(reload=False)  # Populate the tables from what __init__ loaded
         self.reset_column_widths()
         self.reset_scrollable_column_widths()
 
         self.scrollable_table.doubleClicked.connect(self.edit_attendance_field)
 
-        highlight_style = """
-QTableView::item:selected {
-    background: #b3d7ff;  /* Light blue highlight */
-}
-"""
-        self.frozen_table.setStyleSheet(self.frozen_table.styleSheet() + highlight_style)
-        self.scrollable_table.setStyleSheet(self.scrollable_table.styleSheet() + highlight_style)
-
         # self.frozen_table.selectionModel().selectionChanged.connect(self.debug_frozen_selection)
         # self.scrollable_table.selectionModel().selectionChanged.connect(self.debug_scrollable_selection)
 
-        # Force a style update and geometry refresh to ensure the left border is visible on startup
-        self.frozen_table.setStyleSheet(
-            self.frozen_table.styleSheet() +
-            "QTableView { border-left: none; } "
-            "QTableView::item { border-left: 1px solid #000; } "
-            "QHeaderView::section { border-left: 1px solid #000 !important; }"
-        )
+        # Geometry refresh to ensure the left border is visible on startup
         self.frozen_table.viewport().update()
         self.frozen_table.horizontalHeader().repaint()
         self.frozen_table.repaint()
@@ -720,10 +740,11 @@ QTableView::item:selected {
                 "Note": "width_note",
             }
             db_key = width_db_map.get(header)
-            if db_key:
-                from logic.db_interface import update_class, get_class_by_id
-                update_class(self.class_id, {db_key: newSize})
-                self.class_data = get_class_by_id(self.class_id)
+            # Widths applied from the DB (opening, refreshing) match what is stored and aren't written back;
+            # a drag is saved once it settles, all changed columns in one update
+            if db_key and str(self.class_data.get(db_key)) != str(newSize):
+                self._pending_frozen_widths[db_key] = newSize
+                self._frozen_width_timer.start()
                 from PyQt5.QtWidgets import QApplication
                 for widget in QApplication.topLevelWidgets():
                     if hasattr(widget, "width_edits") and db_key in widget.width_edits:
@@ -737,13 +758,34 @@ QTableView::item:selected {
         self.position_tables()
 
     def on_scrollable_header_resized(self, logicalIndex, oldSize, newSize):
+        """A date column was dragged: give every date column that width, and save it once the drag settles."""
+        if self._setting_date_width:
+            return
+        # All date columns use width_date
+        self.set_date_column_width(newSize)
+        self._pending_date_width = newSize
+        self._date_width_timer.start()
+
+    def save_frozen_column_widths(self):
+        """Save the frozen column widths changed since the last save, in one update."""
+        widths, self._pending_frozen_widths = self._pending_frozen_widths, {}
+        if not widths:
+            return
+        try:
+            update_class(self.class_id, widths)
+            self.class_data.update(widths)
+        except Exception as e:
+            print(f"[ERROR] save_frozen_column_widths: {e}")
+
+    def save_date_column_width(self):
         """Live-sync: Save scrollable (dates) column width to DB and update ShowHideForm if open."""
+        newSize = self._pending_date_width
         try:
-            # All date columns use width_date
             db_key = "width_date"
-            from logic.db_interface import update_class, get_class_by_id
+            if str(self.class_data.get(db_key)) == str(newSize):
+                return
             update_class(self.class_id, {db_key: newSize})
-            self.class_data = get_class_by_id(self.class_id)
+            self.class_data[db_key] = newSize
             from PyQt5.QtWidgets import QApplication
             for widget in QApplication.topLevelWidgets():
                 if hasattr(widget, "width_edits") and db_key in widget.width_edits:
@@ -780,7 +822,7 @@ QTableView::item:selected {
                 self.refresh_student_table()
                 self.frozen_table.selectionModel().clearSelection()  # Clear selection after adding
             default_attendance = self.get_default_attendance_for_new_student()
-            student_form = StudentForm(self, self.class_id, {}, refresh_callback, default_attendance=default_attendance)
+            student_form = form_registry.acquire(StudentForm, self, self.class_id, {}, refresh_callback, default_attendance=default_attendance)
             student_form.exec_()
             if getattr(student_form, "bulk_import_requested", False):
                 student_form.open_bulk_import_dialog()
@@ -793,7 +835,7 @@ QTableView::item:selected {
                     print("Refreshing student table after editing a student...")
                     self.refresh_student_table()
                     self.frozen_table.selectionModel().clearSelection()  # Clear selection after editing
-                student_form = StudentForm(self, self.class_id, {}, refresh_callback, student_id, student_data)
+                student_form = form_registry.acquire(StudentForm, self, self.class_id, {}, refresh_callback, student_id, student_data)
                 student_form.exec_()
                 if getattr(student_form, "bulk_import_requested", False):
                     student_form.open_bulk_import_dialog()
@@ -974,17 +1016,22 @@ QTableView::item:selected {
 
     def closeEvent(self, event):
         """Handle the close event to reopen the Launcher."""
+        self.save_frozen_column_widths()  # a drag that hasn't settled yet
+        if self._date_width_timer.isActive():
+            self._date_width_timer.stop()
+            self.save_date_column_width()
         self.closed.emit()  # Emit the closed signal
         event.accept()  # Accept the close event
 
-    def refresh_student_table(self):
-        """Refresh the student table and always reload show_pal_colors from DB for persistence."""
+    def refresh_student_table(self, reload=True):
+        """
+        Refresh the student table and always reload show_pal_colors from DB for persistence.
+        reload=False reuses the class, students and attendance __init__ has just loaded.
+        """
         # Always reload class_data from DB to get the latest show_pal_colors
-        self.class_data = get_class_by_id(self.class_id)
+        if reload:
+            self.class_data = get_class_by_id(self.class_id)
         self.load_pal_colors()  # This will set self.pal_colors_enabled from DB
-
-        # Focused debug for 'Dates' column and scrollable table visibility
-        self.class_data = get_class_by_id(self.class_id)
         self.metadata = self.class_data
         show_dates_db = self.class_data.get("show_dates", "Yes")
         self.column_visibility = {
@@ -1004,49 +1051,24 @@ QTableView::item:selected {
         }
         # print(f"[DATES DEBUG] show_dates from DB: {show_dates_db}")
         # print(f"[DATES DEBUG] scrollable_column_visibility['Dates']: {self.scrollable_column_visibility['Dates']}")
-        # ...existing code for rebuilding tables...
-        # Build attendance_dates and set model
-        attendance_dates = self.get_attendance_dates()  # <-- Use robust method
-        # print(f"[DATES DEBUG] attendance_dates used for model: {attendance_dates}")
-        active_students = {sid: s for sid, s in self.students.items() if s.get("active", "Yes") == "Yes"}
-        self.scrollable_table.setModel(TableModel(active_students, attendance_dates, mainform=self))
-        self.scrollable_table.setItemDelegate(AttendanceDelegate(self.scrollable_table))  # Always set delegate after model
-        # print(f"[UI DEBUG] scrollable_table columnCount: {self.scrollable_table.model().columnCount() if self.scrollable_table.model() else 'No model'}")
-        # Hide scrollable table if Dates is off or no columns
-        if not self.scrollable_column_visibility["Dates"] or self.scrollable_table.model().columnCount() == 0:
-            # print("[DATES DEBUG] Hiding scrollable table (attendance dates table)")
-            self.scrollable_table.hide()
-        else:
-            # print("[DATES DEBUG] Showing scrollable table (attendance dates table)")
-            self.scrollable_table.show()
-        # Force layout update after show/hide
-        self.scrollable_table.parentWidget().update()
-        self.scrollable_table.parentWidget().adjustSize()
-        self.scrollable_table.updateGeometry()
-        self.scrollable_table.repaint()
-        # print(f"[UI DEBUG] scrollable_table.isVisible(): {self.scrollable_table.isVisible()}")
-        # ...rest of method unchanged...
 
         self.ensure_max_teaching_dates()
         t1 = time.time()
         # print(f"[PROFILE] ensure_max_teaching_dates: {t1 - start:.3f}s")
 
-        self.students = {}
-        for student_row in get_students_by_class(self.class_id):
-            student_id = student_row["student_id"]
-            attendance_records = get_attendance_by_student(student_id)
-            attendance = {rec["date"]: rec["status"] for rec in attendance_records}
-            student_row["attendance"] = attendance
-            self.students[student_id] = student_row
+        if reload:
+            self.students = {}
+            attendance_by_student = get_attendance_by_class(self.class_id)  # one query, not one per student
+            for student_row in get_students_by_class(self.class_id):
+                student_id = student_row["student_id"]
+                student_row["attendance"] = attendance_by_student.get(str(student_id), {})
+                self.students[student_id] = student_row
         t2 = time.time()
         # print(f"[PROFILE] Reload students/attendance: {t2 - t1:.3f}s")
 
         # Only include students who are active
         active_students = {sid: s for sid, s in self.students.items() if s.get("active", "Yes") == "Yes"}
 
-        # --- PATCH: Always reload metadata from DB before using dates ---
-        self.class_data = get_class_by_id(self.class_id)
-        self.metadata = self.class_data
         # --- PATCH: Ensure metadata['dates'] is always set after DB reload ---
         from logic.db_interface import get_dates_by_class
         self.metadata["dates"] = get_dates_by_class(self.class_id)
@@ -1076,60 +1098,25 @@ QTableView::item:selected {
         if self.column_visibility.get("Note", True):
             frozen_headers.append("Note")
         self.frozen_headers = frozen_headers  # <-- Assign to self
-        frozen_data = []
-        # Add "Running Total" row
-        running_total_row = []
-        for header in self.frozen_headers:
-            if header == "#":
-                running_total_row.append("")
-            elif header == "Name":
-                running_total_row.append("Running Total")
-            else:
-                running_total_row.append("-")
-        frozen_data.append(running_total_row)
         # --- Use DB-driven attendance_dates for all attendance columns ---
         attendance_dates = self.metadata.get("dates", [])
-        # Add student rows
-        for idx, student in enumerate(active_students.values()):
-            row = []
-            for header in self.frozen_headers:
-                if header == "#":
-                    row.append(idx + 1)
-                elif header == "Name":
-                    row.append(student.get("name", ""))
-                elif header == "Nickname":
-                    row.append(student.get("nickname", ""))
-                elif header == "Company No":
-                    row.append(student.get("company_no", ""))
-                elif header == "Score":
-                    row.append(student.get("score", ""))
-                elif header == "Pre-test":
-                    row.append(student.get("pre_test", ""))
-                elif header == "Post-test":
-                    row.append(student.get("post_test", ""))
-                elif header == "Attn":
-                    row.append(len(student.get("attendance", {})))
-                elif header == "P":
-                    row.append(sum(1 for date in attendance_dates if student.get("attendance", {}).get(date) == "P"))
-                elif header == "A":
-                    row.append(sum(1 for date in attendance_dates if student.get("attendance", {}).get(date) == "A"))
-                elif header == "L":
-                    row.append(sum(1 for date in attendance_dates if student.get("attendance", {}).get(date) == "L"))
-                elif header == "Note":
-                    row.append(student.get("note", ""))  # Handle Note column
-                else:
-                    row.append("")
-            frozen_data.append(row)
-        self.frozen_table.setModel(FrozenTableModel(frozen_data, frozen_headers))
+        # One model for both tables; each shows its own columns through a proxy
+        old_model = getattr(self, "grid_model", None)
+        self.grid_model = ClassGridModel(active_students, frozen_headers, attendance_dates, mainform=self, parent=self)
+        self.frozen_table.setModel(GridColumnsProxy(self.grid_model, frozen=True))
         self.frozen_table.setItemDelegate(FrozenTableDelegate(self.frozen_table))
         t3 = time.time()
         # print(f"[PROFILE] Set frozen table model: {t3 - t2:.3f}s")
-        # print(f"[DEBUG] After setModel: frozen_table visible: {self.frozen_table.isVisible()}, geometry: {self.frozen_table.geometry()}")
 
-        self.scrollable_table.setModel(TableModel(active_students, attendance_dates, mainform=self))
+        self.scrollable_table.setModel(GridColumnsProxy(self.grid_model, frozen=False))
         self.scrollable_table.setItemDelegate(AttendanceDelegate(self.scrollable_table))
-        self.scrollable_table.show()
-        self.scrollable_table.viewport().update()  # Force repaint after setting the model
+        if old_model is not None:
+            old_model.deleteLater()
+        # Hide scrollable table if Dates is off or no columns
+        if not self.scrollable_column_visibility["Dates"] or not attendance_dates:
+            self.scrollable_table.hide()
+        else:
+            self.scrollable_table.show()
         t4 = time.time()
         # print(f"[PROFILE] Set scrollable table model: {t4 - t3:.3f}s")
         # print(f"[DEBUG] After setModel: scrollable_table visible: {self.scrollable_table.isVisible()}, geometry: {self.scrollable_table.geometry()}")
@@ -1169,7 +1156,7 @@ QTableView::item:selected {
         def refresh_callback():
             print("Callback triggered: Refreshing student table...")
             self.refresh_student_table()
-        student_form = StudentForm(self, self.class_id, {}, refresh_callback, student_id, student_data)
+        student_form = form_registry.acquire(StudentForm, self, self.class_id, {}, refresh_callback, student_id, student_data)
         student_form.move(
             self.geometry().center().x() - student_form.width() // 2,
             self.geometry().center().y() - student_form.height() // 2
@@ -1261,7 +1248,7 @@ QTableView::item:selected {
 
     def open_pal_cod_form(self, column_index=None):
         """Open the PALCODForm to update attendance."""
-        from .pal_cod_form import PALCODForm, show_message_dialog
+        from .pal_cod_form import PALCODForm
         import re
         print(f"[DEBUG] open_pal_cod_form: self.metadata = {self.metadata}")  # Print full metadata for debugging
         attendance_dates = self.metadata.get("dates", [])
@@ -1282,7 +1269,8 @@ QTableView::item:selected {
         if not re.match(r"^\d{2}/\d{2}/\d{4}$", date):
             print(f"[DEBUG] Skipping PALCODForm: date '{date}' does not match dd/MM/yyyy")
             return
-        pal_cod_form = PALCODForm(
+        pal_cod_form = form_registry.acquire(
+            PALCODForm,
             self,
             column_index,
             self.update_column_values,
@@ -1301,7 +1289,7 @@ QTableView::item:selected {
 
     def edit_attendance_field(self, index):
         """Edit the attendance field for the selected cell (cell workflow)."""
-        from .pal_cod_form import PALCODForm, show_message_dialog
+        from .pal_cod_form import PALCODForm
         row = index.row()
         col = index.column()
         # Row 0 is running total, not editable
@@ -1324,7 +1312,8 @@ QTableView::item:selected {
         student_data = self.students[student_id]
         student_name = student_data.get("name", "")
         # PALCODForm: cell workflow (single student/date)
-        pal_cod_form = PALCODForm(
+        pal_cod_form = form_registry.acquire(
+            PALCODForm,
             self,
             col,  # column_index
             None,  # update_column_callback (not used for single cell)
@@ -1340,12 +1329,10 @@ QTableView::item:selected {
             return
         if pal_cod_form.exec_() == QDialog.Accepted:
             new_value = pal_cod_form.selected_value
-            # Update the student's attendance for this date
-            self.students[student_id]["attendance"][date] = new_value
-            # Save to DB
-            from logic.db_interface import set_attendance
-            set_attendance(self.class_id, student_id, date, new_value)
-            self.refresh_student_table()
+            # Update the student's attendance for this date; both tables repaint from the model's dataChanged
+            self.scrollable_table.model().setData(index, new_value)
+            # Save to DB as one undoable edit
+            self.attendance_journal.apply([(student_id, date, new_value)], label=f"{student_name} {date}")
 
     def highlight_column(self, column_index):
         """Highlight the entire column when a header is clicked. (Stub)"""
@@ -1378,48 +1365,16 @@ QTableView::item:selected {
         def on_show_hide_saved(live_update=False):
             self.refresh_student_table()
             self.update_metadata_visibility()
-        self.show_hide_form = ShowHideForm(self, self.class_id, on_save_callback=on_show_hide_saved)
+        self.show_hide_form = form_registry.acquire(ShowHideForm, self, self.class_id, on_save_callback=on_show_hide_saved)
         # Disable only mainform buttons while dialog is open
         for btn in getattr(self, '_mainform_buttons', []):
             btn.setEnabled(False)
-        self.show_hide_form.finished.connect(lambda _: self._on_show_hide_closed())
+        if self.show_hide_form is not getattr(self, '_show_hide_dialog', None):
+            # The registry hands back the same dialog on later opens; connect it only once
+            self._show_hide_dialog = self.show_hide_form
+            self.show_hide_form.finished.connect(lambda _: self._on_show_hide_closed())
         self.show_hide_form.show()
 
-        # Overlap scrollable_table over frozen_table by setting a negative left margin
-        self.scrollable_table.setStyleSheet(
-            self.scrollable_table.styleSheet() +
-            "QTableView { margin-left: 20px; }"
-        )
-
-        # Add back the left border only for the actual table rows (not header)
-        corner_style = "QTableCornerButton::section { background: transparent; border: none; }"
-        highlight_style = """
-QTableView::item:selected {
-    background: #b3d7ff;  /* Light blue highlight */
-}
-"""
-        self.scrollable_table.setStyleSheet(
-            "QTableView { border: none; border-top: none; border-bottom: none; border-right: none; border-left: none; margin: 0px; padding: 0px; }"
-            + corner_style + highlight_style
-        )
-
-        # Only add a left border to the frozen table header and rows (not the whole table)
-        self.frozen_table.setStyleSheet(
-            self.frozen_table.styleSheet() +
-            "QTableView { border-left: none; } "
-            "QTableView::item { border-left: 1px solid #000; } "
-            "QHeaderView::section { border-left: 1px solid #000 !important; }"
-        )
-        self.frozen_table.viewport().update()
-        self.frozen_table.horizontalHeader().repaint()
-        self.frozen_table.repaint()
-        # Also trigger a geometry/layout update for the table container
-        self.table_container.updateGeometry()
-        self.table_container.repaint()
-        QTimer.singleShot(0, lambda: self.frozen_table.updateGeometry())
-        QTimer.singleShot(0, lambda: self.frozen_table.viewport().update())
-        QTimer.singleShot(0, lambda: self.frozen_table.horizontalHeader().repaint())
-
         # Show or hide the scrollable table based on show_dates value
         # (REMOVED: self.scrollable_table.setVisible(show_dates == "Yes"))
         # Let refresh_student_table handle visibility logic
@@ -1486,7 +1441,7 @@ QTableView::item:selected {
             self.metadata["dates"] = new_dates
             # Optionally, refresh the table or UI here
             self.refresh_table() if hasattr(self, "refresh_table") else None
-        launch_calendar(self, scheduled_dates, students, max_classes, on_save_callback)
+        launch_calendar(self, scheduled_dates, students, max_classes, on_save_callback, class_no=self.class_id)
 
     def update_column_values(self, column_index, new_value):
         print(f"[DEBUG] update_column_values called: column_index={column_index}, new_value={new_value}")
@@ -1501,17 +1456,14 @@ QTableView::item:selected {
         active_students = [sid for sid, s in self.students.items() if s.get("active", "Yes") == "Yes"]
         for student_id in active_students:
             self.students[student_id]["attendance"][date] = new_value
-            # Save to DB
-            from logic.db_interface import set_attendance, insert_date
-            set_attendance(self.class_id, student_id, date, new_value)
-
         # --- PATCH: Mark date as CIA/HOL/COD in the dates table if needed ---
+        date_notes = {date: new_value} if new_value in ("CIA", "HOL", "COD") else None
+        # Save to DB: the whole column (and its date note) is one transaction and one undo step
+        self.attendance_journal.apply(
+            [(student_id, date, new_value) for student_id in active_students], date_notes, label=f"{date} = {new_value}"
+        )
+
         if new_value in ("CIA", "HOL", "COD"):
-            # Save to DB (dates table) and in-memory metadata if needed
-            try:
-                insert_date(self.class_id, date, new_value)
-            except Exception as e:
-                print(f"[DEBUG] Failed to insert date status for {date}: {e}")
             # Optionally, keep a parallel structure in metadata
             if "date_status" not in self.metadata:
                 self.metadata["date_status"] = {}
@@ -1523,6 +1475,33 @@ QTableView::item:selected {
 
         self.refresh_student_table()
 
+    def undo_attendance_edit(self):
+        """Ctrl+Z: revert the latest attendance edit (a cell or a whole column)."""
+        self._replay_attendance_edit(self.attendance_journal.undo, "undo", "Undone")
+
+    def redo_attendance_edit(self):
+        """Ctrl+Y / Ctrl+Shift+Z: apply the latest undone attendance edit again."""
+        self._replay_attendance_edit(self.attendance_journal.redo, "redo", "Redone")
+
+    def _replay_attendance_edit(self, replay, action, done):
+        if self.attendance_journal.discard_if_changed():
+            show_message_dialog(self, f"Nothing to {action}: students or dates changed since the last attendance edit.")
+            return
+        try:
+            edit = replay()
+        except sqlite3.Error as e:
+            # An exception escaping a slot would abort the app; the history no longer fits the DB
+            print(f"[ERROR] Attendance {action} failed for class {self.class_id}: {e}")
+            self.attendance_journal.clear()
+            show_message_dialog(self, f"Could not {action} the attendance edit: {e}")
+            self.refresh_student_table()
+            return
+        if edit is None:
+            show_message_dialog(self, f"Nothing to {action}.")
+            return
+        self.refresh_student_table()  # reloads the marks and date notes just written
+        show_message_dialog(self, f"{done}: {edit.label}")
+
     def debug_pal_cod_button_click(self):
         print("[DEBUG] PAL/COD button clicked.")
         # Retrieve the selected column index from the table
@@ -1538,12 +1517,3 @@ QTableView::item:selected {
             print(f"[DEBUG] Selected column index: {column_index}")
         self.open_pal_cod_form(column_index=column_index)
 
-def parse_max_classes(val, default=10):
-    """Safely extract the leading integer from max_classes, even if it's a display string."""
-    try:
-        if isinstance(val, int):
-            return val
-        return int(str(val).split()[0])
-    except Exception:
-        return default
-
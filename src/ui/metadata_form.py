@@ -10,63 +10,12 @@ from .calendar import CalendarView  # Import CalendarView
 from logic.update_dates import update_dates, add_date, remove_date, modify_date  # Import the new functions
 from datetime import datetime, timedelta
 from ui.calendar import launch_calendar  # Import the shared function
-from logic.date_utils import warn_if_start_date_not_in_days
-from logic.db_interface import insert_class, update_class, get_all_defaults, get_class_by_id, get_form_settings, get_teacher_defaults
+from logic.date_utils import warn_if_start_date_not_in_days, is_real_date, date_sort_key
+from logic.db_interface import insert_class, update_class, get_all_defaults, get_class_by_id, get_form_settings, get_teacher_defaults, get_protected_dates, reconcile_class_dates
 from logic.display import center_widget, scale_and_center, apply_window_flags
+from logic.style_compiler import compile_stylesheet
+from ui.toast import show_floating_message
 
-# --- Floating message dialog helper ---
-def show_floating_message(parent, message, title=None, duration=2500, style_overrides=None):
-    """
-    Show a floating QLabel as a transient message, styled from DB defaults.
-    """
-    defaults = get_all_defaults()
-    bg = defaults.get("message_bg_color", "#323232")
-    fg = defaults.get("message_fg_color", "#fff")
-    border = defaults.get("message_border_color", "#2980f0")
-    border_width = int(defaults.get("message_border_width", 2))
-    border_radius = int(defaults.get("message_border_radius", 12))
-    font_size = int(defaults.get("message_font_size", 12))
-    font_weight = "bold" if str(defaults.get("message_font_bold", "true")).lower() == "true" else "normal"
-    padding = defaults.get("message_padding", "10px 18px")
-    # Allow style overrides
-    if style_overrides:
-        bg = style_overrides.get("bg", bg)
-        fg = style_overrides.get("fg", fg)
-        border = style_overrides.get("border", border)
-        border_width = style_overrides.get("border_width", border_width)
-        border_radius = style_overrides.get("border_radius", border_radius)
-        font_size = style_overrides.get("font_size", font_size)
-        font_weight = style_overrides.get("font_weight", font_weight)
-        padding = style_overrides.get("padding", padding)
-    msg = QLabel(message, parent)
-    msg.setWindowFlags(Qt.ToolTip | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg.setAttribute(Qt.WA_TranslucentBackground)
-    msg.setAlignment(Qt.AlignCenter)
-    msg.setStyleSheet(f"""
-        background: {bg};
-        color: {fg};
-        border: {border_width}px solid {border};
-        border-radius: {border_radius}px;
-        font-size: {font_size}pt;
-        font-weight: {font_weight};
-        padding: {padding};
-    """)
-    # Add drop shadow effect (Qt-native)
-    from PyQt5.QtWidgets import QGraphicsDropShadowEffect
-    shadow_effect = QGraphicsDropShadowEffect(msg)
-    shadow_effect.setBlurRadius(8)
-    shadow_effect.setOffset(2, 2)
-    shadow_effect.setColor(Qt.black)
-    msg.setGraphicsEffect(shadow_effect)
-    msg.adjustSize()
-    # Center in parent
-    parent_rect = parent.geometry()
-    msg.move(
-        parent_rect.x() + (parent_rect.width() - msg.width()) // 2,
-        parent_rect.y() + (parent_rect.height() - msg.height()) // 2
-    )
-    msg.show()
-    QTimer.singleShot(duration, msg.close)
 
 class MetadataForm(QDialog):
     class_saved = pyqtSignal(str)  # Signal to notify when a class is saved
@@ -102,6 +51,9 @@ class MetadataForm(QDialog):
 
         self.setWindowFlags(self.windowFlags() | Qt.WindowMinimizeButtonHint | Qt.WindowMaximizeButtonHint | Qt.WindowCloseButtonHint)
         self.setWindowTitle("Course Metadata")
+        # Day toggles are styled by the compiled MetadataForm stylesheet (see logic.style_compiler)
+        self.setObjectName("MetadataForm")
+        self.setStyleSheet(compile_stylesheet("MetadataForm"))
         # --- FONT SIZE PATCH: Set default font size from per-form or global settings ---
         default_settings = get_all_defaults()
         font_size = int(form_settings.get("font_size") or default_settings.get("form_font_size", default_settings.get("button_font_size", 12)))
@@ -231,43 +183,6 @@ class MetadataForm(QDialog):
             ("Mon", "Monday"), ("Tue", "Tuesday"), ("Wed", "Wednesday"),
             ("Thu", "Thursday"), ("Fri", "Friday"), ("Sat", "Saturday"), ("Sun", "Sunday")
         ]
-        # --- PATCH: Load toggle button style defaults from DB ---
-        toggle_defaults = get_all_defaults()
-        toggle_bg = toggle_defaults.get("toggle_bg_color", "#ffffff")
-        toggle_fg = toggle_defaults.get("toggle_fg_color", "#1565c0")
-        toggle_border = toggle_defaults.get("toggle_border_color", "#1565c0")
-        toggle_border_width = int(toggle_defaults.get("toggle_border_width", 3))
-        toggle_border_radius = int(toggle_defaults.get("toggle_border_radius", 12))
-        toggle_padding = toggle_defaults.get("toggle_padding", "5px 10px")
-        toggle_font_size = int(toggle_defaults.get("toggle_font_size", 12))
-        toggle_font_bold = str(toggle_defaults.get("toggle_font_bold", "true")).lower() == "true"
-        toggle_hover_bg = toggle_defaults.get("toggle_hover_bg_color", "#e0f0ff")
-        toggle_pressed_bg = toggle_defaults.get("toggle_pressed_bg_color", "#c0e0ff")
-        toggle_checked_bg = toggle_defaults.get("toggle_checked_bg_color", "#2980f0")
-        toggle_checked_fg = toggle_defaults.get("toggle_checked_fg_color", "#ffffff")
-        font_weight = "bold" if toggle_font_bold else "normal"
-        toggle_stylesheet = f"""
-            QPushButton {{
-                border-radius: {toggle_border_radius}px;
-                padding: {toggle_padding};
-                background: {toggle_bg};
-                color: {toggle_fg};
-                border: {toggle_border_width}px solid {toggle_border};
-                font-size: {toggle_font_size}pt;
-                font-weight: {font_weight};
-            }}
-            QPushButton:checked {{
-                background: {toggle_checked_bg};
-                color: {toggle_checked_fg};
-                border: {toggle_border_width + 1}px solid {toggle_border};
-            }}
-            QPushButton:hover {{
-                background: {toggle_hover_bg};
-            }}
-            QPushButton:pressed {{
-                background: {toggle_pressed_bg};
-            }}
-        """
         for short, full in day_map:
             btn = QPushButton(short)
             btn.setCheckable(True)
@@ -275,7 +190,6 @@ class MetadataForm(QDialog):
             btn.setMinimumWidth(44)
             btn.setMaximumWidth(80)
             btn.setFixedWidth(64)  # Fixed width of Mon, Tue, Wed etc. for consistency
-            btn.setStyleSheet(toggle_stylesheet)
             self.days_buttons[full] = btn
             days_layout.addWidget(btn)
         # Prepopulate toggles if editing
@@ -409,13 +323,8 @@ class MetadataForm(QDialog):
             metadata["cod_cia"] = self.cod_cia_hol_default
 
         # --- PROTECT EXISTING DATES AND ATTENDANCE ---
-        students = self.data["classes"][self.class_id].get("students", {}) if self.is_edit else {}
-
-        old_dates = []
-        if self.is_edit:
-            old_dates = self.data["classes"][self.class_id]["metadata"].get("dates", [])
-        else:
-            old_dates = []
+        # Protected dates (any P/A/L/CIA/COD/HOL mark) come straight from the DB
+        protected_dates = {d for d in get_protected_dates(self.class_id) if is_real_date(d)} if self.is_edit else set()
 
         try:
             max_classes = int(metadata["max_classes"].split()[0])
@@ -425,23 +334,11 @@ class MetadataForm(QDialog):
         start_date_str = metadata.get("start_date", "")
         days_str = metadata.get("days", "")
 
-        def is_real_date(d):
-            return len(d) == 10 and d[2] == "/" and d[5] == "/"
-
-        protected_dates = set()
-        for student in students.values():
-            attendance = student.get("attendance", {})
-            for date, value in attendance.items():
-                if value in ["P", "A", "L", "CIA", "COD", "HOL"] and is_real_date(date):
-                    protected_dates.add(date)
-
-        protected_dates = sorted(protected_dates, key=lambda d: datetime.strptime(d, "%d/%m/%Y"))
-
         generated_dates = generate_dates(start_date_str, days_str, max_classes * 2)
         generated_dates = [d for d in generated_dates if d not in protected_dates]
         final_dates = sorted(
             list(protected_dates) + generated_dates[:max_classes - len(protected_dates)],
-            key=lambda d: datetime.strptime(d, "%d/%m/%Y") if is_real_date(d) else datetime(9999, 12, 31)
+            key=date_sort_key
         )
 
         num_dates = len(final_dates)
@@ -454,9 +351,6 @@ class MetadataForm(QDialog):
         metadata["dates"] = final_dates
         metadata["max_classes"] = f"{max_classes} x {metadata['class_time']} = {max_classes * float(metadata['class_time']):.1f}"
 
-        # Update metadata and students using update_dates
-        metadata, students = update_dates(metadata, students)
-
         # --- PATCH: Save to DB instead of JSON ---
         class_record = dict(metadata)
         class_record["archive"] = "No" if not self.is_edit else self.data["classes"][self.class_id].get("archive", "No")
@@ -467,16 +361,11 @@ class MetadataForm(QDialog):
 
         if not self.is_edit:
             insert_class(class_record)
-            # Optionally, insert students here as well
         else:
             update_class(self.class_id, class_record)
-            # Optionally, update students here as well
 
-        # --- PATCH: Save dates to the dates table ---
-        from logic.db_interface import insert_date
-        for date in metadata.get("dates", []):
-            if date and len(date) == 10 and date[2] == "/" and date[5] == "/":
-                insert_date(class_record["class_no"], date, "")
+        # --- Save dates: one diff against the stored dates, applied in a single transaction ---
+        reconcile_class_dates(class_record["class_no"], [d for d in final_dates if is_real_date(d)])
 
         self.on_metadata_save()
         self.class_saved.emit(class_no)
@@ -497,7 +386,7 @@ class MetadataForm(QDialog):
                 if selected_dates:
                     self.fields["start_date"].setText(selected_dates[0])
                     self.data["classes"][self.class_id]["metadata"]["dates"] = selected_dates
-            launch_calendar(self, scheduled_dates, students, max_dates, on_save_callback)
+            launch_calendar(self, scheduled_dates, students, max_dates, on_save_callback, class_no=self.class_id)
         else:
             scheduled_dates = []
             students = {}
@@ -2,7 +2,7 @@ import json
 import os
 from datetime import datetime
 from collections import defaultdict
-from logic.db_interface import get_all_classes, get_students_by_class, get_attendance_by_student, get_all_defaults, get_message_defaults, get_form_settings
+from logic.db_interface import get_all_classes, get_students_by_class, get_attendance_by_student, get_all_defaults, get_form_settings, read_snapshot
 from logic.display import center_widget, scale_and_center, apply_window_flags
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QDialog
 from PyQt5.QtGui import QFont, QIcon
@@ -37,54 +37,56 @@ def generate_monthly_summary(teacher_name="Paul R"):
         "notes": set()
     })
 
-    for class_row in get_all_classes():
-        if class_row.get("teacher") != teacher_name:
-            continue
-
-        class_time = float(class_row.get("class_time", "2"))
-        rate = float(class_row.get("rate", "0"))
-        travel_rate = float(class_row.get("travel", "0"))
-        bonus_amount = float(class_row.get("bonus", "0"))
-        dates = class_row.get("dates", [])
-        class_name = class_row.get("company", class_row.get("class_no", ""))
-
-        # Get all students for this class
-        students = get_students_by_class(class_row["class_no"])
-
-        # Count actual held sessions per date
-        class_dates_by_month = defaultdict(int)
-        for date_str in dates:
-            try:
-                dt = datetime.strptime(date_str, "%d/%m/%Y")
-                month_key = dt.strftime("%Y-%m")
-
-                # Check if at least one student attended
-                any_attended = False
-                for student in students:
-                    attendance_records = get_attendance_by_student(student["student_id"])
-                    attendance = {rec["date"]: rec["status"] for rec in attendance_records}
-                    if is_attended(attendance.get(date_str, "")):
-                        any_attended = True
-                        break
-
-                if any_attended:
-                    class_dates_by_month[month_key] += 1
-            except ValueError:
+    # Every class is read from one snapshot, so the totals agree even while attendance is being marked
+    with read_snapshot():
+        for class_row in get_all_classes():
+            if class_row.get("teacher") != teacher_name:
                 continue
 
-        # Now summarize for each month where this class had sessions
-        for month, count in class_dates_by_month.items():
-            hours = count * class_time
-            travel = count * travel_rate
-            # If you have a lowercase "bonus_claimed" field, use that; otherwise, remove this logic or adapt as needed
-            bonus = bonus_amount if class_row.get("bonus_claimed", "") == month else 0
-            pay = hours * rate + travel + bonus
-
-            summary[month]["total_hours"] += hours
-            summary[month]["total_travel"] += travel
-            summary[month]["total_bonus"] += bonus
-            summary[month]["total_pay"] += pay
-            summary[month]["notes"].add(class_name)
+            class_time = float(class_row.get("class_time", "2"))
+            rate = float(class_row.get("rate", "0"))
+            travel_rate = float(class_row.get("travel", "0"))
+            bonus_amount = float(class_row.get("bonus", "0"))
+            dates = class_row.get("dates", [])
+            class_name = class_row.get("company", class_row.get("class_no", ""))
+
+            # Get all students for this class
+            students = get_students_by_class(class_row["class_no"])
+
+            # Count actual held sessions per date
+            class_dates_by_month = defaultdict(int)
+            for date_str in dates:
+                try:
+                    dt = datetime.strptime(date_str, "%d/%m/%Y")
+                    month_key = dt.strftime("%Y-%m")
+
+                    # Check if at least one student attended
+                    any_attended = False
+                    for student in students:
+                        attendance_records = get_attendance_by_student(student["student_id"])
+                        attendance = {rec["date"]: rec["status"] for rec in attendance_records}
+                        if is_attended(attendance.get(date_str, "")):
+                            any_attended = True
+                            break
+
+                    if any_attended:
+                        class_dates_by_month[month_key] += 1
+                except ValueError:
+                    continue
+
+            # Now summarize for each month where this class had sessions
+            for month, count in class_dates_by_month.items():
+                hours = count * class_time
+                travel = count * travel_rate
+                # If you have a lowercase "bonus_claimed" field, use that; otherwise, remove this logic or adapt as needed
+                bonus = bonus_amount if class_row.get("bonus_claimed", "") == month else 0
+                pay = hours * rate + travel + bonus
+
+                summary[month]["total_hours"] += hours
+                summary[month]["total_travel"] += travel
+                summary[month]["total_bonus"] += bonus
+                summary[month]["total_pay"] += pay
+                summary[month]["notes"].add(class_name)
 
     # Final formatting
     for month in summary:
@@ -102,44 +104,6 @@ def get_summary_text(teacher_name="Paul R"):
         lines.append(f"{month:<10} {row['total_hours']:<6} {row['total_travel']:<8} {row['total_bonus']:<7} {row['total_pay']:<10} {row['notes']}")
     return "\n".join(lines)
 
-# Floating message dialog for future use (DB-driven style)
-def show_message_dialog(parent, message, timeout=2000, buttons=None):
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(True if buttons else False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(message)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    if buttons:
-        btn_row = QHBoxLayout()
-        for btn_text, btn_callback in buttons:
-            btn = QPushButton(btn_text)
-            btn.setStyleSheet(f"background: {bg}; color: {fg}; border-radius: {border_radius}px; font-size: {font_size}pt; font-weight: {font_weight}; padding: 6px 18px;")
-            btn.clicked.connect(lambda _, cb=btn_callback: (msg_dialog.accept(), cb() if cb else None))
-            btn_row.addWidget(btn)
-        layout.addLayout(btn_row)
-    msg_dialog.adjustSize()
-    parent_geo = parent.geometry() if parent else None
-    if parent_geo:
-        msg_dialog.move(parent.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-    msg_dialog.show()
-    if not buttons:
-        QTimer.singleShot(timeout, msg_dialog.accept)
-    else:
-        msg_dialog.exec_()
 
 class MonthlySummaryWindow(QWidget):
     def __init__(self, teacher_name="Paul R"):
@@ -1,51 +1,22 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QPushButton, QLabel
 from PyQt5.QtCore import Qt, QTimer
-from logic.db_interface import get_form_settings, get_all_defaults, get_message_defaults
+from logic.db_interface import get_form_settings, get_all_defaults
+from logic.style_compiler import compile_stylesheet
+from ui.toast import show_message_dialog
 from PyQt5.QtGui import QFont
 
 
-def show_message_dialog(parent, message, timeout=2000, buttons=None):
-    """
-    Show a floating message dialog. If buttons is provided, it should be a list of (label, callback) tuples.
-    If buttons is None, show an auto-closing info dialog.
-    """
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout, QHBoxLayout, QPushButton
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(True if buttons else False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(message)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    if buttons:
-        btn_row = QVBoxLayout() if len(buttons) < 3 else QHBoxLayout()
-        for btn_text, btn_callback in buttons:
-            btn = QPushButton(btn_text)
-            btn.setStyleSheet(f"background: {bg}; color: {fg}; border-radius: {border_radius}px; font-size: {font_size}pt; font-weight: {font_weight}; padding: 6px 18px;")
-            btn.clicked.connect(lambda _, cb=btn_callback: (msg_dialog.accept(), cb() if cb else None))
-            btn_row.addWidget(btn)
-        layout.addLayout(btn_row)
-    msg_dialog.adjustSize()
-    parent_geo = parent.geometry() if parent else None
-    if parent_geo:
-        msg_dialog.move(parent.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-    msg_dialog.show()
-    if not buttons:
-        QTimer.singleShot(timeout, msg_dialog.accept)
-    else:
-        msg_dialog.exec_()
+PAL_BUTTONS = [
+    ("P = Present", "P"),
+    ("A = Absent", "A"),
+    ("L = Late", "L"),
+    ("Clear", "-"),
+]
+COD_CIA_BUTTONS = [
+    ("COD = Cancel", "COD"),
+    ("CIA = Postpone", "CIA"),
+    ("HOL = Holiday", "HOL"),
+]
 
 
 class PALCODForm(QDialog):
@@ -90,10 +61,44 @@ class PALCODForm(QDialog):
                 center_widget(self)
         # --- PATCH END ---
 
+        self.setWindowTitle("Update Attendance")
+        # Labels and buttons are styled by the compiled PALCODForm stylesheet (see logic.style_compiler)
+        self.setObjectName("PALCODForm")
+        self.setStyleSheet(compile_stylesheet("PALCODForm"))
+
+        # Layout (built once; rebind() fills it for each cell or column)
+        layout = QVBoxLayout(self)
+
+        # Display the date
+        self.date_label = QLabel()
+        self.date_label.setObjectName("dateLabel")
+        self.date_label.setFont(self.form_font)
+        layout.addWidget(self.date_label)
+
+        # Optionally display the student name
+        self.student_label = QLabel()
+        self.student_label.setObjectName("studentLabel")
+        self.student_label.setFont(self.form_font)
+        layout.addWidget(self.student_label)
+
+        # Buttons (COD, CIA, HOL are hidden unless show_cod_cia is True)
+        self.value_buttons = {}
+        for label, value in PAL_BUTTONS + COD_CIA_BUTTONS:
+            button = QPushButton(label)
+            button.setFont(self.form_font)
+            # Remove confirmation: set value immediately on click
+            button.clicked.connect(lambda _, v=value: self.select_value(v))
+            layout.addWidget(button)
+            self.value_buttons[value] = button
+
+        self.rebind(column_index, update_column_callback, current_value, date, student_name, show_cod_cia, show_student_name, refresh_cell_callback, row)
+
+    def rebind(self, column_index, update_column_callback, current_value, date, student_name=None, show_cod_cia=True, show_student_name=False, refresh_cell_callback=None, row=None):
+        """Point the form at another date/cell without rebuilding it."""
         self._blocked = False
         # --- Prevent single-cell edit if column contains CIA/COD/HOL ---
         if row is not None:
-            mainform = parent
+            mainform = self.parent()
             try:
                 model = mainform.scrollable_table.model()
                 col = column_index
@@ -111,8 +116,6 @@ class PALCODForm(QDialog):
             except Exception as e:
                 print(f"[DEBUG] PALCODForm: Exception during CIA/COD/HOL check: {e}")
 
-        self.setWindowTitle("Update Attendance")
-
         self.column_index = column_index
         self.update_column_callback = update_column_callback
         self.current_value = current_value
@@ -122,58 +125,16 @@ class PALCODForm(QDialog):
         self.refresh_cell_callback = refresh_cell_callback
         self.row = row
 
-        # Layout
-        layout = QVBoxLayout(self)
-
-        # Display the date
-        date_label = QLabel(f"Date: {self.date}")
-        date_label.setFont(self.form_font)
-        date_label.setStyleSheet(f"font-weight: bold; font-size: {self.form_font_size+2}px; margin-bottom: 10px; color: {defaults.get('title_color', '#1976d2')};")
-        layout.addWidget(date_label)
-
-        # Optionally display the student name
-        if show_student_name and self.student_name:
-            student_label = QLabel(f"Student: {self.student_name}")
-            student_label.setFont(self.form_font)
-            student_label.setStyleSheet(f"font-weight: bold; font-size: {self.form_font_size+1}px; margin-bottom: 5px; color: {defaults.get('form_fg_color', '#222222')};")
-            layout.addWidget(student_label)
-
-        # --- PATCH: Button style from DB ---
-        button_bg = form_settings.get("button_bg_color", defaults.get("button_bg_color", "#1976d2"))
-        button_fg = form_settings.get("button_fg_color", defaults.get("button_fg_color", "#ffffff"))
-        button_font_size = int(form_settings.get("button_font_size", defaults.get("button_font_size", 12)))
-        button_font_bold = str(form_settings.get("button_font_bold", defaults.get("button_font_bold", "no"))).lower() in ("yes", "true", "1")
-        button_hover_bg = form_settings.get("button_hover_bg_color", defaults.get("button_hover_bg_color", "#1565c0"))
-        button_active_bg = form_settings.get("button_active_bg_color", defaults.get("button_active_bg_color", "#0d47a1"))
-        button_border = form_settings.get("button_border_color", defaults.get("button_border_color", "#1976d2"))
-        button_style = (
-            f"QPushButton {{background: {button_bg}; color: {button_fg}; border: 2px solid {button_border}; font-size: {button_font_size}pt; font-weight: {'bold' if button_font_bold else 'normal'};}}"
-            f"QPushButton:hover {{background: {button_hover_bg};}}"
-            f"QPushButton:pressed {{background: {button_active_bg};}}"
-        )
-
-        # Buttons
-        buttons = {
-            "P = Present": "P",
-            "A = Absent": "A",
-            "L = Late": "L",
-            "Clear": "-",
-        }
-
-        if show_cod_cia:  # Include COD, CIA, HOL options only if show_cod_cia is True
-            buttons.update({
-                "COD = Cancel": "COD",
-                "CIA = Postpone": "CIA",
-                "HOL = Holiday": "HOL",
-            })
-
-        for label, value in buttons.items():
-            button = QPushButton(label)
-            button.setFont(self.form_font)
-            button.setStyleSheet(button_style if value != self.current_value else button_style + "background: lightblue; font-weight: bold;")
-            # Remove confirmation: set value immediately on click
-            button.clicked.connect(lambda _, v=value: self.select_value(v))
-            layout.addWidget(button)
+        self.date_label.setText(f"Date: {self.date}")
+        self.student_label.setText(f"Student: {self.student_name}" if self.student_name else "")
+        self.student_label.setVisible(bool(show_student_name and self.student_name))
+        cod_cia_values = {value for _, value in COD_CIA_BUTTONS}
+        for value, button in self.value_buttons.items():
+            button.setVisible(show_cod_cia or value not in cod_cia_values)
+            # The current value is highlighted through the [current="true"] rule
+            button.setProperty("current", value == self.current_value)
+            button.style().unpolish(button)
+            button.style().polish(button)
 
     def update_column(self, value):
         # Deprecated: no confirmation dialog needed
@@ -229,7 +190,8 @@ def open_pal_cod_form(self, column_index=None):
         )
         return
 
-    pal_cod_form = PALCODForm(self, column_index, self.update_column_values, None, date, show_cod_cia=False, show_student_name=True)
+    from ui.form_registry import form_registry
+    pal_cod_form = form_registry.acquire(PALCODForm, self, column_index, self.update_column_values, None, date, show_cod_cia=False, show_student_name=True)
     if hasattr(pal_cod_form, '_blocked') and pal_cod_form._blocked:
         print("[DEBUG] PALCODForm: Dialog was blocked, not calling exec_()")
         return
@@ -3,8 +3,10 @@ from PyQt5.QtWidgets import (
     QGridLayout, QLineEdit, QWidget
 )
 from PyQt5.QtCore import Qt, QTimer
-from logic.db_interface import update_class, get_class_by_id, get_form_settings, get_all_defaults, get_message_defaults
+from logic.db_interface import update_class, get_class_by_id, get_form_settings, get_all_defaults
 from logic.display import center_widget, scale_and_center, apply_window_flags
+from logic.style_compiler import compile_stylesheet
+from ui.toast import show_message_dialog
 
 SHOW_HIDE_FIELDS = [
     ("show_nickname", "Nickname"),
@@ -46,49 +48,6 @@ COLOR_FIELDS = [
     ("bgcolor_hol", "HOL", "#ffcdd2"),
 ]
 
-def show_message_dialog(parent, message, timeout=2000, buttons=None):
-    """
-    Show a floating message dialog. If buttons is provided, it should be a list of (label, callback) tuples.
-    If buttons is None, show an auto-closing info dialog.
-    """
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout, QHBoxLayout, QPushButton
-    from PyQt5.QtCore import Qt
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(True if buttons else False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(message)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    if buttons:
-        btn_row = QHBoxLayout()
-        for btn_text, btn_callback in buttons:
-            btn = QPushButton(btn_text)
-            btn.setStyleSheet(f"background: {bg}; color: {fg}; border-radius: {border_radius}px; font-size: {font_size}pt; font-weight: {font_weight}; padding: 6px 18px;")
-            btn.clicked.connect(lambda _, cb=btn_callback: (msg_dialog.accept(), cb() if cb else None))
-            btn_row.addWidget(btn)
-        layout.addLayout(btn_row)
-    msg_dialog.adjustSize()
-    parent_geo = parent.geometry() if parent else None
-    if parent_geo:
-        msg_dialog.move(parent.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-    msg_dialog.show()
-    if not buttons:
-        QTimer.singleShot(timeout, msg_dialog.accept)
-    else:
-        msg_dialog.exec_()
 
 class ShowHideForm(QDialog):
     def __init__(self, parent, class_id, on_save_callback=None):
@@ -149,21 +108,23 @@ class ShowHideForm(QDialog):
                 center_widget(self)
         # --- PATCH END ---
 
+        # Labels and buttons are styled by the compiled ShowHideForm stylesheet (see logic.style_compiler)
+        self.setObjectName("ShowHideForm")
+        self.setStyleSheet(compile_stylesheet("ShowHideForm"))
+
         layout = QVBoxLayout(self)
 
         # Header row
         header_layout = QHBoxLayout()
-        header_label_style = f"color: {defaults.get('title_color', '#1976d2')}; font-size: {defaults.get('title_font_size', 14)}pt; font-weight: {'bold' if str(defaults.get('title_font_bold', True)).lower() in ('1','true','yes') else 'normal'};"
         for text in ("<b>Columns: Show/Width</b>", "<b>P/A/L colors</b>"):
             lbl = QLabel(text)
-            lbl.setStyleSheet(header_label_style)
+            lbl.setObjectName("sectionHeader")
             header_layout.addWidget(lbl)
         layout.addLayout(header_layout)
 
         # Main grid
         grid = QGridLayout()
         max_rows = max(len(SHOW_HIDE_FIELDS), len(COLOR_FIELDS))
-        label_style = f"color: {defaults.get('form_fg_color', '#222222')}; font-size: {font_size}pt; font-weight: {'bold' if str(defaults.get('form_label_bold', True)).lower() in ('1','true','yes') else 'normal'};"
         # --- PATCH: Add permanent width edits for '#' and 'Name' at the top (no tickbox) ---
         permanent_width_fields = [
             ("#", "width_row_number"),
@@ -171,7 +132,6 @@ class ShowHideForm(QDialog):
         ]
         for row, (label, db_key) in enumerate(permanent_width_fields):
             lbl = QLabel(label)
-            lbl.setStyleSheet(label_style)
             grid.addWidget(lbl, row, 0)
             grid.addWidget(QWidget(), row, 1)  # No tickbox spacer
             width_val = self.class_data.get(db_key, "")
@@ -189,7 +149,6 @@ class ShowHideForm(QDialog):
             if idx < len(SHOW_HIDE_FIELDS):
                 key, label = SHOW_HIDE_FIELDS[idx]
                 lbl = QLabel(label)
-                lbl.setStyleSheet(label_style)
                 cb = QCheckBox()
                 # For show_pal_colors, default to Yes if not present
                 if key == "show_pal_colors":
@@ -222,7 +181,6 @@ class ShowHideForm(QDialog):
             if idx < len(COLOR_FIELDS):
                 color_key, color_label, default = COLOR_FIELDS[idx]
                 lbl = QLabel(color_label)
-                lbl.setStyleSheet(label_style)
                 edit = QLineEdit(self.class_data.get(color_key, default))
                 edit.setFont(self.form_font)
                 self.color_edits[color_key] = edit
@@ -234,30 +192,15 @@ class ShowHideForm(QDialog):
         layout.addLayout(grid)
 
         # Toggle buttons
-        button_bg = form_settings.get("button_bg_color", defaults.get("button_bg_color", "#1976d2"))
-        button_fg = form_settings.get("button_fg_color", defaults.get("button_fg_color", "#ffffff"))
-        button_font_size = int(form_settings.get("button_font_size", defaults.get("button_font_size", 12)))
-        button_font_bold = str(form_settings.get("button_font_bold", defaults.get("button_font_bold", "no"))).lower() in ("yes", "true", "1")
-        button_hover_bg = form_settings.get("button_hover_bg_color", defaults.get("button_hover_bg_color", "#1565c0"))
-        button_active_bg = form_settings.get("button_active_bg_color", defaults.get("button_active_bg_color", "#0d47a1"))
-        button_border = form_settings.get("button_border_color", defaults.get("button_border_color", "#1976d2"))
-        button_style = (
-            f"QPushButton {{background: {button_bg}; color: {button_fg}; border: 2px solid {button_border}; font-size: {button_font_size}pt; font-weight: {'bold' if button_font_bold else 'normal'};}}"
-            f"QPushButton:hover {{background: {button_hover_bg};}}"
-            f"QPushButton:pressed {{background: {button_active_bg};}}"
-        )
         toggle_layout = QHBoxLayout()
         self.toggle_columns_btn = QPushButton("Toggle show/hide columns")
         self.toggle_columns_btn.setFont(self.form_font)
-        self.toggle_columns_btn.setStyleSheet(button_style)
         self.toggle_columns_btn.clicked.connect(self.toggle_columns)
         self.toggle_colors_btn = QPushButton("Toggle bgcolor on/off")
         self.toggle_colors_btn.setFont(self.form_font)
-        self.toggle_colors_btn.setStyleSheet(button_style)
         self.toggle_colors_btn.clicked.connect(self.toggle_colors)
         self.reset_widths_btn = QPushButton("Reset Widths")
         self.reset_widths_btn.setFont(self.form_font)
-        self.reset_widths_btn.setStyleSheet(button_style)
         self.reset_widths_btn.clicked.connect(self.reset_widths)
         toggle_layout.addWidget(self.toggle_columns_btn)
         toggle_layout.addWidget(self.toggle_colors_btn)
@@ -268,11 +211,9 @@ class ShowHideForm(QDialog):
         btn_layout = QHBoxLayout()
         save_btn = QPushButton("Save")
         save_btn.setFont(self.form_font)
-        save_btn.setStyleSheet(button_style)
         save_btn.clicked.connect(self.save)
         close_btn = QPushButton("Close")  # Renamed from Cancel to Close
         close_btn.setFont(self.form_font)
-        close_btn.setStyleSheet(button_style)
         close_btn.clicked.connect(self.reject)
         btn_layout.addWidget(save_btn)
         btn_layout.addWidget(close_btn)
@@ -282,6 +223,24 @@ class ShowHideForm(QDialog):
         for db_key, width_edit in self.width_edits.items():
             width_edit.textChanged.connect(lambda val, db_key=db_key: self._update_width_live(db_key, val))
 
+    def rebind(self, class_id, on_save_callback=None):
+        """Reload the form for class_id without rebuilding it (values are set with signals blocked)."""
+        self.class_id = class_id
+        self.on_save_callback = on_save_callback
+        self.class_data = get_class_by_id(class_id)
+        for key, cb in self.checkboxes.items():
+            cb.blockSignals(True)
+            cb.setChecked(self.class_data.get(key, "Yes") == "Yes")
+            cb.blockSignals(False)
+        for color_key, color_label, default in COLOR_FIELDS:
+            if color_key in self.color_edits:
+                self.color_edits[color_key].setText(self.class_data.get(color_key, default))
+        for db_key, width_edit in self.width_edits.items():
+            width_val = self.class_data.get(db_key, "")
+            width_edit.blockSignals(True)
+            width_edit.setText(str(width_val) if width_val else "")
+            width_edit.blockSignals(False)
+
     def reset_widths(self):
         # Show confirmation dialog before resetting widths
         from PyQt5.QtWidgets import QMessageBox
@@ -1,11 +1,14 @@
+import os
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, QPushButton, QRadioButton, QCheckBox, QTableWidget, QTableWidgetItem, QApplication, QInputDialog, QMenu, QWidget, QSizePolicy, QHeaderView
 )
 from PyQt5.QtCore import Qt, QTimer, QItemSelectionModel
 from PyQt5.QtGui import QFont, QColor
 from logic.parser import save_data
-from logic.db_interface import insert_student, update_student, get_students_by_class, get_all_defaults, get_form_settings, get_message_defaults
+from logic.db_interface import insert_student, update_student, get_students_by_class, get_all_defaults, get_form_settings
 from logic.display import center_widget, scale_and_center, apply_window_flags
+from logic.style_compiler import compile_stylesheet
+from ui.toast import show_message_dialog
 
 class StudentForm(QDialog):
     def __init__(self, parent, class_id, data, refresh_callback, student_id=None, student_data=None, default_attendance=None):
@@ -37,6 +40,9 @@ class StudentForm(QDialog):
             self.setMaximumSize(int(max_w), int(max_h))
         self.setWindowFlags(self.windowFlags() | Qt.WindowMinimizeButtonHint | Qt.WindowMaximizeButtonHint | Qt.WindowCloseButtonHint)
         self.setWindowTitle("Add/Edit Student Details")
+        # Gender/Active toggles are styled by the compiled StudentForm stylesheet (see logic.style_compiler)
+        self.setObjectName("StudentForm")
+        self.setStyleSheet(compile_stylesheet("StudentForm"))
         # --- FONT SIZE PATCH: Set default font size from per-form or global settings ---
         default_settings = get_all_defaults()
         font_size = int(form_settings.get("window_width") or default_settings.get("form_font_size", default_settings.get("button_font_size", 12)))
@@ -90,22 +96,6 @@ class StudentForm(QDialog):
         grid.addWidget(self.bold_label("Gender:"), 3, 0, alignment=Qt.AlignVCenter)
         # --- Gender Toggle Buttons ---
         from PyQt5.QtWidgets import QButtonGroup
-        toggle_defaults = get_all_defaults()
-        toggle_style = (
-            f"QPushButton {{"
-            f"border: {toggle_defaults.get('toggle_border_width', 3)}px solid {toggle_defaults.get('toggle_border_color', '#1565c0')};"
-            f"border-radius: {toggle_defaults.get('toggle_border_radius', 12)}px;"
-            f"padding: {toggle_defaults.get('toggle_padding', '5px 10px')};"
-            f"background-color: {toggle_defaults.get('toggle_bg_color', '#ffffff')};"
-            f"color: {toggle_defaults.get('toggle_fg_color', '#1565c0')};"
-            f"font-size: {toggle_defaults.get('toggle_font_size', 12)}px;"
-            f"font-weight: {'bold' if str(toggle_defaults.get('toggle_font_bold', True)).lower() in ('1','true','yes') else 'normal'};"
-            f"}}"
-            f"QPushButton:hover {{background-color: {toggle_defaults.get('toggle_hover_bg_color', '#e0f0ff')};}}"
-            f"QPushButton:pressed {{background-color: {toggle_defaults.get('toggle_pressed_bg_color', '#c0e0ff')};}}"
-            f"QPushButton:checked {{background-color: {toggle_defaults.get('toggle_checked_bg_color', '#2980f0')};"
-            f"color: {toggle_defaults.get('toggle_checked_fg_color', '#ffffff')};}}"
-        )
         # Gender buttons
         self.gender_female_btn = QPushButton("Female")
         self.gender_male_btn = QPushButton("Male")
@@ -113,7 +103,6 @@ class StudentForm(QDialog):
         for btn in (self.gender_female_btn, self.gender_male_btn, self.gender_clear_btn):
             btn.setCheckable(True)
             btn.setFixedWidth(80)
-            btn.setStyleSheet(toggle_style)
         self.gender_group = QButtonGroup(self)
         self.gender_group.setExclusive(True)
         self.gender_group.addButton(self.gender_female_btn)
@@ -164,7 +153,6 @@ class StudentForm(QDialog):
         for btn in (self.active_yes_btn, self.active_no_btn):
             btn.setCheckable(True)
             btn.setFixedWidth(80)
-            btn.setStyleSheet(toggle_style)
         self.active_group = QButtonGroup(self)
         self.active_group.setExclusive(True)
         self.active_group.addButton(self.active_yes_btn)
@@ -213,6 +201,42 @@ class StudentForm(QDialog):
         # Flag to track if bulk import was requested
         self.bulk_import_requested = False
 
+    def rebind(self, class_id, data, refresh_callback, student_id=None, student_data=None, default_attendance=None):
+        """Reuse this form for another student (or a new one) without rebuilding it."""
+        self.class_id = class_id
+        self.data = data
+        self.refresh_callback = refresh_callback
+        self.student_id = student_id
+        self.student_data = student_data or {}
+        self.default_attendance = default_attendance
+
+        entries = {
+            "name": self.name_entry,
+            "nickname": self.nickname_entry,
+            "company_no": self.company_no_entry,
+            "score": self.score_entry,
+            "pre_test": self.pre_test_entry,
+            "post_test": self.post_test_entry,
+            "note": self.note_entry,
+        }
+        for key, entry in entries.items():
+            entry.setText(self.student_data.get(key, "") or "")
+        gender_val = (self.student_data.get("gender", "female") or "").lower()
+        if gender_val == "male":
+            self.gender_male_btn.setChecked(True)
+        elif gender_val == "":
+            self.gender_clear_btn.setChecked(True)
+        else:
+            self.gender_female_btn.setChecked(True)
+        if (self.student_data.get("active", "Yes") or "").lower() == "no":
+            self.active_no_btn.setChecked(True)
+        else:
+            self.active_yes_btn.setChecked(True)
+
+        if self.student_id is None and self.default_attendance is not None:
+            self.student_data["attendance"] = dict(self.default_attendance)
+        self.bulk_import_requested = False
+
     def bold_label(self, text):
         label = QLabel(text)
         font = label.font()
@@ -221,34 +245,8 @@ class StudentForm(QDialog):
         label.setFont(font)
         return label
 
-    def show_floating_message(self, message, timeout=2000):
-        msg_defaults = get_message_defaults()
-        bg = msg_defaults.get("message_bg_color", "#2980f0")
-        fg = msg_defaults.get("message_fg_color", "#fff")
-        border = msg_defaults.get("message_border_color", "#1565c0")
-        border_width = msg_defaults.get("message_border_width", "3")
-        border_radius = msg_defaults.get("message_border_radius", "12")
-        padding = msg_defaults.get("message_padding", "18px 32px")
-        font_size = msg_defaults.get("message_font_size", "13")
-        font_bold = msg_defaults.get("message_font_bold", "true")
-        font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-        style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-        from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout
-        from PyQt5.QtCore import Qt
-        msg_dialog = QDialog(self, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-        msg_dialog.setModal(False)
-        layout = QVBoxLayout(msg_dialog)
-        label = QLabel(message)
-        label.setStyleSheet(style)
-        label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(label)
-        msg_dialog.adjustSize()
-        # Center the dialog on the parent
-        parent_geo = self.geometry()
-        msg_dialog.move(self.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-        msg_dialog.show()
-        QTimer.singleShot(timeout, msg_dialog.accept)
+    def show_floating_message(self, message, timeout=2000, buttons=None):
+        show_message_dialog(self, message, timeout, buttons)
 
     def save_student(self):
         """Save the student data."""
@@ -292,10 +290,8 @@ class StudentForm(QDialog):
             update_student(self.student_id, data_to_update)
             self.show_floating_message("Student updated.")
         else:
-            # Add new student
-            new_id = self.generate_unique_student_id()
+            # Add new student (SQLite assigns the student_id)
             new_student = {
-                "student_id": new_id,
                 "class_no": self.class_id,
                 "name": name,
                 "nickname": nickname,
@@ -307,7 +303,7 @@ class StudentForm(QDialog):
                 "post_test": post_test,
                 "note": note
             }
-            insert_student(new_student)
+            new_id = insert_student(new_student)
             # Insert attendance if present
             if self.default_attendance:
                 from logic.db_interface import set_attendance
@@ -318,16 +314,6 @@ class StudentForm(QDialog):
         self.refresh_callback()
         self.accept()
 
-    def generate_unique_student_id(self):
-        """Generate a unique Student ID."""
-        existing_ids = [row["student_id"] for row in get_students_by_class(self.class_id)]
-        idx = 1
-        while True:
-            new_id = f"S{idx:03d}"
-            if new_id not in existing_ids:
-                return new_id
-            idx += 1
-
     def open_bulk_import_dialog(self):
         # --- Load per-form settings for BulkImportStudents ---
         form_settings = get_form_settings("BulkImportStudents") or {}
@@ -591,8 +577,7 @@ class StudentForm(QDialog):
                     # Use parent's show_floating_message with Yes/No buttons
                     self.parent().show_floating_message(
                         "Clear this row? This will erase all data in the row.",
-                        buttons=[("Yes", on_confirm), ("No", on_cancel)],
-                        style_from_db=True
+                        buttons=[("Yes", on_confirm), ("No", on_cancel)]
                     )
                     return
 
@@ -646,6 +631,12 @@ class StudentForm(QDialog):
         paste_button.clicked.connect(lambda: self.paste_from_clipboard(table))
         button_row.addWidget(paste_button)
 
+        file_button = QPushButton("Import from File...")
+        file_button.setFont(QFont(font_family, button_font_size, QFont.Bold if button_font_bold else QFont.Normal))
+        file_button.setStyleSheet(button_style)
+        file_button.clicked.connect(lambda: self.import_roster_file(dialog))
+        button_row.addWidget(file_button)
+
         clear_button = QPushButton("Clear All")
         clear_button.setFont(QFont(font_family, button_font_size, QFont.Bold if button_font_bold else QFont.Normal))
         clear_button.setStyleSheet(button_style)
@@ -703,54 +694,95 @@ class StudentForm(QDialog):
                         table.setItem(row_idx, col_idx, QTableWidgetItem(value))
 
     def save_bulk_import(self, table, dialog):
-        from logic.db_interface import insert_student
-
-        headers = ["Name", "Nickname", "Company No", "Gender", "Score", "Pre-Test", "Post-Test", "Note"]
+        from logic.student_import import import_students
 
+        # Read the grid once, then validate and insert the whole batch in one transaction
+        rows = []
         for row in range(table.rowCount()):
-            name_item = table.item(row, 0)
-            if not name_item or not name_item.text().strip():
-                continue  # Skip empty rows
-
-            # --- Skip header row if pasted ---
-            if name_item.text().strip().lower() == "name":
-                continue
-            if all(
-                table.item(row, col) and table.item(row, col).text().strip().lower() == headers[col].lower()
-                for col in range(table.columnCount())
-            ):
-                continue
-
-            name = self.capitalize_words(name_item.text().strip())
-            nickname = self.capitalize_words(table.item(row, 1).text().strip()) if table.item(row, 1) else ""
-            company_no = table.item(row, 2).text().strip() if table.item(row, 2) else ""
-            gender = table.item(row, 3).text().strip() if table.item(row, 3) else "Female"
-            score = table.item(row, 4).text().strip() if table.item(row, 4) else ""
-            pre_test = table.item(row, 5).text().strip() if table.item(row, 5) else ""
-            post_test = table.item(row, 6).text().strip() if table.item(row, 6) else ""
-            note = table.item(row, 7).text().strip() if table.item(row, 7) else ""
-
-            student_id = self.generate_unique_student_id()
-            student_record = {
-                "student_id": student_id,
-                "class_no": self.class_id,
-                "name": name,
-                "nickname": nickname,
-                "company_no": company_no,
-                "gender": gender,
-                "score": score,
-                "pre_test": pre_test,
-                "post_test": post_test,
-                "note": note,
-                "active": "Yes",
-                # Attendance is handled in a separate table; insert if needed
-            }
-            insert_student(student_record)
+            cells = []
+            for col in range(table.columnCount()):
+                item = table.item(row, col)
+                cells.append(item.text() if item else "")
+            rows.append(cells)
+
+        result = import_students(self.class_id, rows, self.default_attendance)
+        inserted = len(result["inserted"])
+        errors = result["errors"]
 
         self.refresh_callback()
-        self.show_floating_message("Students imported successfully!")
+        if errors:
+            details = "\n".join(f"Row {row_number}: {message}" for row_number, message in errors[:10])
+            if len(errors) > 10:
+                details += f"\n... and {len(errors) - 10} more"
+            # Drop the rows that made it in; keep the bad ones so they can be fixed and saved again
+            for row_number in sorted(result["inserted_rows"], reverse=True):
+                table.removeRow(row_number - 1)
+            self.show_floating_message(f"Imported {inserted} students. {len(errors)} rows skipped:\n{details}", timeout=6000)
+            return
+        self.show_floating_message(f"{inserted} students imported successfully!")
         dialog.accept()
 
+    def import_roster_file(self, bulk_dialog):
+        """Import an .xlsx/.csv roster straight into the DB. Only the first rows are shown as a preview."""
+        from PyQt5.QtWidgets import QFileDialog
+        from logic.roster_import import preview_roster, import_roster, PREVIEW_ROWS
+        from logic.student_import import BULK_IMPORT_HEADERS
+
+        path, _ = QFileDialog.getOpenFileName(self, "Import Roster", "", "Rosters (*.xlsx *.csv);;Excel (*.xlsx);;CSV (*.csv)")
+        if not path:
+            return
+        try:
+            column_map, has_header, preview_rows = preview_roster(path, PREVIEW_ROWS)
+        except (ImportError, ValueError, OSError) as e:
+            self.show_floating_message(f"Could not read roster: {e}", timeout=4000)
+            return
+
+        preview = QDialog(bulk_dialog)
+        preview.setWindowTitle("Import Roster - Preview")
+        preview.resize(900, 500)
+        layout = QVBoxLayout(preview)
+        header_note = "Columns matched from the file header." if has_header else "No header found: columns read in Bulk Import order."
+        layout.addWidget(QLabel(f"{os.path.basename(path)}\nShowing the first {len(preview_rows)} rows. {header_note}"))
+        preview_table = QTableWidget(len(preview_rows), len(BULK_IMPORT_HEADERS))
+        preview_table.setHorizontalHeaderLabels(BULK_IMPORT_HEADERS)
+        preview_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for r, cells in enumerate(preview_rows):
+            for c, value in enumerate(cells):
+                preview_table.setItem(r, c, QTableWidgetItem(value))
+        preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(preview_table)
+        buttons = QHBoxLayout()
+        import_button = QPushButton("Import All Rows")
+        import_button.clicked.connect(preview.accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(preview.reject)
+        buttons.addWidget(import_button)
+        buttons.addWidget(cancel_button)
+        layout.addLayout(buttons)
+        if preview.exec_() != QDialog.Accepted:
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = import_roster(path, self.class_id, self.default_attendance,
+                                   progress_callback=lambda _rows: QApplication.processEvents())
+        except (ImportError, ValueError, OSError) as e:
+            QApplication.restoreOverrideCursor()
+            self.show_floating_message(f"Import failed: {e}", timeout=4000)
+            return
+        QApplication.restoreOverrideCursor()
+
+        self.refresh_callback()
+        errors = result["errors"]
+        message = f"{result['inserted']} students imported from {os.path.basename(path)}."
+        if errors:
+            details = "\n".join(f"Row {row_number}: {error}" for row_number, error in errors[:10])
+            if len(errors) > 10:
+                details += f"\n... and {len(errors) - 10} more"
+            message += f" {len(errors)} rows skipped:\n{details}"
+        self.show_floating_message(message, timeout=6000 if errors else 2500)
+        bulk_dialog.accept()
+
     def capitalize_words(self, s):
         return " ".join(w[:1].upper() + w[1:] if w else "" for w in s.split())
 
@@ -2,9 +2,9 @@ from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QHBoxLayout
 )
 from PyQt5.QtCore import Qt, QTimer
-from src.logic.db_interface import update_student, insert_student, get_students_by_class, delete_student
-from src.ui.student_form import StudentForm
-from logic.db_interface import get_form_settings, get_all_defaults, get_message_defaults
+from logic.db_interface import update_student, insert_student, get_students_by_class, delete_student, get_form_settings, get_all_defaults
+from ui.student_form import StudentForm
+from ui.toast import show_message_dialog
 from logic.display import center_widget, scale_and_center, apply_window_flags
 
 def validate_student_data(student_data: dict) -> bool:
@@ -19,49 +19,6 @@ def validate_student_data(student_data: dict) -> bool:
         student_data["attendance"] = {}
     return True
 
-def show_message_dialog(parent, message, timeout=2000, buttons=None):
-    """
-    Show a floating message dialog. If buttons is provided, it should be a list of (label, callback) tuples.
-    If buttons is None, show an auto-closing info dialog.
-    """
-    msg_defaults = get_message_defaults()
-    bg = msg_defaults.get("message_bg_color", "#2980f0")
-    fg = msg_defaults.get("message_fg_color", "#fff")
-    border = msg_defaults.get("message_border_color", "#1565c0")
-    border_width = msg_defaults.get("message_border_width", "3")
-    border_radius = msg_defaults.get("message_border_radius", "12")
-    padding = msg_defaults.get("message_padding", "18px 32px")
-    font_size = msg_defaults.get("message_font_size", "13")
-    font_bold = msg_defaults.get("message_font_bold", "true")
-    font_weight = "bold" if str(font_bold).lower() in ("1", "true", "yes") else "normal"
-    style = f"background: {bg}; color: {fg}; border: {border_width}px solid {border}; padding: {padding}; font-size: {font_size}pt; font-weight: {font_weight}; border-radius: {border_radius}px;"
-    from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout, QHBoxLayout, QPushButton
-    from PyQt5.QtCore import Qt
-    msg_dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg_dialog.setAttribute(Qt.WA_TranslucentBackground)
-    msg_dialog.setModal(True if buttons else False)
-    layout = QVBoxLayout(msg_dialog)
-    label = QLabel(message)
-    label.setStyleSheet(style)
-    label.setAlignment(Qt.AlignCenter)
-    layout.addWidget(label)
-    if buttons:
-        btn_row = QHBoxLayout()
-        for btn_text, btn_callback in buttons:
-            btn = QPushButton(btn_text)
-            btn.setStyleSheet(f"background: {bg}; color: {fg}; border-radius: {border_radius}px; font-size: {font_size}pt; font-weight: {font_weight}; padding: 6px 18px;")
-            btn.clicked.connect(lambda _, cb=btn_callback: (msg_dialog.accept(), cb() if cb else None))
-            btn_row.addWidget(btn)
-        layout.addLayout(btn_row)
-    msg_dialog.adjustSize()
-    parent_geo = parent.geometry() if parent else None
-    if parent_geo:
-        msg_dialog.move(parent.mapToGlobal(parent_geo.center()) - msg_dialog.rect().center())
-    msg_dialog.show()
-    if not buttons:
-        QTimer.singleShot(timeout, msg_dialog.accept)
-    else:
-        msg_dialog.exec_()
 
 class StudentManager(QDialog):
     def __init__(self, parent, data, class_id, refresh_callback):
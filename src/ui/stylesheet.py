@@ -5,6 +5,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 from logic.db_interface import get_all_defaults, set_all_defaults, get_form_settings, get_teacher_defaults
+from ui.toast import show_floating_message
 import logging
 
 # Configure logging
@@ -15,51 +16,6 @@ logging.basicConfig(
     filemode="w"  # Overwrite the log file each time the application runs
 )
 
-# --- Floating message dialog helper ---
-def show_floating_message(parent, message, duration=2500, style_overrides=None):
-    defaults = get_all_defaults()
-    bg = defaults.get("message_bg_color", "#323232")
-    fg = defaults.get("message_fg_color", "#fff")
-    border = defaults.get("message_border_color", "#2980f0")
-    border_width = int(defaults.get("message_border_width", 2))
-    border_radius = int(defaults.get("message_border_radius", 12))
-    font_size = int(defaults.get("message_font_size", 12))
-    font_weight = "bold" if str(defaults.get("message_font_bold", "true")).lower() == "true" else "normal"
-    padding = defaults.get("message_padding", "10px 18px")
-    shadow = defaults.get("message_shadow", "2px 2px 8px #222")
-    z = int(defaults.get("message_z_index", 10000))
-    if style_overrides:
-        bg = style_overrides.get("bg", bg)
-        fg = style_overrides.get("fg", fg)
-        border = style_overrides.get("border", border)
-        border_width = style_overrides.get("border_width", border_width)
-        border_radius = style_overrides.get("border_radius", border_radius)
-        font_size = style_overrides.get("font_size", font_size)
-        font_weight = style_overrides.get("font_weight", font_weight)
-        padding = style_overrides.get("padding", padding)
-        shadow = style_overrides.get("shadow", shadow)
-        z = style_overrides.get("z", z)
-    msg = QLabel(message, parent)
-    msg.setWindowFlags(Qt.ToolTip | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-    msg.setAttribute(Qt.WA_TranslucentBackground)
-    msg.setAlignment(Qt.AlignCenter)
-    msg.setStyleSheet(f"""
-        background: {bg};
-        color: {fg};
-        border: {border_width}px solid {border};
-        border-radius: {border_radius}px;
-        font-size: {font_size}pt;
-        font-weight: {font_weight};
-        padding: {padding};
-    """)
-    msg.adjustSize()
-    parent_rect = parent.geometry()
-    msg.move(
-        parent_rect.x() + (parent_rect.width() - msg.width()) // 2,
-        parent_rect.y() + (parent_rect.height() - msg.height()) // 2
-    )
-    msg.show()
-    QTimer.singleShot(duration, msg.close)
 
 class StylesheetForm(QDialog):
     def __init__(self, parent=None):
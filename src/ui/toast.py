@@ -0,0 +1,124 @@
+from collections import deque
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QApplication, QDialog, QLabel, QVBoxLayout, QHBoxLayout, QPushButton
+from logic.style_compiler import compile_stylesheet
+
+# Transient messages ("Student added.", "Data saved successfully." ...) for every form.
+# Each top-level window owns one hidden Toast that is reused for all its messages; messages
+# arriving while one is on screen are queued and shown in turn instead of stacking dialogs.
+# Styling comes from the compiled "Message" stylesheet, so the defaults are read once per
+# settings version rather than once per message.
+
+MAX_QUEUED = 5  # older pending messages are dropped beyond this
+
+_orphan_toast = None  # for messages shown without a parent window
+
+
+class Toast(QDialog):
+    def __init__(self, window=None):
+        super().__init__(window, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setObjectName("toast")
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setModal(False)
+        self.label = QLabel(self)
+        self.label.setAlignment(Qt.AlignCenter)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.label)
+        self.pending = deque(maxlen=MAX_QUEUED)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.show_next)
+        self.qss = None
+
+    def enqueue(self, message, timeout):
+        """Queue a message; a repeat of the one showing or last queued is ignored."""
+        if self.pending:
+            latest = self.pending[-1][0]
+        else:
+            latest = self.label.text() if self.timer.isActive() else None
+        if message == latest:
+            return
+        self.pending.append((message, timeout))
+        if not self.timer.isActive():
+            self.show_next()
+
+    def show_next(self):
+        if not self.pending:
+            self.hide()
+            return
+        message, timeout = self.pending.popleft()
+        qss = compile_stylesheet("Message")
+        if qss is not self.qss:
+            self.setStyleSheet(qss)
+            self.qss = qss
+        self.label.setText(message)
+        self.adjustSize()
+        center_on(self, self.parentWidget())
+        self.show()
+        self.raise_()
+        self.timer.start(timeout)
+
+
+def center_on(widget, window):
+    """Center widget over window, or over the screen when the window isn't shown."""
+    if window is not None and window.isVisible():
+        area = window.frameGeometry()
+    else:
+        screen = window.screen() if hasattr(window, "screen") else QApplication.primaryScreen()
+        if screen is None:
+            return
+        area = screen.availableGeometry()
+    widget.move(area.center() - widget.rect().center())
+
+
+def toast_for(parent):
+    """The Toast of parent's top-level window, created on first use."""
+    global _orphan_toast
+    if parent is None:
+        if _orphan_toast is None:
+            _orphan_toast = Toast()
+        return _orphan_toast
+    window = parent.window()
+    toast = window.findChild(Toast, "toast", Qt.FindDirectChildrenOnly)
+    if toast is None:
+        toast = Toast(window)
+    return toast
+
+
+def ask(parent, message, buttons):
+    """Modal message with a row of (label, callback) buttons; the clicked callback runs after closing."""
+    dialog = QDialog(parent, Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+    dialog.setObjectName("messageConfirm")
+    dialog.setAttribute(Qt.WA_TranslucentBackground)
+    dialog.setStyleSheet(compile_stylesheet("Message"))
+    layout = QVBoxLayout(dialog)
+    label = QLabel(message)
+    label.setAlignment(Qt.AlignCenter)
+    layout.addWidget(label)
+    btn_row = QVBoxLayout() if len(buttons) < 3 else QHBoxLayout()
+    for btn_text, btn_callback in buttons:
+        btn = QPushButton(btn_text)
+        btn.clicked.connect(lambda _, cb=btn_callback: (dialog.accept(), cb() if cb else None))
+        btn_row.addWidget(btn)
+    layout.addLayout(btn_row)
+    dialog.adjustSize()
+    center_on(dialog, parent.window() if parent is not None else None)
+    dialog.exec_()
+    dialog.deleteLater()
+
+
+def show_message_dialog(parent, message, timeout=2000, buttons=None):
+    """
+    Show a floating message. If buttons is provided, it should be a list of (label, callback) tuples
+    and the message is modal; otherwise it is an auto-closing toast.
+    """
+    if buttons:
+        ask(parent, message, buttons)
+    else:
+        toast_for(parent).enqueue(message, timeout)
+
+
+def show_floating_message(parent, message, duration=2500, title=None):
+    """Auto-closing toast (title is accepted for older callers and not shown)."""
+    toast_for(parent).enqueue(message, duration)
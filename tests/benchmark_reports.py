@@ -0,0 +1,197 @@
+"""
+Report rendering benchmark.
+
+Builds synthetic databases with build_sqlite_db.recreate_db at multiples of our current
+size (6 classes, ~14 students per class, 20 dates per class) and times the load, render,
+summary, export and Mainform refresh paths. Results go to a JSON file for regression tracking.
+
+Runs headless (Qt offscreen). Paths whose dependencies are not installed are reported as skipped;
+a path that raises anything else is reported under "failed" and the other paths still run.
+
+    python tests/benchmark_reports.py --scales 10 100 1000 --output benchmark_results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.build_sqlite_db import recreate_db, import_form_settings_from_factory, merge_metadata_with_defaults, DATA_DIR
+
+# Current production size
+BASE_CLASSES = 6
+STUDENTS_PER_CLASS = 14
+DATES_PER_CLASS = 20
+STATUSES = ["P", "P", "P", "P", "A", "L", "-"]
+FIRST_NAMES = ["Anan", "Busaba", "Chai", "Dao", "Ekkachai", "Fah", "Kanya", "Lek", "Malee", "Niran", "Ploy", "Somchai"]
+LAST_NAMES = ["Srisuk", "Wongsa", "Chaiyaporn", "Boonmee", "Rattana", "Suwan", "Thongdee"]
+
+
+def generate_db(db_path, scale, seed=1234):
+    """Create a synthetic DB at `scale` x current size. Returns row counts."""
+    rng = random.Random(seed)
+    conn = recreate_db(db_path)
+    if conn is None:
+        raise RuntimeError("recreate_db did not return a connection (missing data/teacher_defaults.json?)")
+    cursor = conn.cursor()
+    # Per-form settings and full class rows, as an installed DB has them (Mainform reads both)
+    with open(os.path.join(DATA_DIR, "factory_defaults.json"), encoding="utf-8") as f:
+        factory_defaults = json.load(f)
+    import_form_settings_from_factory(conn, factory_defaults)
+    class_defaults = factory_defaults.get("classes", {}).get("default", {})
+
+    class_count = BASE_CLASSES * scale
+    classes, students, attendance, dates = [], [], [], []
+    student_id = 0
+    for c in range(class_count):
+        class_no = f"BEN{c + 1:05d}"
+        start = datetime(2025, 1, 6) + timedelta(days=rng.randint(0, 180))
+        class_dates = [(start + timedelta(days=2 * i)).strftime("%d/%m/%Y") for i in range(DATES_PER_CLASS)]
+        metadata = merge_metadata_with_defaults({
+            "class_no": class_no, "company": f"Company {c % 50}", "teacher": "Paul R", "room": "Room 1",
+            "course_book": "English 1", "start_date": class_dates[0], "finish_date": class_dates[-1],
+            "time": "17:00 - 19:00", "rate": 520, "travel": 200, "bonus": 1000, "course_hours": 40, "class_time": 2,
+            "max_classes": str(DATES_PER_CLASS), "days": "Monday, Wednesday", "archive": "No", "width_date": 50,
+        }, class_defaults)
+        metadata.pop("dates", None)
+        classes.append(metadata)
+        dates.extend((class_no, d, "") for d in class_dates)
+        for _ in range(STUDENTS_PER_CLASS):
+            student_id += 1
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            students.append((student_id, class_no, name, name.split()[0], f"C{student_id:06d}", rng.choice(["Male", "Female"]), "", "", "", "", "Yes"))
+            attendance.extend((class_no, str(student_id), d, rng.choice(STATUSES)) for d in class_dates)
+
+    columns = list(classes[0])
+    cursor.executemany(
+        f"INSERT INTO classes ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [[row[c] for c in columns] for row in classes],
+    )
+    cursor.executemany("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", students)
+    cursor.executemany("INSERT INTO class_students (class_no, student_id) VALUES (?, ?)", [(s[1], str(s[0])) for s in students])
+    cursor.executemany("INSERT INTO attendance (class_no, student_id, date, status) VALUES (?, ?, ?, ?)", attendance)
+    cursor.executemany("INSERT INTO dates (class_no, date, note) VALUES (?, ?, ?)", dates)
+    conn.commit()
+    conn.close()
+    return {"classes": class_count, "students": len(students), "attendance": len(attendance), "dates": len(dates)}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return round(time.perf_counter() - start, 4)
+
+
+def bench_load():
+    from logic.parser import load_data
+    return timed(load_data)
+
+
+def bench_render(class_nos):
+    from ui.htmlbluecard import build_bluecard_view, get_bluecard_template, app
+    template = get_bluecard_template()
+
+    def render_all():
+        with app.app_context():
+            for class_no in class_nos:
+                template.render(**build_bluecard_view(class_no))
+    return timed(render_all)
+
+
+def bench_summary():
+    from ui.monthly_summary import generate_monthly_summary
+    return timed(generate_monthly_summary, "Paul R")
+
+
+def bench_export(db_path, work_dir):
+    from logic.export_db_to_json import export_db_to_json
+    return timed(export_db_to_json, db_path, os.path.join(work_dir, "export.json"))
+
+
+def bench_refresh(class_no):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    from ui.mainform import Mainform
+    class_data = db_interface.get_class_by_id(class_no)
+    form = Mainform(class_no, {"classes": {class_no: class_data}}, None)
+    elapsed = timed(form.refresh_student_table)
+    form.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def run_scale(scale, work_dir, render_sample):
+    db_path = os.path.join(work_dir, f"bench_{scale}x.db")
+    gen_start = time.perf_counter()
+    counts = generate_db(db_path, scale)
+    result = {"scale": scale, "counts": counts, "generate_s": round(time.perf_counter() - gen_start, 4), "timings": {}, "skipped": {}, "failed": {}}
+
+    original_db_path = db_interface.DB_PATH
+    db_interface.DB_PATH = db_path
+    try:
+        class_nos = [c["class_no"] for c in db_interface.get_all_classes()]
+        paths = {
+            "load": bench_load,
+            "render": lambda: bench_render(class_nos[:render_sample]),
+            "summary": bench_summary,
+            "export": lambda: bench_export(db_path, work_dir),
+            "refresh_student_table": lambda: bench_refresh(class_nos[0]),
+        }
+        for name, fn in paths.items():
+            try:
+                result["timings"][name] = fn()
+            except ImportError as e:
+                result["skipped"][name] = f"missing dependency: {e.name}"
+            except Exception as e:
+                result["failed"][name] = f"{type(e).__name__}: {e}"
+            if name in result["failed"]:
+                print(f"[BENCH] {scale}x {name}: failed ({result['failed'][name]})")
+            else:
+                print(f"[BENCH] {scale}x {name}: {result['timings'].get(name, 'skipped')}")
+    finally:
+        db_interface.DB_PATH = original_db_path
+    return result
+
+
+def run_benchmarks(scales, output, render_sample=10, keep_dbs=False):
+    work_dir = tempfile.mkdtemp(prefix="bluecard_bench_")
+    try:
+        results = [run_scale(scale, work_dir, render_sample) for scale in scales]
+    finally:
+        if not keep_dbs:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "render_sample": render_sample,
+        "results": results,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Results written to {output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Bluecard report paths on synthetic databases.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000], help="Multiples of the current DB size")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--render-sample", type=int, default=10, help="Number of classes rendered per scale")
+    parser.add_argument("--keep-dbs", action="store_true", help="Keep the generated databases")
+    args = parser.parse_args()
+    run_benchmarks(args.scales, args.output, args.render_sample, args.keep_dbs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.build_sqlite_db import recreate_db
+
+
+class TempDBTestCase(unittest.TestCase):
+    """
+    Base for tests that need a database: each test gets a fresh recreate_db() DB in its own temp
+    directory (self.tmp, self.db_path) with db_interface.DB_PATH pointed at it. Both are undone
+    by cleanups, so subclasses only call super().setUp() and need no tearDown for them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        recreate_db(self.db_path).close()
+        patcher = mock.patch.object(db_interface, "DB_PATH", self.db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from db_test_case import TempDBTestCase
+
+
+def class_row_counts(schema, class_no):
+    conn = db_interface.get_connection()
+    if schema == "archive":
+        db_interface.attach_archive(conn)
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {schema}.{table} WHERE class_no = ?", (class_no,)).fetchone()[0]
+        for table in db_interface.ARCHIVE_TABLES
+    }
+    conn.close()
+    return counts
+
+
+class TestArchiveTier(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "company": "Acme", "archive": "No"})
+        db_interface.reconcile_class_dates("T1", ["01/05/2025", "02/05/2025"])
+        ids, _ = db_interface.insert_students_bulk("T1", [{"name": "Anna"}, {"name": "Ben"}], {"01/05/2025": "-"})
+        db_interface.set_attendance("T1", ids[0], "02/05/2025", "P")
+        self.live_counts = class_row_counts("main", "T1")
+
+    def test_archive_moves_rows_and_restore_brings_them_back(self):
+        version = db_interface.get_class_version("T1")
+        db_interface.set_class_archived("T1", archived=True)
+        self.assertIsNone(db_interface.get_class_by_id("T1"))
+        self.assertTrue(all(count == 0 for count in class_row_counts("main", "T1").values()))
+        self.assertEqual(class_row_counts("archive", "T1"), self.live_counts)
+        self.assertEqual([c["class_no"] for c in db_interface.get_archived_classes(search="acm")], ["T1"])
+
+        db_interface.set_class_archived("T1", archived=False)
+        self.assertEqual(class_row_counts("main", "T1"), self.live_counts)
+        self.assertEqual(db_interface.get_archived_classes(), [])
+        self.assertEqual(db_interface.get_class_by_id("T1")["archive"], "No")
+        self.assertEqual(db_interface.get_class_version("T1"), version)
+
+    def test_conflicting_class_no_leaves_both_sides_untouched(self):
+        db_interface.set_class_archived("T1", archived=True)
+        db_interface.insert_class({"class_no": "T1", "company": "New Acme", "archive": "No"})
+        with self.assertRaises(ValueError):
+            db_interface.set_class_archived("T1", archived=False)
+        self.assertEqual(db_interface.get_class_by_id("T1")["company"], "New Acme")
+        self.assertEqual(class_row_counts("archive", "T1"), self.live_counts)
+
+    def test_flagged_classes_are_swept_and_delete_reaches_archive(self):
+        db_interface.update_class("T1", {"archive": "Yes"})
+        self.assertEqual(db_interface.archive_flagged_classes(), ["T1"])
+        self.assertEqual(class_row_counts("archive", "T1"), self.live_counts)
+        db_interface.delete_class("T1")
+        self.assertTrue(all(count == 0 for count in class_row_counts("archive", "T1").values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
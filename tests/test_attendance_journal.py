@@ -0,0 +1,110 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.attendance_journal import AttendanceJournal
+from db_test_case import TempDBTestCase
+
+DATE = "01/05/2025"
+
+
+class TestAttendanceJournal(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        db_interface.insert_date("T1", DATE)
+        self.ids, _errors = db_interface.insert_students_bulk("T1", [{"name": f"S{i}"} for i in range(30)])
+        db_interface.set_attendance("T1", self.ids[0], DATE, "A")
+        self.journal = AttendanceJournal("T1")
+
+    def column(self):
+        marks = db_interface.get_attendance_by_class("T1")
+        return [marks.get(str(sid), {}).get(DATE) for sid in self.ids]
+
+    def note(self):
+        conn = db_interface.get_connection()
+        row = conn.execute("SELECT note FROM dates WHERE class_no = 'T1' AND date = ?", (DATE,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def test_column_edit_is_one_undo_step(self):
+        before = self.column()
+        self.journal.apply([(sid, DATE, "COD") for sid in self.ids], {DATE: "COD"}, label="column")
+        self.assertEqual(self.column(), ["COD"] * 30)
+        self.assertEqual(self.note(), "COD")
+        self.assertEqual(len(self.journal.undo_stack), 1)
+
+        self.assertEqual(self.journal.undo().label, "column")
+        self.assertEqual(self.column(), before)  # ["A", None, None, ...]: unmarked cells go back to no row
+        self.assertEqual(self.note(), "")
+        self.assertFalse(self.journal.can_undo())
+
+        self.journal.redo()
+        self.assertEqual(self.column(), ["COD"] * 30)
+        self.assertIsNone(self.journal.redo())
+
+    def test_new_edit_clears_redo(self):
+        self.journal.apply([(self.ids[1], DATE, "P")])
+        self.journal.undo()
+        self.assertTrue(self.journal.can_redo())
+        self.journal.apply([(self.ids[2], DATE, "L")])
+        self.assertFalse(self.journal.can_redo())
+
+    def test_oldest_edits_are_evicted(self):
+        journal = AttendanceJournal("T1", max_edits=3, max_cells=40)
+        for status in ("P", "A", "L", "P"):
+            journal.apply([(self.ids[1], DATE, status)], label=status)
+        self.assertEqual([e.label for e in journal.undo_stack], ["A", "L", "P"])
+
+        journal.apply([(sid, DATE, "HOL") for sid in self.ids], label="column")
+        self.assertEqual([e.label for e in journal.undo_stack], ["L", "P", "column"])
+        journal.apply([(sid, DATE, "P") for sid in self.ids], label="column 2")
+        self.assertEqual([e.label for e in journal.undo_stack], ["column 2"])  # two columns are over the 40-cell cap
+
+    def test_cell_cap_covers_both_stacks(self):
+        journal = AttendanceJournal("T1", max_cells=70)
+        for status in ("P", "A"):
+            journal.apply([(sid, DATE, status) for sid in self.ids], label=status)
+        journal.undo()
+        self.assertEqual(journal.cell_count(), 60)  # one column to undo, one to redo
+        steps = [("apply", 30), "undo", "undo", "redo", ("apply", 1), ("apply", 30), "undo", "undo", "undo", "redo", ("apply", 30), ("apply", 30)]
+        for step in steps:
+            if step == "undo":
+                journal.undo()
+            elif step == "redo":
+                journal.redo()
+            else:
+                journal.apply([(sid, DATE, "HOL") for sid in self.ids[:step[1]]])
+            self.assertLessEqual(journal.cell_count(), 70, step)
+        self.assertEqual([len(e.cells) for e in journal.undo_stack], [30, 30])
+
+    def test_deleted_student_discards_history(self):
+        self.journal.apply([(self.ids[1], DATE, "P")])
+        self.journal.undo()
+        db_interface.delete_student(self.ids[1])
+        self.assertIsNone(self.journal.redo())  # would otherwise fail the student foreign key
+        self.assertFalse(self.journal.can_undo() or self.journal.can_redo())
+        self.assertNotIn(str(self.ids[1]), db_interface.get_attendance_by_class("T1"))
+
+    def test_removed_date_is_not_restored_by_undo(self):
+        other = "02/05/2025"
+        db_interface.insert_date("T1", other)
+        self.journal.apply([(sid, DATE, "HOL") for sid in self.ids], {DATE: "HOL"}, label="column")
+        db_interface.reconcile_class_dates("T1", [other])  # the metadata form drops DATE from the schedule
+        self.assertIsNone(self.journal.undo())
+        self.assertIsNone(self.note())
+        self.assertFalse(self.journal.can_undo())
+
+    def test_own_edits_keep_history(self):
+        self.journal.apply([(self.ids[1], DATE, "P")])
+        self.journal.apply([(self.ids[2], DATE, "L")])
+        self.journal.undo()
+        self.assertFalse(self.journal.discard_if_changed())
+        self.assertIsNotNone(self.journal.redo())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+import benchmark_reports
+
+
+class TestBenchmarkReports(unittest.TestCase):
+    def test_smoke_run_writes_results(self):
+        """A 1x run generates the DB, times the available paths and writes JSON."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            report = benchmark_reports.run_benchmarks([1], output, render_sample=1)
+            with open(output, encoding="utf-8") as f:
+                saved = json.load(f)
+        self.assertEqual(saved["results"][0]["scale"], 1)
+        result = report["results"][0]
+        self.assertEqual(result["counts"]["classes"], benchmark_reports.BASE_CLASSES)
+        self.assertEqual(result["counts"]["attendance"], benchmark_reports.BASE_CLASSES * benchmark_reports.STUDENTS_PER_CLASS * benchmark_reports.DATES_PER_CLASS)
+        for name in ("load", "render", "summary", "export", "refresh_student_table"):
+            self.assertTrue(name in result["timings"] or name in result["skipped"], name)
+        self.assertEqual(result["failed"], {})
+        self.assertIn("load", result["timings"])
+        self.assertIn("export", result["timings"])
+
+
+if __name__ == "__main__":
+    unittest.main()
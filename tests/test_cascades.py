@@ -0,0 +1,77 @@
+import os
+import sys
+import sqlite3
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from db_test_case import TempDBTestCase
+
+
+def count(table, where="1"):
+    conn = db_interface.get_connection()
+    n = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}").fetchone()[0]
+    conn.close()
+    return n
+
+
+class TestCascadingDeletes(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        db_interface.reconcile_class_dates("T1", ["01/05/2025", "02/05/2025"])
+        self.ids, _ = db_interface.insert_students_bulk("T1", [{"name": "Anna"}, {"name": "Ben"}], {"01/05/2025": "P"})
+
+    def test_delete_student_takes_their_rows(self):
+        db_interface.delete_student(self.ids[0])
+        self.assertEqual(count("attendance", f"student_id = '{self.ids[0]}'"), 0)
+        self.assertEqual(count("class_students", f"student_id = '{self.ids[0]}'"), 0)
+        self.assertEqual(count("attendance"), 1)
+
+    def test_delete_class_takes_every_row(self):
+        db_interface.delete_class("T1")
+        for table in db_interface.ARCHIVE_TABLES:
+            self.assertEqual(count(table, "class_no = 'T1'"), 0, table)
+
+    def test_rows_for_missing_parents_are_refused(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            db_interface.set_attendance("T1", 999, "01/05/2025", "P")
+
+    def test_purge_orphans_removes_dead_rows_and_reports_space(self):
+        conn = sqlite3.connect(self.db_path)  # foreign keys off, as connections were before
+        conn.execute("DELETE FROM students WHERE student_id = ?", (self.ids[1],))
+        conn.execute("DELETE FROM classes WHERE class_no = 'T1'")
+        conn.executemany(
+            "INSERT INTO attendance VALUES ('GONE', ?, ?, 'P')",
+            [(str(self.ids[0]), f"{day:02d}/06/2025") for day in range(1, 29)]
+        )
+        conn.commit()
+        conn.close()
+        deleted, reclaimed = db_interface.purge_orphans()
+        self.assertEqual(deleted["students"], 1)
+        self.assertGreaterEqual(deleted["attendance"], 28)
+        self.assertGreaterEqual(reclaimed, 0)
+        for table in db_interface.ARCHIVE_TABLES:
+            self.assertEqual(count(table), 0, table)
+        self.assertEqual(db_interface.purge_orphans(), ({}, 0))
+
+    def test_backup_is_taken_before_the_purge(self):
+        from ui import launcher
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO attendance VALUES ('GONE', ?, '01/06/2025', 'P')", (str(self.ids[0]),))
+        conn.commit()
+        conn.close()
+        backup_dir = os.path.join(self.tmp.name, "backup")
+        with mock.patch.object(launcher, "DB_PATH", self.db_path), mock.patch.object(launcher, "BACKUP_DIR", backup_dir):
+            launcher.backup_sqlite_db()
+        [backup_name] = os.listdir(backup_dir)
+        backup = sqlite3.connect(os.path.join(backup_dir, backup_name))
+        self.assertEqual(backup.execute("SELECT COUNT(*) FROM attendance WHERE class_no = 'GONE'").fetchone()[0], 1)
+        backup.close()
+        self.assertEqual(count("attendance", "class_no = 'GONE'"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from db_test_case import TempDBTestCase
+
+
+class TestChangeJournal(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "company": "Acme", "archive": "No"})
+        db_interface.insert_class({"class_no": "T2", "company": "Bigco", "archive": "No"})
+        self.student_id = db_interface.insert_student({"class_no": "T1", "name": "Anna"})
+        db_interface.insert_date("T1", "01/05/2025")
+        db_interface.set_attendance("T1", self.student_id, "01/05/2025", "P")
+
+    def entries(self, seq=0, **kwargs):
+        return [(c["table_name"], c["row_key"], c["class_no"], c["op"]) for c in db_interface.changes_since(seq, **kwargs)]
+
+    def test_writes_are_journalled_in_order(self):
+        sid = str(self.student_id)
+        self.assertEqual(self.entries(tables=["classes", "students", "dates", "attendance"]), [
+            ("classes", "T1", "T1", "insert"),
+            ("classes", "T2", "T2", "insert"),
+            ("students", sid, "T1", "insert"),
+            ("dates", "01/05/2025", "T1", "insert"),
+            ("attendance", f"{sid}|01/05/2025", "T1", "insert"),
+        ])
+        seq = db_interface.latest_change_seq()
+        db_interface.update_student(self.student_id, {"nickname": "Ann"})
+        self.assertEqual(self.entries(seq), [("students", sid, "T1", "update")])
+        self.assertEqual(self.entries(seq, tables=["classes"]), [])
+
+    def test_cascaded_and_moved_rows_are_journalled(self):
+        sid = str(self.student_id)
+        seq = db_interface.latest_change_seq()
+        db_interface.update_student(self.student_id, {"class_no": "T2"})
+        # SQLite doesn't order triggers on the same event, so compare without order
+        self.assertCountEqual(self.entries(seq), [
+            ("students", sid, "T2", "update"),
+            ("students", sid, "T1", "delete"),
+        ])
+
+        seq = db_interface.latest_change_seq()
+        db_interface.delete_class("T1")
+        deleted = {(table, op) for table, _key, class_no, op in self.entries(seq) if class_no == "T1"}
+        self.assertEqual(deleted, {("classes", "delete"), ("dates", "delete"), ("attendance", "delete")})
+
+    def test_class_last_change(self):
+        seq, changed_at = db_interface.get_class_last_change("T1")
+        self.assertEqual(seq, db_interface.latest_change_seq())
+        self.assertIsNotNone(changed_at)
+        db_interface.update_student(self.student_id, {"nickname": "Ann"})
+        self.assertGreater(db_interface.get_class_last_change("T1")[0], seq)
+        self.assertLess(db_interface.get_class_last_change("T2")[0], seq)  # other classes keep their version
+        self.assertEqual(db_interface.get_class_last_change("NONE"), (0, None))
+
+    def test_archive_round_trip_is_journalled(self):
+        seq = db_interface.latest_change_seq()
+        db_interface.set_class_archived("T1", True)
+        self.assertIn(("classes", "T1", "T1", "delete"), self.entries(seq))
+        seq = db_interface.latest_change_seq()
+        db_interface.set_class_archived("T1", False)
+        self.assertIn(("classes", "T1", "T1", "insert"), self.entries(seq))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.date_utils import date_sort_key
+from db_test_case import TempDBTestCase
+
+
+class TestClassDates(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        self.student_id = db_interface.insert_student({"class_no": "T1", "name": "Anna", "active": "Yes"})
+
+    def test_date_sort_key_is_chronological(self):
+        dates = ["02/01/2026", "Date2", "31/12/2025", "01/02/2025", "Date1"]
+        self.assertEqual(sorted(dates, key=date_sort_key), ["01/02/2025", "31/12/2025", "02/01/2026", "Date1", "Date2"])
+
+    def test_reconcile_applies_diff_and_keeps_notes(self):
+        db_interface.reconcile_class_dates("T1", ["01/05/2025", "02/05/2025", "05/05/2025"])
+        db_interface.insert_date("T1", "02/05/2025", "HOL")
+        db_interface.set_attendance("T1", self.student_id, "02/05/2025", "HOL")
+        db_interface.set_attendance("T1", self.student_id, "05/05/2025", "-")
+
+        added, removed = db_interface.reconcile_class_dates("T1", ["01/05/2025", "02/05/2025", "06/05/2025"])
+        self.assertEqual((added, removed), ({"06/05/2025"}, {"05/05/2025"}))
+        self.assertEqual(db_interface.get_dates_by_class("T1"), ["01/05/2025", "02/05/2025", "06/05/2025"])
+        conn = db_interface.get_connection()
+        note = conn.execute("SELECT note FROM dates WHERE class_no = 'T1' AND date = '02/05/2025'").fetchone()[0]
+        blank_rows = conn.execute("SELECT COUNT(*) FROM attendance WHERE date = '05/05/2025'").fetchone()[0]
+        conn.close()
+        self.assertEqual(note, "HOL")
+        self.assertEqual(blank_rows, 0)
+        self.assertEqual(db_interface.get_protected_dates("T1"), {"02/05/2025"})
+
+    def test_protected_dates_query_uses_index(self):
+        conn = db_interface.get_connection()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT DISTINCT date FROM attendance WHERE class_no = ? AND status IN ('P', 'A')", ("T1",)
+        ).fetchall()
+        conn.close()
+        self.assertIn("idx_attendance_class_status", " ".join(str(row[-1]) for row in plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QApplication, QDialog, QWidget
+
+from logic import db_interface
+from ui.form_registry import FormRegistry
+from db_test_case import TempDBTestCase
+
+
+def run_deferred_deletes():
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+class FakeForm(QDialog):
+    def __init__(self, parent, class_id):
+        super().__init__(parent)
+        self.class_id = class_id
+
+    def rebind(self, class_id):
+        self.class_id = class_id
+
+
+class TestFormRegistry(TempDBTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        super().setUp()
+        self.registry = FormRegistry()
+        self.parent = QWidget()
+        self.addCleanup(self.registry.invalidate)
+        self.addCleanup(self.app.setFont, self.app.font())  # take_mainform sets the app font
+        self.addCleanup(lambda: sip.isdeleted(self.parent) or self.parent.deleteLater())
+
+    def test_hidden_instance_is_reused_and_rebound(self):
+        form = self.registry.acquire(FakeForm, self.parent, "T1")
+        again = self.registry.acquire(FakeForm, self.parent, "T2")
+        self.assertIs(again, form)
+        self.assertEqual(form.class_id, "T2")
+        self.assertIsNot(self.registry.acquire(FakeForm, QWidget(self.parent), "T1"), form)  # one per parent
+
+    def test_visible_instance_is_not_taken(self):
+        form = self.registry.acquire(FakeForm, self.parent, "T1")
+        form.show()
+        other = self.registry.acquire(FakeForm, self.parent, "T2")
+        self.assertIsNot(other, form)
+        self.assertEqual(form.class_id, "T1")
+        form.hide()
+        self.assertIs(self.registry.acquire(FakeForm, self.parent, "T3"), form)
+
+    def test_form_is_dropped_with_its_parent(self):
+        form = self.registry.acquire(FakeForm, self.parent, "T1")
+        self.parent.deleteLater()
+        run_deferred_deletes()
+        self.assertTrue(sip.isdeleted(form))
+        self.assertEqual(self.registry._forms, {})
+
+    def test_settings_change_drops_cached_forms(self):
+        form = self.registry.acquire(FakeForm, self.parent, "T1")
+        db_interface.set_default("form_font_size", "14")
+        fresh = self.registry.acquire(FakeForm, self.parent, "T2")
+        self.assertIsNot(fresh, form)
+        run_deferred_deletes()
+        self.assertTrue(sip.isdeleted(form))
+        self.assertIs(self.registry.acquire(FakeForm, self.parent, "T3"), fresh)
+
+    def prewarm(self, class_id):
+        # What prewarm_mainform stores, without building a real Mainform
+        form = FakeForm(None, class_id)
+        self.registry._prewarmed = (class_id, db_interface.get_class_version(class_id), QFont("Arial", 11), form)
+        return form
+
+    def test_take_mainform_hands_over_unchanged_class(self):
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        form = self.prewarm("T1")
+        self.assertIs(self.registry.take_mainform("T1"), form)
+        self.assertEqual(self.app.font().family(), "Arial")
+        self.assertIsNone(self.registry.take_mainform("T1"))  # handed over once
+        form.deleteLater()
+
+    def test_take_mainform_rejects_changed_or_other_class(self):
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        db_interface.insert_class({"class_no": "T2", "archive": "No"})
+        form = self.prewarm("T1")
+        db_interface.insert_student({"class_no": "T1", "name": "Anna"})
+        self.assertIsNone(self.registry.take_mainform("T1"))
+        run_deferred_deletes()
+        self.assertTrue(sip.isdeleted(form))
+
+        form = self.prewarm("T1")
+        self.assertIsNone(self.registry.take_mainform("T2"))
+        run_deferred_deletes()
+        self.assertTrue(sip.isdeleted(form))
+
+    def test_settings_change_discards_prewarmed_mainform(self):
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        form = self.prewarm("T1")
+        db_interface.set_default("form_font_size", "14")
+        self.assertIsNone(self.registry.take_mainform("T1"))
+        run_deferred_deletes()
+        self.assertTrue(sip.isdeleted(form))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import gzip
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from ui import htmlbluecard
+from db_test_case import TempDBTestCase
+
+
+class TestBluecardView(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({
+            "class_no": "T1", "company": "Acme", "archive": "No", "start_date": "05/05/2025",
+            "days": "Monday, Wednesday", "class_time": "1.5", "max_classes": "10 x 2 = 20.0",
+        })
+        for date in ("07/05/2025", "05/05/2025", "12/05/2025"):
+            db_interface.insert_date("T1", date)
+
+    def test_view_uses_class_schedule(self):
+        view = htmlbluecard.build_bluecard_view("T1")
+        self.assertEqual(view["dates"], ["05/05/2025", "07/05/2025", "12/05/2025"])
+        self.assertEqual(view["running_totals"], ["1.5", "3", "4.5"])
+        summary = dict((row[2], row[3]) for row in view["metadata_rows"])["course_hours_summary"]
+        self.assertIn("1.5 Hours per class / 10 x 2 = 20.0 Classes", summary)
+
+    def test_dates_generated_from_metadata_when_class_has_none(self):
+        db_interface.insert_class({
+            "class_no": "T2", "archive": "No", "start_date": "05/05/2025",
+            "days": "Tuesday", "class_time": "2", "max_classes": "3 x 2 = 6.0",
+        })
+        view = htmlbluecard.build_bluecard_view("T2")
+        self.assertEqual(view["dates"], ["06/05/2025", "13/05/2025", "20/05/2025"])
+        self.assertEqual(view["running_totals"], ["2", "4", "6"])
+
+
+class ReportAppTestCase(TempDBTestCase):
+    """Flask test client over a temp DB; the module-level report caches start empty for every test."""
+
+    def setUp(self):
+        super().setUp()
+        for cache in (htmlbluecard._html_cache, htmlbluecard._index_cache):
+            self.addCleanup(cache.clear)
+            cache.clear()
+        config = mock.patch.dict(htmlbluecard.app.config)
+        config.start()
+        self.addCleanup(config.stop)
+        self.client = htmlbluecard.app.test_client()
+
+
+class TestBluecardCaching(ReportAppTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "company": "Acme", "archive": "No", "class_time": "2"})
+        db_interface.insert_class({"class_no": "T2", "company": "Bigco", "archive": "No", "class_time": "2"})
+        self.student_id = db_interface.insert_student({"class_no": "T1", "name": "Anna"})
+        db_interface.insert_date("T1", "05/05/2025")
+
+    def test_html_is_rebuilt_only_when_the_class_changes(self):
+        with mock.patch.object(htmlbluecard, "build_bluecard_view", wraps=htmlbluecard.build_bluecard_view) as build:
+            first = htmlbluecard.build_bluecard_html("T1")
+            self.assertEqual(htmlbluecard.build_bluecard_html("T1"), first)
+            self.assertEqual(build.call_count, 1)
+            db_interface.update_class("T2", {"company": "Other"})  # another class's edit keeps T1's copy
+            htmlbluecard.build_bluecard_html("T1")
+            self.assertEqual(build.call_count, 1)
+            db_interface.set_attendance("T1", self.student_id, "05/05/2025", "P")
+            htmlbluecard.build_bluecard_html("T1")
+            self.assertEqual(build.call_count, 2)
+
+    def test_etag_and_last_modified_answer_304(self):
+        response = self.client.get("/class/T1")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertIsNotNone(response.last_modified)
+        self.assertIn("Anna", response.get_data(as_text=True))
+
+        cached = self.client.get("/class/T1", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.headers["ETag"], etag)
+        self.assertEqual(cached.get_data(), b"")
+        since = self.client.get("/class/T1", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+        self.assertEqual(since.status_code, 304)
+
+        db_interface.update_student(self.student_id, {"name": "Anne"})
+        changed = self.client.get("/class/T1", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+        self.assertIn("Anne", changed.get_data(as_text=True))
+
+    def test_style_change_gives_new_etag(self):
+        etag = self.client.get("/class/T1").headers["ETag"]
+        db_interface.set_default("form_fg_color", "#123456")
+        response = self.client.get("/class/T1", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("#123456", response.get_data(as_text=True))
+
+    def test_unknown_class_is_404(self):
+        self.assertEqual(self.client.get("/class/NONE").status_code, 404)
+
+
+class TestClassIndex(ReportAppTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(1, 31):
+            db_interface.insert_class({"class_no": f"T{i:02d}", "company": "Acme", "archive": "No"})
+        db_interface.insert_class({"class_no": "X01", "company": "Old", "archive": "Yes"})
+
+    def class_links(self, response):
+        html = response.get_data(as_text=True)
+        return [no for no in [f"T{i:02d}" for i in range(1, 31)] + ["X01"] if f'href="/class/{no}"' in html]
+
+    def test_pages(self):
+        first = self.client.get("/")
+        self.assertIn("Page 1 of 2", first.get_data(as_text=True))
+        self.assertIn("Active Classes (30)", first.get_data(as_text=True))
+        self.assertEqual(self.class_links(first), [f"T{i:02d}" for i in range(1, 26)])
+        second = self.client.get("/?page=2")
+        self.assertEqual(self.class_links(second), [f"T{i:02d}" for i in range(26, 31)])
+        self.assertIn("Page 2 of 2", self.client.get("/?page=99").get_data(as_text=True))
+
+    def test_cached_page_is_invalidated_by_writes(self):
+        with mock.patch.object(htmlbluecard, "get_class_summaries", wraps=htmlbluecard.get_class_summaries) as summaries:
+            self.client.get("/?page=2")
+            self.client.get("/?page=2")
+            self.assertEqual(summaries.call_count, 1)
+            db_interface.insert_class({"class_no": "T31", "company": "Acme", "archive": "No"})
+            response = self.client.get("/?page=2")
+            self.assertEqual(summaries.call_count, 2)
+        self.assertIn('href="/class/T31"', response.get_data(as_text=True))
+        self.assertIn("Active Classes (31)", response.get_data(as_text=True))
+
+    def test_empty_index(self):
+        for i in range(1, 31):
+            db_interface.delete_class(f"T{i:02d}")
+        self.assertIn("No classes found", self.client.get("/").get_data(as_text=True))
+
+
+class TestServing(ReportAppTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "company": "Acme", "archive": "No"})
+
+    def test_compressed_responses(self):
+        htmlbluecard.app.config["COMPRESS_RESPONSES"] = True
+        plain = self.client.get("/class/T1")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        response = self.client.get("/class/T1", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(gzip.decompress(response.get_data()), plain.get_data())
+        self.assertEqual(int(response.headers["Content-Length"]), len(response.get_data()))
+        etag = response.headers["ETag"]
+        not_modified = self.client.get("/class/T1", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertNotIn("Content-Encoding", not_modified.headers)
+
+    def test_serve_uses_waitress_when_installed(self):
+        waitress = mock.MagicMock()
+        with mock.patch.dict(sys.modules, {"waitress": waitress}):
+            htmlbluecard.serve(port=5123, workers=3, open_browser_tab=False)
+        waitress.serve.assert_called_once_with(htmlbluecard.app, host="127.0.0.1", port=5123, threads=3)
+        self.assertTrue(htmlbluecard.app.config["READ_ONLY_DB"])
+        self.assertTrue(htmlbluecard.app.config["COMPRESS_RESPONSES"])
+
+    def test_serve_falls_back_to_werkzeug_with_a_warning(self):
+        class FakeServer:
+            def __init__(self, host, port, app):
+                self.address = (host, port)
+
+            def serve_forever(self):
+                FakeServer.served = self
+
+        with mock.patch.dict(sys.modules, {"waitress": None}), \
+                mock.patch("werkzeug.serving.BaseWSGIServer", FakeServer), \
+                self.assertLogs(level="WARNING") as logs:
+            htmlbluecard.serve(port=5123, workers=2, open_browser_tab=False)
+        self.assertIn("waitress is not installed", logs.output[0])
+        self.assertEqual(FakeServer.served.address, ("127.0.0.1", 5123))
+        self.assertEqual(FakeServer.served.pool._max_workers, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
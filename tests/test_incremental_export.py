@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.build_sqlite_db import recreate_db
+from logic.export_db_to_json import export_db_to_json, export_db_to_json_incremental, class_file_name
+from db_test_case import TempDBTestCase
+
+
+class TestIncrementalExport(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.out = os.path.join(self.tmp.name, "export")
+        self.student_ids = {}
+        for class_no in ("T1", "T2", "T3"):
+            db_interface.insert_class({"class_no": class_no, "company": f"Company {class_no}", "archive": "No"})
+            self.student_ids[class_no] = db_interface.insert_student({"class_no": class_no, "name": "Anna"})
+            db_interface.set_attendance(class_no, self.student_ids[class_no], "01/05/2025", "P")
+
+    def export(self):
+        return export_db_to_json_incremental(self.db_path, self.out)
+
+    def read(self, name):
+        with open(os.path.join(self.out, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_first_run_matches_full_export(self):
+        written, removed = self.export()
+        self.assertEqual(sorted(written), ["T1", "T2", "T3"])
+        self.assertEqual(removed, [])
+        full_path = os.path.join(self.tmp.name, "full.json")
+        export_db_to_json(self.db_path, full_path)
+        with open(full_path, encoding="utf-8") as f:
+            full = json.load(f)["classes"]
+        index = self.read("index.json")
+        self.assertEqual(index["seq"], db_interface.latest_change_seq())
+        for class_no, entry in index["classes"].items():
+            self.assertEqual(self.read(entry["file"]), full[class_no])
+
+    def test_only_changed_classes_are_rewritten(self):
+        self.export()
+        self.assertEqual(self.export(), ([], []))
+
+        db_interface.set_attendance("T2", self.student_ids["T2"], "01/05/2025", "A")
+        self.assertEqual(self.export(), (["T2"], []))
+        self.assertEqual(self.read(class_file_name("T2"))["students"]["S001"]["attendance"], {"01/05/2025": "A"})
+
+        db_interface.delete_class("T3")
+        self.assertEqual(self.export(), ([], ["T3"]))
+        self.assertNotIn("T3", self.read("index.json")["classes"])
+        self.assertFalse(os.path.exists(os.path.join(self.out, class_file_name("T3"))))
+
+    def test_similar_class_nos_get_their_own_files(self):
+        for class_no in ("A/1", "A_1"):
+            db_interface.insert_class({"class_no": class_no, "archive": "No"})
+        self.export()
+        index = self.read("index.json")["classes"]
+        self.assertNotEqual(index["A/1"]["file"], index["A_1"]["file"])
+        self.assertEqual(self.read(index["A/1"]["file"])["metadata"]["class_no"], "A/1")
+        self.assertEqual(self.read(index["A_1"]["file"])["metadata"]["class_no"], "A_1")
+
+    def test_archived_classes_are_exported(self):
+        db_interface.set_class_archived("T1", True)
+        full_path = os.path.join(self.tmp.name, "full.json")
+        export_db_to_json(self.db_path, full_path)
+        with open(full_path, encoding="utf-8") as f:
+            full = json.load(f)["classes"]
+        self.assertEqual(full["T1"]["metadata"]["archive"], "Yes")
+        self.assertEqual(full["T1"]["students"]["S001"]["attendance"], {"01/05/2025": "P"})
+
+        self.export()
+        self.assertEqual(self.read(class_file_name("T1")), full["T1"])
+        db_interface.set_class_archived("T2", True)
+        self.assertEqual(self.export(), (["T2"], []))
+        self.assertEqual(self.read(class_file_name("T2"))["metadata"]["archive"], "Yes")
+        db_interface.delete_class("T1")  # deleted from archive.db, which has no journal
+        self.assertEqual(self.export(), ([], ["T1"]))
+
+    def test_rebuilt_db_gets_a_full_export(self):
+        self.export()
+        recreate_db(self.db_path).close()  # a new journal, starting again from seq 1
+        db_interface.insert_class({"class_no": "N1", "archive": "No"})
+        self.assertEqual(self.export(), (["N1"], ["T1", "T2", "T3"]))
+        self.assertEqual(list(self.read("index.json")["classes"]), ["N1"])
+        self.assertEqual(["classes/" + name for name in os.listdir(os.path.join(self.out, "classes"))], [class_file_name("N1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
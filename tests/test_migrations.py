@@ -0,0 +1,113 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import migrations
+from logic.build_sqlite_db import recreate_db
+
+
+def index_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "test.db")
+        # A DB as shipped before migrations existed: no lookup indexes or cascades, user_version 0,
+        # and rows left behind by deleting student 2 and class C2
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+        CREATE TABLE classes (class_no TEXT PRIMARY KEY, company TEXT);
+        CREATE TABLE students (student_id INTEGER PRIMARY KEY AUTOINCREMENT, class_no TEXT, name TEXT);
+        CREATE TABLE class_students (
+            class_no TEXT, student_id TEXT, PRIMARY KEY (class_no, student_id),
+            FOREIGN KEY (class_no) REFERENCES classes(class_no),
+            FOREIGN KEY (student_id) REFERENCES students(student_id)
+        );
+        CREATE TABLE attendance (
+            class_no TEXT, student_id TEXT, date TEXT, status TEXT,
+            PRIMARY KEY (class_no, student_id, date),
+            FOREIGN KEY (class_no) REFERENCES classes(class_no),
+            FOREIGN KEY (student_id) REFERENCES students(student_id)
+        );
+        CREATE TABLE dates (
+            class_no TEXT, date TEXT, note TEXT, PRIMARY KEY (class_no, date),
+            FOREIGN KEY (class_no) REFERENCES classes(class_no)
+        );
+        INSERT INTO classes VALUES ('C1', 'Acme');
+        INSERT INTO students (class_no, name) VALUES ('C1', 'Ann'), ('C1', 'Bob');
+        DELETE FROM students WHERE student_id = 2;
+        INSERT INTO class_students VALUES ('C1', '1'), ('C1', '2');
+        INSERT INTO attendance VALUES ('C1', '1', '01/05/2025', 'P'), ('C1', '2', '01/05/2025', 'A'),
+            ('C2', '7', '01/05/2025', 'P');
+        INSERT INTO dates VALUES ('C1', '01/05/2025', ''), ('C2', '01/05/2025', '');
+        """)
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_upgrades_in_place_and_keeps_data(self):
+        steps = migrations.migrate_db(self.db_path, report=None)
+        self.assertEqual([version for version, _, _ in steps], [v for v, _, _ in migrations.MIGRATIONS])
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(migrations.get_schema_version(conn), migrations.LATEST_VERSION)
+        self.assertTrue({"idx_attendance_class_status", "idx_attendance_student", "idx_students_class"} <= index_names(conn))
+        self.assertEqual(conn.execute("SELECT status FROM attendance").fetchall(), [("P",)])
+        conn.close()
+        self.assertEqual(migrations.migrate_db(self.db_path, report=None), [])
+
+    def test_cascades_replace_orphaned_rows(self):
+        migrations.migrate_db(self.db_path, report=None)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT student_id FROM class_students").fetchall(), [("1",)])
+        self.assertEqual(conn.execute("SELECT class_no FROM dates").fetchall(), [("C1",)])
+        self.assertEqual(conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'students'").fetchone(), (2,))
+        self.assertIn("idx_attendance_class_status", index_names(conn))
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("DELETE FROM classes WHERE class_no = 'C1'")
+        for table in ("students", "class_students", "attendance", "dates"):
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone(), (0,), table)
+        conn.close()
+
+    def test_last_opened_class_moves_out_of_defaults(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE defaults (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT INTO defaults VALUES ('last_opened_class', 'C1'), ('form_font_size', '12')")
+        conn.commit()
+        conn.close()
+        migrations.migrate_db(self.db_path, report=None)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT key, value FROM app_state").fetchall(), [("last_opened_class", "C1")])
+        self.assertEqual(conn.execute("SELECT key FROM defaults").fetchall(), [("form_font_size",)])
+        conn.close()
+
+    def test_failed_step_rolls_back_to_previous_version(self):
+        def broken(conn):
+            conn.execute("CREATE INDEX idx_half_done ON attendance (date)")
+            raise sqlite3.OperationalError("boom")
+        steps = migrations.MIGRATIONS + [(migrations.LATEST_VERSION + 1, "broken", broken)]
+        with mock.patch.object(migrations, "MIGRATIONS", steps), \
+                mock.patch.object(migrations, "LATEST_VERSION", migrations.LATEST_VERSION + 1), \
+                mock.patch("logging.exception"):
+            with self.assertRaises(sqlite3.OperationalError):
+                migrations.migrate_db(self.db_path, report=None)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(migrations.get_schema_version(conn), migrations.MIGRATIONS[-1][0])
+        self.assertNotIn("idx_half_done", index_names(conn))
+        conn.close()
+
+    def test_recreated_db_is_at_latest_version(self):
+        conn = recreate_db(os.path.join(self.tmp.name, "fresh.db"))
+        self.assertEqual(migrations.get_schema_version(conn), migrations.LATEST_VERSION)
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import pdf_render
+from logic.pdf_render import PdfRenderPipeline, render_html_to_pdf
+
+
+class TestPdfRenderPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.versions = {"T1": "v1", "T2": "v1"}
+        self.built = []
+        self.rendered = []
+
+        def fake_render(html, output_path, engine):
+            if "FAIL" in html:
+                raise RuntimeError("engine crashed")
+            self.rendered.append((html, engine))
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(html)
+            return output_path
+
+        # Threads instead of processes, so the fake engine and the counters are shared
+        for name, value in (("ProcessPoolExecutor", ThreadPoolExecutor), ("render_html_to_pdf", fake_render)):
+            patcher = mock.patch.object(pdf_render, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.pipeline = PdfRenderPipeline(self.build_html, self.versions.get, engine="weasyprint", output_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+        self.tmp.cleanup()
+
+    def build_html(self, class_no):
+        self.built.append(class_no)
+        return f"<p>{class_no} {self.versions[class_no]}</p>"
+
+    def read(self, path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_unchanged_class_reuses_cached_pdf(self):
+        first = self.pipeline.render("T1", timeout=5)
+        self.assertEqual(self.pipeline.render("T1", timeout=5), first)
+        self.assertEqual(self.built, ["T1"])
+        self.assertEqual(self.rendered, [("<p>T1 v1</p>", "weasyprint")])
+
+    def test_new_version_renders_again_and_drops_old_file(self):
+        first = self.pipeline.render("T1", timeout=5)
+        self.versions["T1"] = "v2"
+        second = self.pipeline.render("T1", timeout=5)
+        self.assertNotEqual(second, first)
+        self.assertEqual(self.read(second), "<p>T1 v2</p>")
+        self.assertFalse(os.path.exists(first))
+        self.assertEqual(self.built, ["T1", "T1"])
+
+    def test_render_many_reports_failures_per_class(self):
+        self.versions["T2"] = "FAIL"
+        with mock.patch("logging.error"):
+            results = self.pipeline.render_many(["T1", "T2"], timeout=5)
+        self.assertEqual(self.read(results["T1"]), "<p>T1 v1</p>")
+        self.assertIsNone(results["T2"])
+        self.versions["T2"] = "v2"
+        self.assertEqual(self.read(self.pipeline.render("T2", timeout=5)), "<p>T2 v2</p>")  # a failure isn't cached
+
+    def test_concurrent_requests_share_one_render(self):
+        release = threading.Event()
+        build = self.build_html
+
+        def slow_build(class_no):
+            release.wait(5)
+            return build(class_no)
+
+        self.pipeline.html_builder = slow_build
+        with ThreadPoolExecutor(max_workers=2) as requests:
+            first = requests.submit(self.pipeline.render, "T1", 5)
+            second = requests.submit(self.pipeline.render, "T1", 5)
+            time.sleep(0.05)  # both requests are in submit before the first build finishes
+            release.set()
+            self.assertEqual(first.result(), second.result())
+        self.assertEqual(self.built, ["T1"])
+        self.assertEqual(len(self.rendered), 1)
+        self.assertTrue(os.path.exists(first.result()))
+
+    def test_failed_render_leaves_no_file(self):
+        self.versions["T1"] = "FAIL"
+        with mock.patch("logging.error"), self.assertRaises(RuntimeError):
+            self.pipeline.render("T1", timeout=5)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ValueError) as raised:
+            PdfRenderPipeline(self.build_html, self.versions.get, engine="ghostscript", output_dir=self.tmp.name)
+        self.assertIn("ghostscript", str(raised.exception))
+        with self.assertRaises(ValueError):
+            render_html_to_pdf("<p></p>", os.path.join(self.tmp.name, "out.pdf"), engine="ghostscript")
@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import sqlite3
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+try:
+    import PyQt5
+except ImportError:
+    PyQt5 = None
+
+from logic import db_interface, query_profiler, style_compiler
+from logic.build_sqlite_db import import_form_settings_from_factory, merge_metadata_with_defaults, DATA_DIR
+from db_test_case import TempDBTestCase
+
+with open(os.path.join(DATA_DIR, "factory_defaults.json"), encoding="utf-8") as f:
+    FACTORY_DEFAULTS = json.load(f)
+
+# Most SQL statements each user action may run against the DB (PRAGMA/BEGIN/COMMIT not counted).
+# A change that needs more should raise the budget in review, not by accident: a statement per
+# student or per class row shows up here as a failure.
+BUDGETS = {
+    "open_class": 8,        # Mainform: settings, defaults, class, attendance, students, stylesheet (2), dates
+    "refresh_grid": 4,      # class, attendance, students, dates
+    "open_launcher": 7,
+    "open_student_manager": 4,
+    "save_metadata": 3,     # protected dates, class update, dates diff (dates unchanged)
+}
+
+DATA_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+_active_counter = None
+
+
+def record(sql):
+    if _active_counter is not None and sql.lstrip().upper().startswith(DATA_STATEMENTS):
+        _active_counter.append(" ".join(sql.split()))
+
+
+# Statements are counted where the code issues them rather than with set_trace_callback: the trace
+# also fires for every trigger (the changes journal) and foreign key action (cascades), reported
+# under the outer statement's text, so it can't tell them apart. An executemany counts once.
+class CountingCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        record(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        record(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class CountingConnection(sqlite3.Connection):
+    """Connection that adds each data statement it runs to the active counter."""
+
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+@contextmanager
+def count_queries():
+    """Collect the data statements run inside the block; yields the list."""
+    global _active_counter
+    statements = []
+    _active_counter = statements
+    try:
+        with mock.patch.object(query_profiler, "connection_factory", CountingConnection):
+            yield statements
+    finally:
+        _active_counter = None
+
+
+def seed_form_settings(db_path):
+    """Per-form window settings as a factory install has them."""
+    conn = sqlite3.connect(db_path)
+    import_form_settings_from_factory(conn, FACTORY_DEFAULTS)
+    conn.close()
+
+
+def add_class(class_no, company, n_students):
+    """A class with every column filled the way the app's own import fills it, plus students and marks."""
+    metadata = merge_metadata_with_defaults({
+        "company": company, "start_date": "05/05/2025", "finish_date": "30/06/2025", "days": "Monday, Wednesday",
+        "class_time": "2", "course_hours": "20", "max_classes": "10 x 2 = 20.0", "cod_cia": "0 COD 0 CIA 0 HOL",
+    }, FACTORY_DEFAULTS["classes"]["default"])
+    metadata.pop("dates")
+    db_interface.insert_class({"class_no": class_no, **metadata})
+    ids, errors = db_interface.insert_students_bulk(class_no, [
+        {"name": f"Student {i}", "nickname": f"S{i}", "company_no": str(i), "gender": "Female", "score": "",
+         "pre_test": "", "post_test": "", "note": "", "active": "Yes"}
+        for i in range(n_students)
+    ])
+    assert not errors, errors
+    dates = ["05/05/2025", "07/05/2025", "12/05/2025", "14/05/2025", "19/05/2025", "21/05/2025"]
+    db_interface.reconcile_class_dates(class_no, dates)
+    for student_id in ids:
+        db_interface.set_attendance(class_no, student_id, dates[0], "P")
+    return db_interface.get_class_by_id(class_no)
+
+
+@unittest.skipIf(PyQt5 is None, "PyQt5 is not installed")
+class TestQueryBudgets(TempDBTestCase):
+    @classmethod
+    def setUpClass(cls):
+        from PyQt5.QtWidgets import QApplication
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        super().setUp()
+        seed_form_settings(self.db_path)
+        self.small = add_class("SMALL", "Acme", 3)
+        self.large = add_class("LARGE", "Bigco", 40)
+        style_compiler._cache.clear()
+        self.widgets = []
+
+        # Closing the Launcher asks whether to back up first
+        from PyQt5.QtWidgets import QMessageBox
+        patcher = mock.patch("ui.launcher.QMessageBox.question", return_value=QMessageBox.No)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        for widget in self.widgets:
+            widget.close()
+            widget.deleteLater()
+        self.app.processEvents()
+        style_compiler._cache.clear()
+
+    def assertWithinBudget(self, action, statements):
+        self.assertLessEqual(len(statements), BUDGETS[action], f"{action} ran {len(statements)} statements:\n" + "\n".join(statements))
+
+    def open_mainform(self, class_data):
+        from ui.mainform import Mainform
+        form = Mainform(class_data["class_no"], {"classes": {class_data["class_no"]: class_data}}, None)
+        self.widgets.append(form)
+        return form
+
+    def settle(self):
+        """Let deferred work (column width saves) run, so it is counted with the action."""
+        from PyQt5.QtTest import QTest
+        QTest.qWait(400)
+
+    def test_open_class_and_refresh(self):
+        with count_queries() as opened:
+            form = self.open_mainform(self.large)
+            form.show()
+            self.settle()
+        self.assertWithinBudget("open_class", opened)
+
+        with count_queries() as refreshed:
+            form.refresh_student_table()
+        self.assertWithinBudget("refresh_grid", refreshed)
+
+    def test_column_drag_is_saved_once(self):
+        form = self.open_mainform(self.large)
+        form.show()
+        self.settle()
+        header = form.frozen_table.horizontalHeader()
+        with count_queries() as saved:
+            for size in (160, 170, 180):
+                header.resizeSection(1, size)  # Name
+            header.resizeSection(2, 120)  # Nickname
+            self.settle()
+        self.assertEqual([sql for sql in saved if sql.startswith("UPDATE")], [
+            "UPDATE classes SET width_name = ?, width_nickname = ? WHERE class_no = ?"
+        ])
+        stored = db_interface.get_class_by_id("LARGE")
+        self.assertEqual((stored["width_name"], stored["width_nickname"]), (180, 120))
+
+    def test_open_class_does_not_grow_with_students(self):
+        with count_queries() as small:
+            self.open_mainform(self.small)
+        style_compiler._cache.clear()
+        with count_queries() as large:
+            self.open_mainform(self.large)
+        self.assertEqual(len(small), len(large))
+
+    def test_open_launcher(self):
+        from ui.launcher import Launcher
+        with count_queries() as opened:
+            launcher = Launcher(None)
+        self.widgets.append(launcher)
+        self.assertWithinBudget("open_launcher", opened)
+
+        for i in range(20):
+            add_class(f"EXTRA{i}", f"Company {i}", 1)
+        with count_queries() as refreshed:
+            launcher.refresh_data()
+        self.assertLessEqual(len(refreshed), 2)  # classes, then the table defaults
+
+    def test_open_student_manager(self):
+        from ui.student_manager import StudentManager
+        with count_queries() as opened:
+            manager = StudentManager(None, {}, "LARGE", lambda: None)
+        self.widgets.append(manager)
+        self.assertWithinBudget("open_student_manager", opened)
+
+    def test_save_metadata(self):
+        from ui.metadata_form import MetadataForm
+        data = {"classes": {"LARGE": {"metadata": self.large, "archive": "No"}}}
+        form = MetadataForm(None, "LARGE", data, None, lambda: None, db_interface.get_all_defaults())
+        self.widgets.append(form)
+        with mock.patch.object(MetadataForm, "warn_if_start_date_not_in_days", return_value=True):
+            form.save_metadata()  # settles the stored dates on what the form generates
+            with count_queries() as saved:
+                form.save_metadata()
+        self.assertWithinBudget("save_metadata", saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface, query_profiler
+from db_test_case import TempDBTestCase
+
+
+class TestQueryProfiler(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        db_interface.insert_students_bulk("T1", [{"name": "Anna"}, {"name": "Ben"}])
+        patches = [
+            mock.patch.object(query_profiler, "connection_factory", query_profiler.ProfiledConnection),
+            mock.patch.object(query_profiler, "functions", query_profiler.QueryStats()),
+            mock.patch.object(query_profiler, "statements", query_profiler.QueryStats()),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_functions_and_statements_are_counted(self):
+        namespace = {"get_students_by_class": db_interface.get_students_by_class}
+        query_profiler.instrument(namespace, "logic.db_interface")
+        for _ in range(3):
+            namespace["get_students_by_class"]("T1")
+        functions = {row["key"]: row for row in query_profiler.functions.summary()}
+        self.assertEqual(functions["get_students_by_class"]["calls"], 3)
+        self.assertEqual(functions["get_students_by_class"]["rows"], 6)
+        statements = {row["key"]: row for row in query_profiler.statements.summary()}
+        select = statements["SELECT * FROM students WHERE class_no = ?"]
+        self.assertEqual((select["calls"], select["rows"]), (3, 6))
+        self.assertLessEqual(select["p50_ms"], select["max_ms"])
+
+    def test_slow_statements_are_logged_with_call_site(self):
+        with mock.patch.object(query_profiler, "SLOW_QUERY_MS", 0), \
+                self.assertLogs("bluecard.slow_queries", level="WARNING") as logs:
+            db_interface.get_class_by_id("T1")
+        self.assertTrue(any("test_query_profiler.py" in line and "FROM classes" in line for line in logs.output))
+
+    def test_summary_is_written_as_json(self):
+        db_interface.get_attendance_by_class("T1")
+        path = query_profiler.dump_summary(os.path.join(self.tmp.name, "profile.json"))
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertTrue(any("FROM attendance" in row["key"] for row in report["statements"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import sqlite3
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from db_test_case import TempDBTestCase
+
+
+class TestReadSnapshot(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "archive": "No"})
+        self.student_id = db_interface.insert_student({"class_no": "T1", "name": "Anna"})
+
+    def test_report_reads_one_snapshot_without_blocking_writes(self):
+        writer = sqlite3.connect(self.db_path, timeout=0.1)
+        with db_interface.read_snapshot():
+            self.assertEqual(db_interface.get_attendance_by_class("T1"), {})
+            writer.execute("INSERT INTO attendance VALUES ('T1', ?, '01/05/2025', 'P')", (str(self.student_id),))
+            writer.commit()
+            self.assertEqual(db_interface.get_attendance_by_class("T1"), {})
+        writer.close()
+        self.assertEqual(len(db_interface.get_attendance_by_class("T1")), 1)
+
+    def test_snapshot_is_read_only_and_nests(self):
+        with db_interface.read_snapshot() as outer:
+            with db_interface.read_snapshot() as inner:
+                self.assertIs(inner, outer)
+            with self.assertRaises(sqlite3.OperationalError):
+                db_interface.set_attendance("T1", self.student_id, "01/05/2025", "P")
+        db_interface.set_attendance("T1", self.student_id, "01/05/2025", "P")
+
+
+if __name__ == "__main__":
+    unittest.main()
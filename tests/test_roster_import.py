@@ -0,0 +1,56 @@
+import os
+import sys
+import csv
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.roster_import import import_roster, preview_roster
+from db_test_case import TempDBTestCase
+
+
+class TestRosterImport(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "company": "Test", "archive": "No"})
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmp.name, "roster.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def test_header_columns_are_mapped_and_batched(self):
+        rows = [["Company No", "Fullname", "Sex", "Remarks"]]
+        rows += [[f"E{i:04d}", f"person {i}", "M" if i % 2 else "F", ""] for i in range(1, 1201)]
+        rows.append(["E9999", "", "M", "no name"])
+        path = self.write_csv(rows)
+
+        column_map, has_header, preview = preview_roster(path, limit=5)
+        self.assertTrue(has_header)
+        self.assertEqual(column_map, ["company_no", "name", "gender", "note"])
+        self.assertEqual(len(preview), 5)
+        self.assertEqual(preview[0][:4], ["person 1", "", "E0001", "M"])
+
+        batches = []
+        result = import_roster(path, "T1", {"01/05/2025": "-"}, batch_size=500, progress_callback=batches.append)
+        self.assertEqual(result["inserted"], 1200)
+        self.assertEqual(result["errors"], [(1202, "Name is required.")])
+        self.assertEqual(len(batches), 3)
+        students = db_interface.get_students_by_class("T1")
+        self.assertEqual(len(students), 1200)
+        first = min(students, key=lambda s: s["student_id"])
+        self.assertEqual((first["name"], first["company_no"], first["gender"]), ("Person 1", "E0001", "Male"))
+        self.assertEqual(len(db_interface.get_attendance_by_class("T1")), 1200)
+
+    def test_headerless_file_uses_bulk_import_order(self):
+        path = self.write_csv([["Emily Johnson", "Em", "123", "Female", "80", "", "", ""]])
+        _, has_header, preview = preview_roster(path)
+        self.assertFalse(has_header)
+        self.assertEqual(preview[0][0], "Emily Johnson")
+        self.assertEqual(import_roster(path, "T1")["inserted"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
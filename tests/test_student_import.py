@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from logic.student_import import import_students, parse_grid
+from db_test_case import TempDBTestCase
+
+
+class TestStudentImport(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"class_no": "T1", "company": "Test", "archive": "No"})
+
+    def test_parse_grid_skips_headers_and_blank_rows(self):
+        rows = [
+            ["Name", "Nickname", "Company No", "Gender", "Score", "Pre-Test", "Post-Test", "Note"],
+            ["anna smith", "ann", "C1", "f", "", "", "", ""],
+            ["", "", "", "", "", "", "", ""],
+            ["bob", "", "", "Robot", "", "", "", ""],
+            ["", "nick only", "", "", "", "", "", ""],
+        ]
+        records, errors = parse_grid(rows)
+        self.assertEqual([r[0] for r in records], [2])
+        self.assertEqual(records[0][1]["name"], "Anna Smith")
+        self.assertEqual(records[0][1]["gender"], "Female")
+        self.assertEqual([e[0] for e in errors], [4, 5])
+
+    def test_import_inserts_batch_with_attendance(self):
+        rows = [["Student %d" % i, "", "", "Male" if i % 2 else "", "", "", "", ""] for i in range(1, 31)]
+        rows.append(["", "missing name", "", "", "", "", "", ""])
+        attendance = {"01/05/2025": "-", "02/05/2025": "-"}
+        result = import_students("T1", rows, attendance)
+
+        self.assertEqual(len(result["inserted"]), 30)
+        self.assertEqual(result["errors"], [(31, "Name is required.")])
+        self.assertEqual(result["inserted"], list(range(result["inserted"][0], result["inserted"][0] + 30)))
+        students = db_interface.get_students_by_class("T1")
+        self.assertEqual(len(students), 30)
+        by_student = db_interface.get_attendance_by_class("T1")
+        self.assertEqual(len(by_student), 30)
+        self.assertEqual(by_student[str(result["inserted"][0])], attendance)
+
+    def test_failed_row_does_not_abort_batch(self):
+        first = import_students("T1", [["Alice", "", "", "", "", "", "", ""]])["inserted"][0]
+        # Rows with keys that aren't students columns are reported, never spliced into the SQL
+        inserted, errors = db_interface.insert_students_bulk(
+            "T1", [{"name": "Bob"}, {"name": "Bad", "no_such_column": 1}, {"name": "Carol"}, {"name) VALUES ('x') --": 1}]
+        )
+        self.assertEqual(inserted, [first + 1, first + 2])
+        self.assertEqual([e[0] for e in errors], [1, 3])
+        self.assertEqual(errors[0][1], "Unknown students column(s): no_such_column")
+        names = sorted(s["name"] for s in db_interface.get_students_by_class("T1"))
+        self.assertEqual(names, ["Alice", "Bob", "Carol"])
+
+
+if __name__ == "__main__":
+    unittest.main()
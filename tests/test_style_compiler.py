@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface, style_compiler
+from db_test_case import TempDBTestCase
+
+
+class TestStyleCompiler(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        style_compiler._cache.clear()
+
+    def tearDown(self):
+        style_compiler._cache.clear()
+
+    def test_compiled_once_per_settings_version(self):
+        with mock.patch.object(style_compiler, "get_all_defaults", wraps=db_interface.get_all_defaults) as defaults:
+            first = style_compiler.compile_stylesheet("PALCODForm")
+            self.assertIs(style_compiler.compile_stylesheet("PALCODForm"), first)
+            self.assertEqual(defaults.call_count, 1)
+
+            db_interface.set_default("button_bg_color", "#123456")
+            recompiled = style_compiler.compile_stylesheet("PALCODForm")
+            self.assertEqual(defaults.call_count, 2)
+        self.assertIn("#123456", recompiled)
+
+    def test_app_state_keeps_compiled_sheets(self):
+        first = style_compiler.compile_stylesheet("PALCODForm")
+        db_interface.set_app_state("last_opened_class", "T1")
+        self.assertIs(style_compiler.compile_stylesheet("PALCODForm"), first)
+        self.assertEqual(db_interface.get_app_state("last_opened_class"), "T1")
+        self.assertNotIn("last_opened_class", db_interface.get_all_defaults())
+
+    def test_form_settings_override_defaults(self):
+        db_interface.set_default("button_fg_color", "#000001")
+        db_interface.set_form_settings("ShowHideForm", {"button_fg_color": "#000002"})
+        qss = style_compiler.compile_stylesheet("ShowHideForm")
+        self.assertIn("color: #000002", qss)
+        self.assertNotIn("#000001", qss)
+
+    def test_rules_are_scoped_to_their_form(self):
+        for form_name in ("PALCODForm", "ShowHideForm", "StudentForm", "MetadataForm"):
+            qss = style_compiler.compile_stylesheet(form_name)
+            for line in qss.strip().splitlines():
+                self.assertTrue(line.startswith(f"#{form_name}"), (form_name, line))
+
+    def test_message_sheet_uses_message_defaults(self):
+        db_interface.set_default("message_bg_color", "#abcdef")
+        qss = style_compiler.compile_stylesheet("Message")
+        self.assertIn("background: #abcdef", qss)
+        for line in qss.strip().splitlines():
+            self.assertTrue(line.startswith(("#toast", "#messageConfirm")), line)
+        self.assertEqual(db_interface.get_message_defaults()["message_bg_color"], "#abcdef")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from PyQt5.QtWidgets import QApplication, QLabel, QWidget
+
+from ui import toast
+from db_test_case import TempDBTestCase
+
+
+class TestToast(TempDBTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        super().setUp()
+        self.window = QWidget()
+        self.addCleanup(self.window.deleteLater)
+        self.toast = toast.toast_for(self.window)
+
+    def pending(self):
+        return [message for message, _timeout in self.toast.pending]
+
+    def test_one_toast_per_window(self):
+        child = QLabel(self.window)
+        self.assertIs(toast.toast_for(child), self.toast)
+        self.assertIs(self.toast.parentWidget(), self.window)
+        other = QWidget()
+        self.addCleanup(other.deleteLater)
+        self.assertIsNot(toast.toast_for(other), self.toast)
+
+    def test_messages_are_queued_and_shown_in_turn(self):
+        toast.show_message_dialog(self.window, "Student added.", timeout=5000)
+        toast.show_message_dialog(self.window, "Data saved successfully.", timeout=5000)
+        self.assertTrue(self.toast.isVisible())
+        self.assertEqual(self.toast.label.text(), "Student added.")
+        self.assertEqual(self.pending(), ["Data saved successfully."])
+        self.toast.show_next()  # what the timer does when the first one expires
+        self.assertEqual(self.toast.label.text(), "Data saved successfully.")
+        self.assertEqual(self.pending(), [])
+        self.toast.show_next()
+        self.assertFalse(self.toast.isVisible())
+
+    def test_repeats_are_ignored(self):
+        self.toast.enqueue("Saved.", 5000)
+        self.toast.enqueue("Saved.", 5000)  # same as the one showing
+        self.assertEqual(self.pending(), [])
+        self.toast.enqueue("Deleted.", 5000)
+        self.toast.enqueue("Deleted.", 5000)  # same as the last queued
+        self.toast.enqueue("Saved.", 5000)    # differs from the last queued, so it is kept
+        self.assertEqual(self.pending(), ["Deleted.", "Saved."])
+
+    def test_repeat_after_expiry_is_shown_again(self):
+        self.toast.enqueue("Saved.", 5000)
+        self.toast.timer.stop()
+        self.toast.show_next()
+        self.toast.enqueue("Saved.", 5000)
+        self.assertTrue(self.toast.isVisible())
+        self.assertEqual(self.toast.label.text(), "Saved.")
+        self.assertTrue(self.toast.timer.isActive())
+
+    def test_queue_keeps_newest_messages(self):
+        self.toast.enqueue("showing", 5000)
+        for i in range(toast.MAX_QUEUED + 2):
+            self.toast.enqueue(f"message {i}", 5000)
+        self.assertEqual(self.pending(), [f"message {i}" for i in range(2, toast.MAX_QUEUED + 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
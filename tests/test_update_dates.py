@@ -0,0 +1,206 @@
+import os
+import sys
+import copy
+import random
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic.update_dates import update_dates, add_date, remove_date, modify_date, apply_date_edits, dates_in_sync
+
+
+# --- Reference: the original implementation, kept verbatim to check the new one against ---
+
+def ref_update_dates(metadata, students):
+    metadata_dates = metadata.get("dates", [])
+    metadata_dates_set = set(metadata_dates)
+    for student_id, student in students.items():
+        attendance = student.get("attendance", {})
+        preserved_dates = {date: value for date, value in attendance.items() if value not in ["", "-"]}
+        for date in list(attendance.keys()):
+            if date not in metadata_dates_set:
+                del attendance[date]
+        for date in metadata_dates:
+            if date not in attendance:
+                attendance[date] = "-"
+        attendance.update(preserved_dates)
+        student["attendance"] = attendance
+    return metadata, students
+
+
+def ref_add_date(metadata, students, new_date):
+    if new_date in metadata["dates"]:
+        raise ValueError(f"The date {new_date} already exists in the schedule.")
+    metadata["dates"].append(new_date)
+    metadata["dates"].sort(key=lambda d: datetime.strptime(d, "%d/%m/%Y"))
+    for student in students.values():
+        student["attendance"][new_date] = "-"
+    return ref_update_dates(metadata, students)
+
+
+def ref_remove_date(metadata, students, date_to_remove):
+    if date_to_remove not in metadata["dates"]:
+        raise ValueError(f"The date {date_to_remove} does not exist in the schedule.")
+    metadata["dates"].remove(date_to_remove)
+    for student in students.values():
+        if date_to_remove in student["attendance"]:
+            del student["attendance"][date_to_remove]
+    return ref_update_dates(metadata, students)
+
+
+def ref_modify_date(metadata, students, old_date, new_date):
+    if old_date not in metadata["dates"]:
+        raise ValueError(f"The date {old_date} does not exist in the schedule.")
+    if new_date in metadata["dates"]:
+        raise ValueError(f"The date {new_date} already exists in the schedule.")
+    for student in students.values():
+        attendance = student.get("attendance", {})
+        if old_date in attendance and attendance[old_date] not in ["", "-"]:
+            raise ValueError(f"The date {old_date} cannot be modified because it has preserved attendance values.")
+    metadata["dates"].remove(old_date)
+    metadata["dates"].append(new_date)
+    metadata["dates"].sort(key=lambda d: datetime.strptime(d, "%d/%m/%Y"))
+    for student in students.values():
+        attendance = student.get("attendance", {})
+        if old_date in attendance:
+            attendance[new_date] = attendance.pop(old_date)
+    return ref_update_dates(metadata, students)
+
+
+REFERENCE = {"add": ref_add_date, "remove": ref_remove_date, "modify": ref_modify_date}
+NEW = {"add": add_date, "remove": remove_date, "modify": modify_date}
+
+DATE_POOL = [(datetime(2025, 5, 1) + timedelta(days=i)).strftime("%d/%m/%Y") for i in range(40)]
+VALUES = ["", "-", "-", "-", "P", "A", "L", "CIA", "COD", "HOL"]
+
+
+def random_state(rng, synced=True):
+    """Random metadata/students. synced=True runs the reference sync so students match metadata."""
+    dates = rng.sample(DATE_POOL, rng.randint(0, 15))
+    if rng.random() < 0.7:
+        dates.sort(key=lambda d: datetime.strptime(d, "%d/%m/%Y"))
+    metadata = {"dates": dates}
+    students = {}
+    for sid in range(rng.randint(0, 6)):
+        attendance = {d: rng.choice(VALUES) for d in dates if rng.random() < 0.9}
+        for d in rng.sample(DATE_POOL, rng.randint(0, 4)):
+            attendance.setdefault(d, rng.choice(VALUES))
+        students[sid] = {"name": f"S{sid}", "attendance": attendance}
+    if synced:
+        ref_update_dates(metadata, students)
+    return metadata, students
+
+
+def random_edit(rng, dates):
+    action = rng.choice(["add", "remove", "modify"])
+    existing = rng.choice(dates) if dates and rng.random() < 0.85 else rng.choice(DATE_POOL)
+    other = rng.choice(DATE_POOL)
+    if action == "add":
+        return ("add", other)
+    if action == "remove":
+        return ("remove", existing)
+    return ("modify", existing, other)
+
+
+def run(funcs, metadata, students, edit):
+    try:
+        funcs[edit[0]](metadata, students, *edit[1:])
+        return None
+    except ValueError as e:
+        return str(e)
+
+
+class TestUpdateDatesProperties(unittest.TestCase):
+    """Randomised property tests: the new implementation must match the original on every case."""
+
+    CASES = 400
+
+    def test_update_dates_matches_reference_on_any_input(self):
+        rng = random.Random(34)
+        for _ in range(self.CASES):
+            metadata, students = random_state(rng, synced=False)
+            expected = ref_update_dates(copy.deepcopy(metadata), copy.deepcopy(students))
+            actual = update_dates(copy.deepcopy(metadata), copy.deepcopy(students))
+            self.assertEqual(actual, expected)
+
+    def test_single_edits_match_reference(self):
+        rng = random.Random(35)
+        for _ in range(self.CASES):
+            metadata, students = random_state(rng)
+            ref_state = copy.deepcopy((metadata, students))
+            new_state = copy.deepcopy((metadata, students))
+            for _ in range(rng.randint(1, 8)):
+                edit = random_edit(rng, ref_state[0]["dates"])
+                ref_error = run(REFERENCE, *ref_state, edit)
+                new_error = run(NEW, *new_state, edit)
+                self.assertEqual(new_error, ref_error, edit)
+                self.assertEqual(new_state[0]["dates"], ref_state[0]["dates"], edit)
+                self.assertEqual(new_state[1], ref_state[1], edit)
+
+    def test_single_edits_on_unsynced_students_match_reference(self):
+        rng = random.Random(37)
+        for _ in range(self.CASES):
+            metadata, students = random_state(rng, synced=False)
+            edit = random_edit(rng, metadata["dates"])
+            ref_state = copy.deepcopy((metadata, students))
+            new_state = copy.deepcopy((metadata, students))
+            ref_error = run(REFERENCE, *ref_state, edit)
+            self.assertEqual(run(NEW, *new_state, edit), ref_error, edit)
+            self.assertEqual(new_state, ref_state, edit)
+
+    def test_batch_rejects_unsynced_students(self):
+        metadata = {"dates": ["01/05/2025", "02/05/2025"]}
+        students = {0: {"attendance": {"01/05/2025": "P"}}}  # no entry for 02/05
+        state = copy.deepcopy((metadata, students))
+        self.assertFalse(dates_in_sync(metadata, students))
+        with self.assertRaises(ValueError):
+            apply_date_edits(metadata, students, [("add", "03/05/2025")])
+        self.assertEqual((metadata, students), state)
+        update_dates(metadata, students)
+        self.assertTrue(dates_in_sync(metadata, students))
+        apply_date_edits(metadata, students, [("add", "03/05/2025")])
+        self.assertEqual(students[0]["attendance"], {"01/05/2025": "P", "02/05/2025": "-", "03/05/2025": "-"})
+
+    def test_batch_matches_sequential_reference(self):
+        rng = random.Random(36)
+        for _ in range(self.CASES):
+            metadata, students = random_state(rng)
+            ref_state = copy.deepcopy((metadata, students))
+            edits = []
+            for _ in range(rng.randint(1, 10)):
+                edit = random_edit(rng, ref_state[0]["dates"])
+                edits.append(edit)
+                if run(REFERENCE, *ref_state, edit) is not None:
+                    break
+            batch_state = copy.deepcopy((metadata, students))
+            try:
+                apply_date_edits(*batch_state, edits)
+                batch_error = None
+            except ValueError as e:
+                batch_error = str(e)
+
+            sequential_state = copy.deepcopy((metadata, students))
+            sequential_error = None
+            for edit in edits:
+                sequential_error = run(REFERENCE, *sequential_state, edit)
+                if sequential_error:
+                    break
+            self.assertEqual(batch_error, sequential_error, edits)
+            if batch_error is None:
+                self.assertEqual(batch_state[0]["dates"], sequential_state[0]["dates"], edits)
+                self.assertEqual(batch_state[1], sequential_state[1], edits)
+            else:
+                # A rejected batch changes nothing
+                self.assertEqual(batch_state, (metadata, students), edits)
+
+    def test_dates_list_is_updated_in_place(self):
+        metadata = {"dates": ["03/05/2025", "01/05/2025"]}
+        dates = metadata["dates"]
+        add_date(metadata, {}, "02/05/2025")
+        self.assertIs(metadata["dates"], dates)
+        self.assertEqual(dates, ["01/05/2025", "02/05/2025", "03/05/2025"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from logic import db_interface
+from db_test_case import TempDBTestCase
+
+
+class TestWriteStatements(TempDBTestCase):
+    def setUp(self):
+        super().setUp()
+        db_interface.insert_class({"archive": "No", "class_no": "T1", "company": "Acme"})
+
+    def test_key_order_does_not_change_sql(self):
+        conn = db_interface.get_connection()
+        first = db_interface.build_statement(conn, "update", "classes", {"width_name": 120, "show_score": "Yes"}, key="class_no")
+        second = db_interface.build_statement(conn, "update", "classes", {"show_score": "Yes", "width_name": 120}, key="class_no")
+        conn.close()
+        self.assertEqual(first, second)
+        self.assertEqual(first[0], "UPDATE classes SET show_score = ?, width_name = ? WHERE class_no = ?")
+
+    def test_unknown_column_is_rejected(self):
+        with self.assertRaises(ValueError):
+            db_interface.update_class("T1", {"company": "Evil", "company = 'x' --": 1})
+        self.assertEqual(db_interface.get_class_by_id("T1")["company"], "Acme")
+
+    def test_form_settings_upsert_keeps_other_columns(self):
+        db_interface.set_form_settings("Custom", {"window_width": 800, "title_color": "#111111"})
+        db_interface.set_form_settings("Custom", {"window_width": 900})
+        settings = db_interface.get_form_settings("Custom")
+        self.assertEqual(settings["window_width"], 900)
+        self.assertEqual(settings["title_color"], "#111111")
+
+
+if __name__ == "__main__":
+    unittest.main()